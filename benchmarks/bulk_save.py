@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""Measure the Redis round trips of saving the runners of a large group.
+
+Compares saving each runner on its own, as the healthcheck did before,
+with `Runner.bulk_save`, which sends the documents by chunks in pipelines.
+
+Runners are saved under a temporary key prefix of the given Redis server
+and deleted at the end. The Redis server must provide RedisJSON.
+
+Usage:
+
+    poetry run python benchmarks/bulk_save.py --redis-url redis://localhost:6379
+"""
+
+import argparse
+import time
+from typing import Callable, List
+from uuid import uuid4
+
+from redis import Redis
+from redis.client import Pipeline
+
+from runner_manager.models.runner import Runner, RunnerStatus
+
+
+class RoundTrips:
+    """Count the commands and pipelines sent to Redis."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        self.count = 0
+        self.execute_command = Redis.execute_command
+        self.execute = Pipeline.execute
+        trips = self
+
+        def execute_command(self, *args, **options):
+            trips.count += 1
+            return trips.execute_command(self, *args, **options)
+
+        def execute(self, *args, **kwargs):
+            trips.count += 1
+            return trips.execute(self, *args, **kwargs)
+
+        Redis.execute_command = execute_command  # type: ignore
+        Pipeline.execute = execute  # type: ignore
+        return self
+
+    def __exit__(self, *args):
+        Redis.execute_command = self.execute_command  # type: ignore
+        Pipeline.execute = self.execute  # type: ignore
+
+
+def measure(name: str, runners: List[Runner], save: Callable[[List[Runner]], None]):
+    with RoundTrips() as trips:
+        start = time.perf_counter()
+        save(runners)
+        elapsed = time.perf_counter() - start
+    print(f"{name:>12} {trips.count:>12} {elapsed * 1000:>10.1f}ms")
+
+
+def one_by_one(runners: List[Runner]):
+    for runner in runners:
+        runner.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--runners", type=int, default=1000)
+    args = parser.parse_args()
+    run(Redis.from_url(args.redis_url, decode_responses=True), args.runners)
+
+
+def run(connection: Redis, count: int):
+    prefix = f"benchmark-{uuid4()}"
+    Runner.Meta.database = connection
+    Runner.Meta.global_key_prefix = prefix
+    runners = [
+        Runner(
+            name=f"benchmark-{i}",
+            runner_group_name="benchmark",
+            status=RunnerStatus.offline,
+            busy=False,
+        )
+        for i in range(count)
+    ]
+    try:
+        print(f"{'':>12} {'round trips':>12} {'time':>12}")
+        for runner in runners:
+            runner.status = RunnerStatus.online
+        measure("one by one", runners, one_by_one)
+        for runner in runners:
+            runner.status = RunnerStatus.offline
+        measure("bulk_save", runners, Runner.bulk_save)
+    finally:
+        # Runners, states and counters are all under the prefix.
+        connection.delete(*connection.scan_iter(f"{prefix}:*"))
+
+
+if __name__ == "__main__":
+    main()
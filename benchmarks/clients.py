@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Measure the latency saved by sharing the clients of a backend.
+
+Instances of the backend of a runner group are created and deleted, first
+building a new client for each call and then with the clients kept by the
+registry, and the mean latency of each operation is reported.
+
+The runners are not registered on GitHub: their instances are deleted
+right after they are created.
+
+Usage:
+
+    poetry run python benchmarks/clients.py my-runner-group --runners 5
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from statistics import mean
+from typing import Dict, List
+
+from redis_om import NotFoundError
+
+from runner_manager import Runner, RunnerGroup, Settings
+from runner_manager.backend.base import BaseBackend
+from runner_manager.clients.registry import registry
+from runner_manager.dependencies import get_redis, get_settings
+from runner_manager.logging import log
+from runner_manager.models.runner import RunnerStatus
+
+
+def new_runner(group: RunnerGroup) -> Runner:
+    return Runner(
+        name=group.generate_runner_name(),
+        organization=group.organization,
+        status=RunnerStatus.offline,
+        busy=False,
+        runner_group_id=group.id,
+        created_at=datetime.now(timezone.utc),
+        runner_group_name=group.name,
+        labels=group.runner_labels,
+        manager=group.manager,
+    )
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def run(
+    backend: BaseBackend, group: RunnerGroup, count: int, create: bool
+) -> Dict[str, float]:
+    """Mean seconds taken by each operation, over count runners."""
+    latencies: Dict[str, List[float]] = {"client": [], "create": [], "delete": []}
+    for _ in range(count):
+        latencies["client"].append(timed(lambda: backend.client))
+    for _ in range(count if create else 0):
+        runner = new_runner(group)
+        latencies["create"].append(timed(backend.create, runner))
+        latencies["delete"].append(timed(backend.delete, runner))
+    return {
+        operation: mean(values) for operation, values in latencies.items() if values
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("group", help="name of the runner group")
+    parser.add_argument(
+        "--runners", type=int, default=5, help="runners created per mode"
+    )
+    parser.add_argument(
+        "--clients-only",
+        action="store_true",
+        default=False,
+        help="only measure the access to the client, without creating runners",
+    )
+    args = parser.parse_args()
+
+    settings: Settings = get_settings()
+    log.setLevel(settings.log_level)
+    Runner.Meta.database = get_redis()
+    RunnerGroup.Meta.database = Runner.Meta.database
+    try:
+        group: RunnerGroup = RunnerGroup.find(RunnerGroup.name == args.group).first()
+    except NotFoundError:
+        print(f"Runner group {args.group} not found")
+        return
+    backend = group.backend
+
+    ttl = registry.ttl
+    results: Dict[str, Dict[str, float]] = {}
+    for mode, mode_ttl in (("uncached", timedelta()), ("cached", ttl)):
+        registry.ttl = mode_ttl
+        registry.clear(close_clients=True)
+        results[mode] = run(backend, group, args.runners, not args.clients_only)
+
+    registry.ttl = ttl
+    registry.clear(close_clients=True)
+    print(f"{group.name} ({backend.name.value}), {args.runners} runners per mode")
+    print(f"{'':>10} {'uncached':>10} {'cached':>10} {'saved':>10}")
+    for operation, uncached in results["uncached"].items():
+        cached = results["cached"][operation]
+        print(
+            f"{operation:>10} {uncached * 1000:9.1f}ms {cached * 1000:9.1f}ms "
+            f"{(uncached - cached) * 1000:9.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
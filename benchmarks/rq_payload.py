@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Measure the Redis memory used by queued jobs.
+
+Compares the jobs as they were enqueued before (pickled objects) with the
+jobs enqueued now (JSON serialized, primary keys and the fields of the
+webhooks read by the jobs).
+
+Jobs are enqueued on a temporary queue of the given Redis server, that
+queue is emptied at the end. MEMORY USAGE is used when the server supports
+it, otherwise the size of the fields of the job hash is reported.
+
+Usage:
+
+    poetry run python benchmarks/rq_payload.py --redis-url redis://localhost:6379
+"""
+
+import argparse
+from typing import Any, List, Tuple
+from uuid import uuid4
+
+from pydantic import parse_raw_as
+from redis import Redis
+from redis.exceptions import ResponseError
+from rq import Queue
+from rq.serializers import DefaultSerializer
+
+from runner_manager.jobs.serializer import Job, JSONSerializer
+from runner_manager.models.runner_group import RunnerGroup
+from runner_manager.models.settings import Settings
+from runner_manager.models.webhook import AcceptedWebhookEvents, WorkflowJobWebhook
+from tests.strategies import WorkflowJobQueuedStrategy
+
+
+def job_memory(connection: Redis, job_id: str) -> int:
+    key = f"rq:job:{job_id}"
+    try:
+        usage = connection.memory_usage(key, samples=0)
+    except ResponseError:
+        usage = None
+    if usage is not None:
+        return usage
+    return sum(len(k) + len(v) for k, v in connection.hgetall(key).items())
+
+
+def measure(
+    connection: Redis, serializer: Any, func: str, args: Tuple, count: int
+) -> float:
+    queue = Queue(
+        f"benchmark-{uuid4()}",
+        connection=connection,
+        serializer=serializer,
+        job_class=Job,
+    )
+    try:
+        jobs: List[Job] = [queue.enqueue(func, *args) for _ in range(count)]
+        return sum(job_memory(connection, job.id) for job in jobs) / count
+    finally:
+        queue.empty()
+        queue.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--count", type=int, default=100)
+    args = parser.parse_args()
+    run(Redis.from_url(args.redis_url), args.count)
+
+
+def run(connection: Redis, count: int):
+    body = WorkflowJobQueuedStrategy.example().json(exclude_unset=True)
+    RunnerGroup.Meta.database = connection
+    group = RunnerGroup(
+        name="benchmark",
+        organization="octo-org",
+        labels=["label"],
+        manager="runner-manager",
+        backend={"name": "base"},
+    )
+    settings = Settings(runner_groups=[group], github_token="token")
+    cases = [
+        (
+            "runner_manager.jobs.workflow_job.queued",
+            lambda: (parse_raw_as(AcceptedWebhookEvents, body),),  # type: ignore
+            lambda: (WorkflowJobWebhook.parse_raw(body),),
+            "webhook",
+        ),
+        (
+            "runner_manager.jobs.runner.runner",
+            lambda: (group,),
+            lambda: (group.pk,),
+            "runner group",
+        ),
+        (
+            "runner_manager.jobs.startup.startup",
+            lambda: (settings,),
+            lambda: (),
+            "settings",
+        ),
+    ]
+    print(f"{'job':>50} {'before':>10} {'after':>10}")
+    for func, before_args, after_args, arg in cases:
+        before = measure(connection, DefaultSerializer, func, before_args(), count)
+        after = measure(connection, JSONSerializer, func, after_args(), count)
+        print(f"{func + ' (' + arg + ')':>50} {before:9.0f}B {after:9.0f}B")
+
+
+if __name__ == "__main__":
+    main()
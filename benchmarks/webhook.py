@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Benchmark of the webhook ingest path.
+
+Compares the number of workflow_job deliveries per second that the API
+process can ingest when parsing the payload into the full githubkit
+models (previous behavior) against the lightweight model used by the
+webhook router.
+
+Each iteration reproduces the CPU bound work done for a delivery:
+signature verification, payload validation and serialization of the
+job arguments. Network and Redis round trips are left out.
+
+Usage:
+
+    poetry run python benchmarks/webhook.py --iterations 2000
+"""
+
+import argparse
+import pickle
+import time
+from typing import Callable
+
+from githubkit.webhooks import sign, verify
+from pydantic import parse_raw_as
+
+from runner_manager.models.webhook import AcceptedWebhookEvents, WorkflowJobWebhook
+from tests.strategies import WorkflowJobQueuedStrategy
+
+SECRET = "secret"
+
+
+def full(body: bytes, signature: str) -> bytes:
+    assert verify(SECRET, body, signature)
+    webhook = parse_raw_as(AcceptedWebhookEvents, body)  # type: ignore
+    return pickle.dumps(webhook)
+
+
+def lightweight(body: bytes, signature: str) -> bytes:
+    assert verify(SECRET, body, signature)
+    webhook = WorkflowJobWebhook.parse_raw(body)
+    return pickle.dumps(webhook)
+
+
+def run(name: str, func: Callable[[bytes, str], bytes], body, signature, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        size = len(func(body, signature))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:>12}: {iterations / elapsed:10.1f} req/s "
+        f"({elapsed / iterations * 1e6:8.1f} us/req, job payload {size} bytes)"
+    )
+    return iterations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    webhook = WorkflowJobQueuedStrategy.example()
+    body = webhook.json(exclude_unset=True).encode()
+    signature = sign(SECRET, body, method="sha256")
+    print(f"Payload size: {len(body)} bytes")
+
+    before = run("full", full, body, signature, args.iterations)
+    after = run("lightweight", lightweight, body, signature, args.iterations)
+    print(f"Speedup: x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
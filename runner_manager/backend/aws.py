@@ -4,7 +4,6 @@ from typing import List, Literal, Optional, Sequence
 
 from boto3 import client
 from botocore.exceptions import ClientError
-from githubkit.versions.latest.webhooks import WorkflowJobEvent
 from mypy_boto3_ec2 import EC2Client
 from mypy_boto3_ec2.type_defs import FilterTypeDef, InstanceTypeDef, TagTypeDef
 from pydantic import Field
@@ -20,6 +19,7 @@ from runner_manager.models.backend import (
     Backends,
 )
 from runner_manager.models.runner import Runner
+from runner_manager.models.webhook import WorkflowJobEvents
 
 
 class AWSBackend(BaseBackend):
@@ -27,13 +27,20 @@ class AWSBackend(BaseBackend):
     config: AWSConfig
     instance_config: AWSInstanceConfig
 
+    @property
+    def rate_limit_scope(self) -> str:
+        return self.config.region
+
     @property
     def client(self) -> EC2Client:
         """Return a AWS Compute Engine client."""
-        return client("ec2", region_name=self.config.region)
+        return self.cached_client(
+            "ec2", lambda: client("ec2", region_name=self.config.region)
+        )
 
     def create(self, runner: Runner) -> Runner:
         """Create a runner."""
+        self.throttle("create")
         if self.instance_config.subnet_id and self.instance_config.subnet_configs:
             raise Exception(
                 "Instance config contains both subnet_id and subnet_configs, only one allowed."
@@ -98,6 +105,7 @@ class AWSBackend(BaseBackend):
 
     def delete(self, runner: Runner):
         """Delete a runner."""
+        self.throttle("delete")
         if runner.instance_id:
             try:
                 self.client.terminate_instances(InstanceIds=[runner.instance_id])
@@ -122,6 +130,7 @@ class AWSBackend(BaseBackend):
 
     def list(self) -> List[Runner]:
         """List runners."""
+        self.throttle("list")
         try:
             reservations = self.client.describe_instances(
                 Filters=[
@@ -157,9 +166,10 @@ class AWSBackend(BaseBackend):
         return runners
 
     def update(
-        self, runner: Runner, webhook: Optional[WorkflowJobEvent] = None
+        self, runner: Runner, webhook: Optional[WorkflowJobEvents] = None
     ) -> Runner:
         """Update a runner."""
+        self.throttle("update")
         if runner.instance_id:
             try:
                 self.client.create_tags(
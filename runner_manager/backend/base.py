@@ -1,11 +1,24 @@
-from typing import List, Literal, Optional
+import asyncio
+import os
+import threading
+from typing import Callable, Dict, List, Literal, Optional, Tuple, TypeVar
 
-from githubkit.versions.latest.webhooks import WorkflowJobEvent
 from pydantic import BaseModel, Field
 from redis_om import NotFoundError
 
+from runner_manager.clients.registry import config_hash, registry
+from runner_manager.models import rate_limit
 from runner_manager.models.backend import BackendConfig, Backends, InstanceConfig
 from runner_manager.models.runner import Runner
+from runner_manager.models.webhook import WorkflowJobEvents
+
+T = TypeVar("T")
+
+# Semaphores bounding the operations in flight of each backend in the
+# process, whatever the thread or event loop calling it.
+_semaphores: Dict[Tuple[str, Optional[str], int], threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+os.register_at_fork(after_in_child=_semaphores.clear)
 
 
 class BaseBackend(BaseModel):
@@ -23,7 +36,14 @@ class BaseBackend(BaseModel):
     runner_group: Optional[str] = None
 
     # Inherited classes will have a client property configured
-    # to interact with the backend.
+    # to interact with the backend, built once per config with
+    # `cached_client`.
+    #
+    # The blocking methods of the backend are run in threads by `run`, so
+    # that an event loop, such as the one of `RunnerGroup.create_runners`,
+    # can wait for many operations at once. The operations in flight are
+    # bounded per backend of a runner group and per process by
+    # `config.max_concurrency`.
 
     @property
     def client(self):
@@ -50,7 +70,7 @@ class BaseBackend(BaseModel):
         return Runner.delete(runner.pk)
 
     def update(
-        self, runner: Runner, webhook: Optional[WorkflowJobEvent] = None
+        self, runner: Runner, webhook: Optional[WorkflowJobEvents] = None
     ) -> Runner:
         """Update a runner instance.
 
@@ -88,3 +108,55 @@ class BaseBackend(BaseModel):
                 f"No runners found for {self.name} backend."
             ) from exception
         return runners
+
+    def client_key(self, kind: str) -> Tuple[str, ...]:
+        return (Backends(self.name).value, kind, config_hash(self.config))
+
+    def cached_client(self, kind: str, factory: Callable[[], T]) -> T:
+        """Client of the backend shared by the backends with the same config,
+        see `runner_manager.clients.registry`."""
+        return registry.get(self.client_key(kind), factory)
+
+    @property
+    def rate_limit_scope(self) -> str:
+        """Account or region of the backend sharing a rate limit."""
+        return "default"
+
+    def throttle(self, operation: str) -> float:
+        """Wait for a token of the rate limit of the backend before calling
+        its API, if the backend is rate limited.
+
+        Returns:
+            float: The seconds waited.
+        """
+        if self.config is None or self.config.rate_limit is None:
+            return 0.0
+        return rate_limit.acquire(
+            Runner.db(),
+            Runner.Meta.global_key_prefix,
+            Backends(self.name).value,
+            self.rate_limit_scope,
+            operation,
+            self.config.rate_limit,
+        )
+
+    @property
+    def semaphore(self) -> threading.BoundedSemaphore:
+        """Semaphore bounding the operations in flight of the backend in
+        the process."""
+        config = self.config or BackendConfig()
+        key = (Backends(self.name).value, self.runner_group, config.max_concurrency)
+        with _semaphores_lock:
+            if key not in _semaphores:
+                _semaphores[key] = threading.BoundedSemaphore(config.max_concurrency)
+            return _semaphores[key]
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Call a blocking method of the backend once a slot is free."""
+        with self.semaphore:
+            return func(*args, **kwargs)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking method of the backend in a thread, once a slot of
+        the backend is free."""
+        return await asyncio.to_thread(self.call, func, *args, **kwargs)
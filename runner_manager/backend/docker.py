@@ -6,13 +6,13 @@ from typing import Dict, List, Literal, Optional
 from docker import DockerClient
 from docker.errors import APIError, NotFound
 from docker.models.containers import Container
-from githubkit.versions.latest.webhooks import WorkflowJobEvent
 from pydantic import Field
 from redis_om import NotFoundError
 
 from runner_manager.backend.base import BaseBackend
 from runner_manager.models.backend import Backends, DockerConfig, DockerInstanceConfig
 from runner_manager.models.runner import Runner
+from runner_manager.models.webhook import WorkflowJobEvents
 
 log = logging.getLogger(__name__)
 
@@ -23,10 +23,16 @@ class DockerBackend(BaseBackend):
     config: DockerConfig = DockerConfig()
     instance_config: DockerInstanceConfig = DockerInstanceConfig()
 
+    @property
+    def rate_limit_scope(self) -> str:
+        return self.config.base_url
+
     @property
     def client(self) -> DockerClient:
         """Returns a docker client."""
-        return DockerClient(base_url=self.config.base_url)
+        return self.cached_client(
+            "docker", lambda: DockerClient(base_url=self.config.base_url)
+        )
 
     def _build(self, context: str, tag: str):
         """Simple build function to build a docker image.
@@ -55,6 +61,7 @@ class DockerBackend(BaseBackend):
         return labels
 
     def create(self, runner: Runner):
+        self.throttle("create")
         if self.instance_config.context:
             self._build(self.instance_config.context, self.instance_config.image)
 
@@ -74,18 +81,20 @@ class DockerBackend(BaseBackend):
 
         return super().create(runner)
 
-    def update(self, runner: Runner, webhook: Optional[WorkflowJobEvent] = None):
+    def update(self, runner: Runner, webhook: Optional[WorkflowJobEvents] = None):
         """Update a runner instance.
 
         We cannot update a container, so we just gonna ensure the runner
         is running and is up to date.
         """
+        self.throttle("update")
         container: Container = self.client.containers.get(runner.instance_id)
         if container.status != "running":
             raise Exception(f"Container {container.id} is not running.")
         return super().update(runner, webhook)
 
     def delete(self, runner: Runner):
+        self.throttle("delete")
         try:
             if runner.instance_id:
                 container = self.client.containers.get(runner.instance_id)
@@ -108,6 +117,7 @@ class DockerBackend(BaseBackend):
         return Runner.find(Runner.instance_id == container.id).first()
 
     def list(self) -> List[Runner]:
+        self.throttle("list")
         containers: List[Container] = self.client.containers.list(
             filters={"label": f"manager={self.manager}"}
         )
@@ -4,7 +4,6 @@ import re
 import time
 from typing import List, Literal, MutableMapping, Optional
 
-from githubkit.versions.latest.webhooks import WorkflowJobEvent
 from google.api_core.exceptions import BadRequest, NotFound
 from google.api_core.extended_operation import ExtendedOperation
 from google.cloud.compute import (
@@ -30,6 +29,7 @@ from redis_om import NotFoundError
 from runner_manager.backend.base import BaseBackend
 from runner_manager.models.backend import Backends, GCPConfig, GCPInstanceConfig
 from runner_manager.models.runner import Runner
+from runner_manager.models.webhook import WorkflowJobEvents
 
 log = logging.getLogger(__name__)
 
@@ -39,20 +39,24 @@ class GCPBackend(BaseBackend):
     config: GCPConfig
     instance_config: GCPInstanceConfig
 
+    @property
+    def rate_limit_scope(self) -> str:
+        return f"{self.config.project_id}/{self.config.region}"
+
     @property
     def client(self) -> InstancesClient:
         """Returns a GCP Compute Engine client."""
-        return InstancesClient()
+        return self.cached_client("instances", InstancesClient)
 
     @property
     def image_client(self) -> ImagesClient:
         """Returns a GCP Image client."""
-        return ImagesClient()
+        return self.cached_client("images", ImagesClient)
 
     @property
     def zone_operation_client(self) -> ZoneOperationsClient:
         """Returns a GCP Zone Operation client."""
-        return ZoneOperationsClient()
+        return self.cached_client("zone_operations", ZoneOperationsClient)
 
     def wait_for_operation(
         self,
@@ -173,7 +177,7 @@ class GCPBackend(BaseBackend):
         return value
 
     def setup_labels(
-        self, runner: Runner, webhook: Optional[WorkflowJobEvent] = None
+        self, runner: Runner, webhook: Optional[WorkflowJobEvents] = None
     ) -> MutableMapping[str, str]:
         labels: MutableMapping[str, str] = self.instance_config.labels.copy()
         if self.manager:
@@ -199,6 +203,7 @@ class GCPBackend(BaseBackend):
         return labels
 
     def create(self, runner: Runner):
+        self.throttle("create")
         try:
             instance: Instance = self.configure_instance(runner)
 
@@ -219,6 +224,7 @@ class GCPBackend(BaseBackend):
         return super().create(runner)
 
     def delete(self, runner: Runner):
+        self.throttle("delete")
         try:
             if runner.instance_id:
                 self.client.delete(
@@ -252,6 +258,7 @@ class GCPBackend(BaseBackend):
         return Runner.find(Runner.instance_id == instance.name).first()
 
     def list(self) -> List[Runner]:
+        self.throttle("list")
         runners: List[Runner] = []
         try:
             instances = self.client.list(
@@ -283,8 +290,9 @@ class GCPBackend(BaseBackend):
         return runners
 
     def update(
-        self, runner: Runner, webhook: Optional[WorkflowJobEvent] = None
+        self, runner: Runner, webhook: Optional[WorkflowJobEvents] = None
     ) -> Runner:
+        self.throttle("update")
         try:
             instance: Instance = self.client.get(
                 project=self.config.project_id,
@@ -1,7 +1,6 @@
 from typing import List, Literal, Optional
 
 import openstack
-from githubkit.versions.latest.webhooks import WorkflowJobEvent
 from openstack.compute.v2.server import Server
 from openstack.connection import Connection
 from openstack.exceptions import SDKException
@@ -17,6 +16,7 @@ from runner_manager.models.backend import (
     OpenstackInstanceConfig,
 )
 from runner_manager.models.runner import Runner
+from runner_manager.models.webhook import WorkflowJobEvents
 
 
 class OpenstackBackend(BaseBackend):
@@ -24,14 +24,22 @@ class OpenstackBackend(BaseBackend):
     config: OpenstackConfig = OpenstackConfig()
     instance_config: OpenstackInstanceConfig = OpenstackInstanceConfig()
 
+    @property
+    def rate_limit_scope(self) -> str:
+        return f"{self.config.cloud}/{self.config.region_name}"
+
     @property
     def client(self) -> Connection:
-        return openstack.connect(
-            cloud=self.config.cloud, region_name=self.config.region_name
+        return self.cached_client(
+            "connection",
+            lambda: openstack.connect(
+                cloud=self.config.cloud, region_name=self.config.region_name
+            ),
         )
 
     def create(self, runner: Runner):
         """Create a runner"""
+        self.throttle("create")
         instance_resource: OpenstackInstance = self.instance_config.configure_instance(
             runner
         )
@@ -45,6 +53,7 @@ class OpenstackBackend(BaseBackend):
 
     def delete(self, runner: Runner):
         """Delete a runner"""
+        self.throttle("delete")
         if runner.instance_id:
             try:
                 self.client.delete_server(name_or_id=runner.instance_id)
@@ -54,6 +63,7 @@ class OpenstackBackend(BaseBackend):
         return super().delete(runner)
 
     def list(self) -> List[Runner]:
+        self.throttle("list")
         try:
             servers: List[Server] = list(
                 self.client.compute.servers(
@@ -86,9 +96,10 @@ class OpenstackBackend(BaseBackend):
         return runners
 
     def update(
-        self, runner: Runner, webhook: Optional[WorkflowJobEvent] = None
+        self, runner: Runner, webhook: Optional[WorkflowJobEvents] = None
     ) -> Runner:
         """Update a runner"""
+        self.throttle("update")
         if runner.instance_id:
             try:
                 self.client.set_server_metadata(
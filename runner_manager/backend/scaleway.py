@@ -38,8 +38,10 @@ class ScalewayBackend(BaseBackend):
     instance_config: ScalewayInstanceConfig
 
     @property
-    def client(self) -> InstanceUtilsV1API:
-        """Returns a Scaleway Instance API client."""
+    def rate_limit_scope(self) -> str:
+        return f"{self.config.project_id}/{self.config.zone}"
+
+    def _create_client(self) -> Client:
         access_key = self.config.access_key or os.getenv("SCW_ACCESS_KEY")
         secret_key = self.config.secret_key or os.getenv("SCW_SECRET_KEY")
 
@@ -48,34 +50,31 @@ class ScalewayBackend(BaseBackend):
                 "Scaleway credentials not found. Set SCW_ACCESS_KEY and SCW_SECRET_KEY."
             )
 
-        scw_client = Client(
+        return Client(
             access_key=access_key,
             secret_key=secret_key,
             default_project_id=self.config.project_id,
             default_zone=self.config.zone,
             default_region=self.config.region,
         )
-        return InstanceUtilsV1API(scw_client)
+
+    @property
+    def client(self) -> InstanceUtilsV1API:
+        """Returns a Scaleway Instance API client."""
+        return self.cached_client(
+            "instance",
+            lambda: InstanceUtilsV1API(
+                self.cached_client("client", self._create_client)
+            ),
+        )
 
     @property
     def block_client(self) -> BlockV1Alpha1API:
         """Returns a Scaleway Block Storage API client."""
-        access_key = self.config.access_key or os.getenv("SCW_ACCESS_KEY")
-        secret_key = self.config.secret_key or os.getenv("SCW_SECRET_KEY")
-
-        if not access_key or not secret_key:
-            raise ValueError(
-                "Scaleway credentials not found. Set SCW_ACCESS_KEY and SCW_SECRET_KEY."
-            )
-
-        scw_client = Client(
-            access_key=access_key,
-            secret_key=secret_key,
-            default_project_id=self.config.project_id,
-            default_zone=self.config.zone,
-            default_region=self.config.region,
+        return self.cached_client(
+            "block",
+            lambda: BlockV1Alpha1API(self.cached_client("client", self._create_client)),
         )
-        return BlockV1Alpha1API(scw_client)
 
     def sanitize_tags(self, tags: List[str]) -> List[str]:
         """Sanitize tags to comply with Scaleway requirements.
@@ -243,6 +242,7 @@ class ScalewayBackend(BaseBackend):
         Returns:
             Runner: Updated runner with instance_id.
         """
+        self.throttle("create")
         log.info(f"Creating Scaleway instance for runner {runner.name}")
 
         # Get image
@@ -416,6 +416,7 @@ class ScalewayBackend(BaseBackend):
         Returns:
             int: Number of deleted runners.
         """
+        self.throttle("delete")
         if not runner.instance_id:
             log.warning(f"Runner {runner.name} has no instance_id, skipping deletion")
             return super().delete(runner)
@@ -522,6 +523,7 @@ class ScalewayBackend(BaseBackend):
         Returns:
             Runner: Updated runner.
         """
+        self.throttle("update")
         if not runner.instance_id:
             log.warning(f"Runner {runner.name} has no instance_id, skipping update")
             return super().update(runner, webhook)
@@ -577,6 +579,7 @@ class ScalewayBackend(BaseBackend):
         Returns:
             List[Runner]: List of runner instances.
         """
+        self.throttle("list")
         runners = []
 
         try:
@@ -29,7 +29,15 @@ class VsphereBackend(BaseBackend):
     config: VsphereConfig
     instance_config: VsphereInstanceConfig
 
+    @property
+    def rate_limit_scope(self) -> str:
+        return self.config.server
+
     def _create_client(self) -> VsphereClient:
+        return self.cached_client("vsphere", self._login)
+
+    def _login(self) -> VsphereClient:
+        self.throttle("login")
         session = Session()
         session.verify = self.config.verify_ssl
         return create_vsphere_client(
@@ -41,6 +49,7 @@ class VsphereBackend(BaseBackend):
 
     def get_library_id(self, client: VsphereClient, library: str) -> str:
         find_spec = Library.FindSpec(name=library)
+        self.throttle("list")
         library_ids: List[str] = client.content.Library.find(find_spec)
         if len(library_ids) == 0:
             raise Exception("Library with name '{0}' not found".format(library))
@@ -54,6 +63,7 @@ class VsphereBackend(BaseBackend):
             name=template,
             library_id=library_id,
         )
+        self.throttle("list")
         item_ids = client.content.library.Item.find(find_spec)
         item_id = item_ids[0] if item_ids else None
         if item_id:
@@ -70,6 +80,7 @@ class VsphereBackend(BaseBackend):
 
         filter_spec = Datacenter.FilterSpec(names=set([datacenter_name]))
 
+        self.throttle("list")
         datacenter_summaries = client.vcenter.Datacenter.list(filter_spec)
         if len(datacenter_summaries) > 0:
             datacenter = datacenter_summaries[0].datacenter
@@ -92,6 +103,7 @@ class VsphereBackend(BaseBackend):
             datacenters=set([datacenter]), names=names
         )
 
+        self.throttle("list")
         resource_pool_summaries = client.vcenter.ResourcePool.list(filter_spec)
         if len(resource_pool_summaries) > 0:
             resource_pool = resource_pool_summaries[0].resource_pool
@@ -104,6 +116,7 @@ class VsphereBackend(BaseBackend):
             return None
 
     def create(self, runner: Runner) -> Runner:
+        # Each call to the API takes a token of the rate limit.
         client: VsphereClient = self._create_client()
         library_id = self.get_library_id(client, self.instance_config.library)
         library_item_id = self.get_library_item_id(
@@ -116,6 +129,7 @@ class VsphereBackend(BaseBackend):
             resource_pool_id=resource_pool_id,
         )
 
+        self.throttle("list")
         ovf = client.vcenter.ovf.LibraryItem.filter(
             library_item_id,
             deployment_target,
@@ -149,6 +163,10 @@ class VsphereBackend(BaseBackend):
             additional_parameters=ovf.additional_params,
             default_datastore_id=None,
         )
+        # The tokens of the deployment and of the power on are taken before
+        # deploying, so that a deployed VM is always started and saved.
+        self.throttle("create")
+        self.throttle("update")
         deploy = client.vcenter.ovf.LibraryItem.deploy(
             library_item_id,
             deployment_target,
@@ -169,16 +187,21 @@ class VsphereBackend(BaseBackend):
         client = self._create_client()
         if runner.instance_id is not None:
             try:
+                self.throttle("list")
                 state = client.vcenter.vm.Power.get(runner.instance_id)
                 log.debug(f"VM {runner.name} state: {state}")
             except NotFound:
                 log.info(f"VM {runner.name} not found.")
                 return super().delete(runner)
             if state == Power.Info(state=Power.State.POWERED_ON):
+                self.throttle("update")
                 client.vcenter.vm.Power.stop(runner.instance_id)
             elif state == Power.Info(state=Power.State.SUSPENDED):
+                self.throttle("update")
                 client.vcenter.vm.Power.start(runner.instance_id)
+                self.throttle("update")
                 client.vcenter.vm.Power.stop(runner.instance_id)
             log.info(f"Deleting {runner.name}...")
+            self.throttle("delete")
             client.vcenter.VM.delete(runner.instance_id)
         return super().delete(runner)
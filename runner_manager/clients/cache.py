@@ -0,0 +1,105 @@
+"""Cache of the GitHub API responses shared by all the processes.
+
+Entries are stored in Redis with the time they were fetched at. They are
+kept after their TTL expired, so that the last known good value can be
+returned when GitHub fails to answer.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import BaseModel
+from redis import Redis
+
+log = logging.getLogger(__name__)
+
+
+class CacheEntry(BaseModel):
+    value: Any
+    fetched_at: datetime
+
+    def expired(self, ttl: timedelta) -> bool:
+        return datetime.now(timezone.utc) - self.fetched_at >= ttl
+
+
+class Cache:
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str,
+        retention: timedelta = timedelta(days=7),
+    ):
+        """
+        Args:
+            prefix (str): Prefix of the keys of the entries.
+            retention (timedelta): Time during which an entry is kept
+                after it was fetched, to be used when GitHub fails.
+        """
+        self.redis = redis
+        self.prefix = prefix
+        self.retention = retention
+
+    def key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def get(self, name: str) -> Optional[CacheEntry]:
+        raw = self.redis.get(self.key(name))
+        if raw is None:
+            return None
+        return CacheEntry.parse_raw(raw)
+
+    def set(self, name: str, value: Any) -> CacheEntry:
+        entry = CacheEntry(value=value, fetched_at=datetime.now(timezone.utc))
+        self.redis.set(
+            self.key(name),
+            json.dumps({"value": value, "fetched_at": entry.fetched_at.isoformat()}),
+            ex=self.retention,
+        )
+        return entry
+
+    def fetch(self, name: str, func: Callable[[], Any], ttl: timedelta) -> Any:
+        """Return the cached value, or the value returned by func if the
+        entry is missing or expired.
+
+        If func fails, the expired value is returned if there is one.
+        """
+        return self.fetch_entry(name, func, ttl).value
+
+    def fetch_entry(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        ttl: timedelta,
+        fallback: bool = True,
+    ) -> CacheEntry:
+        """Same as `fetch`, with the time the value was fetched at.
+
+        If fallback is False, the error of func is raised instead of
+        returning the expired value.
+        """
+        entry = self.get(name)
+        if entry is not None and not entry.expired(ttl):
+            return entry
+        try:
+            return self.set(name, func())
+        except Exception as e:
+            if entry is None or not fallback:
+                raise
+            log.warning(f"Failed to refresh {name}, using the last known value: {e}")
+            return entry
+
+    def refresh(self, name: str, func: Callable[[], Any]) -> Any:
+        """Replace the cached value by the value returned by func."""
+        return self.set(name, func()).value
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increment a statistic of the cache, such as its hits."""
+        self.redis.hincrby(self.key("stats"), name, amount)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            name: int(value)
+            for name, value in self.redis.hgetall(self.key("stats")).items()
+        }
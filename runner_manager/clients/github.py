@@ -12,19 +12,31 @@ missing endpoints here.
 
 from __future__ import annotations
 
+import logging
+from datetime import datetime, timedelta, timezone
 from functools import cached_property
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
+import httpx
 from githubkit import GitHub as GitHubKit
 from githubkit.compat import GitHubModel as GitHubRestModel
+from githubkit.exception import RequestFailed
 from githubkit.response import Response
 from githubkit.typing import Missing
 from githubkit.utils import UNSET, exclude_unset
+from githubkit.versions.latest.models import OrgsOrgActionsRunnersGetResponse200
+from githubkit.versions.latest.models import Runner as GitHubRunner
 from githubkit.versions.v2022_11_28.rest import RestNamespace as RestNamespaceKit
 from githubkit.versions.v2022_11_28.rest.actions import (
     ActionsClient as ActionsClientKit,
 )
 
+from runner_manager.clients.cache import Cache
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 
 class RunnerGroup(GitHubRestModel):
     id: Optional[int] = None
@@ -39,12 +51,66 @@ class RunnerGroup(GitHubRestModel):
     runners: Optional[List[int]] = None
 
 
+class RunnerState(GitHubRestModel):
+    status: str
+    busy: bool
+
+
+class RunnersSnapshot(GitHubRestModel):
+    """State of the self-hosted runners of an organization by runner id."""
+
+    runners: Dict[int, RunnerState]
+    fetched_at: datetime
+
+
 class OrgsOrgActionsRunnerGroupsGetResponse200(GitHubRestModel):
     total_count: int
     runner_groups: List[RunnerGroup]
 
 
 class ActionsClient(ActionsClientKit):
+    def get_self_hosted_runner_for_org(
+        self,
+        org: str,
+        runner_id: int,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response[GitHubRunner]:
+        url = f"/orgs/{org}/actions/runners/{runner_id}"
+
+        headers = {"X-GitHub-Api-Version": self._REST_API_VERSION, **(headers or {})}
+
+        return self._github.conditional_get(
+            url,
+            headers=exclude_unset(headers),
+            response_model=GitHubRunner,
+        )
+
+    def list_self_hosted_runners_for_org(
+        self,
+        org: str,
+        name: Missing[str] = UNSET,
+        per_page: Missing[int] = UNSET,
+        page: Missing[int] = UNSET,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response[OrgsOrgActionsRunnersGetResponse200]:
+        url = f"/orgs/{org}/actions/runners"
+
+        params = {
+            "name": name,
+            "per_page": per_page,
+            "page": page,
+        }
+        headers = {"X-GitHub-Api-Version": self._REST_API_VERSION, **(headers or {})}
+
+        return self._github.conditional_get(
+            url,
+            params=exclude_unset(params),
+            headers=exclude_unset(headers),
+            response_model=OrgsOrgActionsRunnersGetResponse200,
+        )
+
     def get_self_hosted_runner_group_for_org(
         self,
         org: str,
@@ -56,8 +122,7 @@ class ActionsClient(ActionsClientKit):
 
         headers = {"X-GitHub-Api-Version": self._REST_API_VERSION, **(headers or {})}
 
-        return self._github.request(
-            "GET",
+        return self._github.conditional_get(
             url,
             headers=exclude_unset(headers),
             response_model=RunnerGroup,
@@ -158,6 +223,158 @@ class RestNamespace(RestNamespaceKit):
 
 
 class GitHub(GitHubKit):
+    def __init__(
+        self,
+        *args: Any,
+        cache: Optional[Cache] = None,
+        download_url_ttl: timedelta = timedelta(hours=1),
+        runners_snapshot_ttl: timedelta = timedelta(minutes=1),
+        **kwargs: Any,
+    ):
+        """
+        Args:
+            cache (Cache): Cache shared with the other processes,
+                responses are not cached if not provided.
+            download_url_ttl (timedelta): Time during which the download
+                urls of the runner applications are cached.
+            runners_snapshot_ttl (timedelta): Time during which the
+                snapshots of the runners of the organizations are cached.
+        """
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+        self.download_url_ttl = download_url_ttl
+        self.runners_snapshot_ttl = runners_snapshot_ttl
+
     @cached_property
     def rest(self) -> RestNamespace:
         return RestNamespace(self)
+
+    def conditional_get(
+        self,
+        url: str,
+        *,
+        response_model: Type[T],
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response[T]:
+        """GET a resource, revalidating the last response with its ETag.
+
+        The ETag, Last-Modified and body of the responses are stored in the
+        cache. When the resource did not change, GitHub answers 304 without
+        counting the request against the rate limit, and the stored body
+        is returned.
+        """
+        if self.cache is None:
+            return self.request(
+                "GET",
+                url,
+                params=params,
+                headers=headers,
+                response_model=response_model,
+            )
+        name = f"etag:{httpx.URL(url, params=params)}"
+        entry = self.cache.get(name)
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.value.get("etag"):
+                request_headers["If-None-Match"] = entry.value["etag"]
+            if entry.value.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry.value["last_modified"]
+        response = self.request(
+            "GET",
+            url,
+            params=params,
+            headers=request_headers,
+            response_model=response_model,
+        )
+        if response.status_code == 304 and entry is not None:
+            self.cache.count("hits")
+            cached = httpx.Response(
+                200,
+                content=entry.value["content"].encode(),
+                headers=response.headers,
+                request=response.raw_request,
+            )
+            return Response(cached, response_model)
+        self.cache.count("misses")
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.cache.set(
+                name,
+                {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "content": response.text,
+                },
+            )
+        return response
+
+    def _runner_download_url(self, org: str, os: str, arch: str) -> str:
+        try:
+            apps = self.rest.actions.list_runner_applications_for_org(
+                org=org
+            ).parsed_data
+        except RequestFailed as e:
+            log.error("Failed to retrieve runner applications")
+            raise e
+        for app in apps:
+            if app.os == os and app.architecture == arch:
+                return app.download_url
+        raise Exception("No runner application found")
+
+    def runner_download_url(self, org: str, os: str, arch: str) -> str:
+        """Return the download url of the runner application.
+
+        The url is cached for `download_url_ttl`, the last known url
+        is returned if GitHub fails to answer.
+        """
+        if self.cache is None:
+            return self._runner_download_url(org, os, arch)
+        return self.cache.fetch(
+            f"download_url:{org}:{os}:{arch}",
+            lambda: self._runner_download_url(org, os, arch),
+            ttl=self.download_url_ttl,
+        )
+
+    def refresh_runner_download_url(self, org: str, os: str, arch: str) -> str:
+        """Retrieve the download url of the runner application and cache it."""
+        if self.cache is None:
+            return self._runner_download_url(org, os, arch)
+        return self.cache.refresh(
+            f"download_url:{org}:{os}:{arch}",
+            lambda: self._runner_download_url(org, os, arch),
+        )
+
+    def _org_runners(self, org: str) -> Dict[str, Dict[str, Any]]:
+        runners: Dict[str, Dict[str, Any]] = {}
+        for runner in self.paginate(
+            self.rest.actions.list_self_hosted_runners_for_org,
+            map_func=lambda r: r.parsed_data.runners,
+            org=org,
+            per_page=100,
+        ):
+            runner: GitHubRunner
+            runners[str(runner.id)] = {"status": runner.status, "busy": runner.busy}
+        return runners
+
+    def runners_snapshot(self, org: str) -> RunnersSnapshot:
+        """Return the state of all the self-hosted runners of the organization.
+
+        The runners are listed once per `runners_snapshot_ttl` for all the
+        runner groups of the organization, instead of one request per runner.
+
+        An expired snapshot is never returned: the status of the runners
+        may have changed since, the error is raised if GitHub fails.
+        """
+        if self.cache is None:
+            return RunnersSnapshot(
+                runners=self._org_runners(org), fetched_at=datetime.now(timezone.utc)
+            )
+        entry = self.cache.fetch_entry(
+            f"runners:{org}",
+            lambda: self._org_runners(org),
+            ttl=self.runners_snapshot_ttl,
+            fallback=False,
+        )
+        return RunnersSnapshot(runners=entry.value, fetched_at=entry.fetched_at)
@@ -0,0 +1,163 @@
+"""Clients of the backends shared by the operations of a process.
+
+Building a client loads its credentials and opens new connections, which
+takes longer than most of the calls made with it. The clients are kept by
+backend, kind of client and hash of the config of the backend, so that
+the backends of the runner groups sharing a config share their clients.
+
+A client is rebuilt once its TTL expired, so that rotated credentials are
+loaded again, or after it was invalidated. The evicted client is closed
+once the operations that may still use it are over, to release its
+connections and sessions.
+
+The workers run the jobs in their own process with `rq.SimpleWorker`, so
+that the clients are reused by the jobs. A forked process, such as the work
+horse of a forking RQ worker, starts without clients: the connections of
+its parent can't be shared with it, nor closed by it.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+Key = Tuple[str, ...]
+
+
+def config_hash(config: Optional[BaseModel]) -> str:
+    """Hash of a config, identifying the clients built from it."""
+    data = config.json(sort_keys=True) if config is not None else ""
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def close(client: Any) -> None:
+    """Close the connections of a client, if it can be closed."""
+    try:
+        if hasattr(client, "close"):
+            client.close()
+        elif hasattr(client, "__exit__"):
+            client.__exit__(None, None, None)
+    except Exception as e:
+        log.warning(f"Failed to close client {type(client).__name__}: {e}")
+
+
+class ClientEntry(NamedTuple):
+    client: Any
+    created_at: float
+
+
+class RetiredClient(NamedTuple):
+    client: Any
+    retired_at: float
+
+
+class ClientRegistry:
+    def __init__(
+        self,
+        ttl: timedelta = timedelta(minutes=15),
+        grace: timedelta = timedelta(minutes=10),
+    ):
+        """
+        Args:
+            ttl (timedelta): Time after which a client is rebuilt, clients
+                are not kept if zero.
+            grace (timedelta): Time an evicted client is kept open, longer
+                than the jobs that may still use it.
+        """
+        self.ttl = ttl
+        self.grace = grace
+        self.clear()
+        os.register_at_fork(after_in_child=self.clear)
+
+    def clear(self, close_clients: bool = False) -> None:
+        """Drop all the clients.
+
+        Args:
+            close_clients (bool): Close the clients, which must not be done
+                in a forked process as it shares them with its parent.
+        """
+        clients = [entry.client for entry in getattr(self, "_clients", {}).values()]
+        clients += [retired.client for retired in getattr(self, "_retired", [])]
+        self._clients: Dict[Key, ClientEntry] = {}
+        # Evicted clients, closed after the grace period.
+        self._retired: List[RetiredClient] = []
+        self._lock = threading.Lock()
+        # Locks of the keys, so that a client is built once at a time.
+        self._building: Dict[Key, threading.Lock] = {}
+        if close_clients:
+            for client in clients:
+                close(client)
+
+    def _lookup(self, key: Key) -> Optional[ClientEntry]:
+        """Return the entry of the key, retiring its client if it expired."""
+        entry = self._clients.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at >= self.ttl.total_seconds():
+            del self._clients[key]
+            self._retired.append(RetiredClient(entry.client, time.monotonic()))
+            return None
+        return entry
+
+    def _close_retired(self) -> None:
+        """Close the clients retired for longer than the grace period."""
+        now = time.monotonic()
+        grace = self.grace.total_seconds()
+        with self._lock:
+            expired = [
+                retired.client
+                for retired in self._retired
+                if now - retired.retired_at >= grace
+            ]
+            self._retired = [
+                retired for retired in self._retired if now - retired.retired_at < grace
+            ]
+        for client in expired:
+            close(client)
+
+    def get(self, key: Key, factory: Callable[[], T]) -> T:
+        """Return the client of the key, built with factory if missing or
+        expired."""
+        if self.ttl <= timedelta():
+            return factory()
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                building = self._building.setdefault(key, threading.Lock())
+        self._close_retired()
+        if entry is not None:
+            return entry.client
+        with building:
+            # Another thread may have built the client while waiting.
+            with self._lock:
+                entry = self._lookup(key)
+            if entry is not None:
+                return entry.client
+            log.debug(f"Building client {key[:2]}")
+            client = factory()
+            with self._lock:
+                self._clients[key] = ClientEntry(client, time.monotonic())
+            return client
+
+    def invalidate(self, key: Key) -> None:
+        """Drop the client of the key, so that it is rebuilt on next use.
+        It is closed after the grace period."""
+        with self._lock:
+            entry = self._clients.pop(key, None)
+            if entry is not None:
+                self._retired.append(RetiredClient(entry.client, time.monotonic()))
+        self._close_retired()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+registry = ClientRegistry()
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Dict, List, Optional
 
 import httpx
 from githubkit.config import Config
@@ -8,8 +9,16 @@ from redis_om import get_redis_connection
 from rq import Queue
 from rq_scheduler import Scheduler
 
+from runner_manager.clients.cache import Cache
 from runner_manager.clients.github import GitHub
+from runner_manager.jobs.serializer import Job, JSONSerializer
 from runner_manager.models.settings import Settings
+from runner_manager.recorder import WebhookRecorder
+
+# Queues consumed by the workers, in order of priority.
+# The first queues receive the jobs creating runners, the last one
+# the periodic jobs (healthchecks, leaks and indexing).
+QUEUES: List[str] = ["queued", "in_progress", "completed", "default", "maintenance"]
 
 
 @lru_cache()
@@ -26,13 +35,47 @@ def get_redis(decode=True) -> Redis:
 
 @lru_cache
 def get_queue() -> Queue:
-    return Queue(connection=get_redis(decode=False))
+    return Queue(
+        connection=get_redis(decode=False), serializer=JSONSerializer, job_class=Job
+    )
+
+
+@lru_cache()
+def get_queues() -> Dict[str, Queue]:
+    """Return the queues by name, using the connection of the default queue."""
+    queue: Queue = get_queue()
+    return {
+        name: Queue(
+            name,
+            connection=queue.connection,
+            is_async=queue.is_async,
+            serializer=queue.serializer,
+            job_class=queue.job_class,
+        )
+        for name in QUEUES
+    }
+
+
+@lru_cache()
+def get_recorder() -> Optional[WebhookRecorder]:
+    settings: Settings = get_settings()
+    if settings.webhook_record_dir is None:
+        return None
+    return WebhookRecorder(settings.webhook_record_dir)
 
 
 @lru_cache()
 def get_scheduler() -> Scheduler:
     queue: Queue = get_queue()
-    return Scheduler(queue=queue, connection=queue.connection)
+    return Scheduler(
+        queue=queue, connection=queue.connection, job_class=queue.job_class
+    )
+
+
+@lru_cache()
+def get_cache() -> Cache:
+    """Return the cache of the GitHub responses, shared by all processes."""
+    return Cache(get_redis(), f"{get_settings().name}:github")
 
 
 @lru_cache()
@@ -45,7 +88,14 @@ def get_github() -> GitHub:
         accept="*/*",
         user_agent="runner-manager",
         timeout=httpx.Timeout(30.0),
-        http_cache=True,
+        # Responses are cached in redis, see Cache.
+        http_cache=False,
         auto_retry=auto_retry,
     )
-    return GitHub(settings.github_auth_strategy(), config=config)
+    return GitHub(
+        settings.github_auth_strategy(),
+        config=config,
+        cache=get_cache(),
+        download_url_ttl=settings.download_url_ttl,
+        runners_snapshot_ttl=settings.runners_snapshot_ttl,
+    )
@@ -0,0 +1,31 @@
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from runner_manager.models import counters
+from runner_manager.models.counters import RunnerCounters
+from runner_manager.models.runner import Runner
+from runner_manager.models.runner_group import RunnerGroup
+
+log = logging.getLogger(__name__)
+
+
+def fetch() -> Tuple[List[Tuple[str, str, str]], Iterable[str]]:
+    runners: List[Runner] = Runner.find().all()
+    groups: List[RunnerGroup] = RunnerGroup.find().all()
+    return (
+        [(runner.pk, runner.runner_group_name, runner.state) for runner in runners],
+        [group.name for group in groups],
+    )
+
+
+def repair() -> Dict[str, RunnerCounters]:
+    """Rebuild the counters of the runner groups from the runners.
+
+    Counters may drift when runners are deleted without going through
+    Runner.delete, e.g. with delete_many or when keys expire.
+    """
+    log.info("Repairing runner counters...")
+    result = counters.rebuild(Runner.db(), Runner.Meta.global_key_prefix, fetch)
+    for group, group_counters in result.items():
+        log.info(f"Runner group {group}: {group_counters}")
+    return result
@@ -0,0 +1,30 @@
+import logging
+from typing import List, Set, Tuple
+
+from runner_manager.clients.github import GitHub
+from runner_manager.dependencies import get_github
+from runner_manager.models.runner_group import RunnerGroup
+
+log = logging.getLogger(__name__)
+
+
+def refresh() -> List[str]:
+    """Refresh the cached download urls of the runner applications
+    used by the runner groups, so that creating a runner does not wait
+    for GitHub.
+
+    Returns:
+        List[str]: The download urls refreshed.
+    """
+    github: GitHub = get_github()
+    groups: List[RunnerGroup] = RunnerGroup.find().all()
+    applications: Set[Tuple[str, str, str]] = {
+        (group.organization, group.os, group.arch) for group in groups
+    }
+    urls: List[str] = []
+    for org, os, arch in sorted(applications):
+        try:
+            urls.append(github.refresh_runner_download_url(org, os, arch))
+        except Exception as e:
+            log.error(f"Failed to refresh the download url for {org} {os} {arch}: {e}")
+    return urls
@@ -0,0 +1,30 @@
+import logging
+from typing import Dict, List
+
+from runner_manager.models.runner_group import RunnerGroup
+
+log = logging.getLogger(__name__)
+
+
+def update() -> Dict[str, int]:
+    """Set the dynamic min of the runner groups from their forecast demand.
+
+    Only the groups with `forecast_min` enabled are updated.
+
+    Returns:
+        Dict[str, int]: The min forecast for each group.
+    """
+    groups: List[RunnerGroup] = RunnerGroup.find().all()
+    mins: Dict[str, int] = {}
+    for group in groups:
+        if not group.forecast_min:
+            continue
+        forecast = group.forecast()
+        log.info(
+            f"Runner group {group.name} expects {forecast.expected:.1f} jobs "
+            f"(ewma: {forecast.ewma:.1f}, seasonal: {forecast.seasonal}), "
+            f"lead time {forecast.lead_time:.0f}s, min set to {forecast.min}"
+        )
+        group.set_dynamic_min(forecast.min)
+        mins[group.name] = group.effective_min
+    return mins
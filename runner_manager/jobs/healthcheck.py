@@ -5,7 +5,9 @@ from redis_om import NotFoundError
 
 from runner_manager import RunnerGroup
 from runner_manager.clients.github import GitHub
-from runner_manager.dependencies import get_github
+from runner_manager.dependencies import get_github, get_settings
+from runner_manager.models.lanes import LaneTimeout
+from runner_manager.models.rate_limit import RateLimitTimeout
 
 log = logging.getLogger(__name__)
 
@@ -19,8 +21,21 @@ def group(pk: str, time_to_live: timedelta, timeout_runner: timedelta):
         timeout_runner (int): Timeout in minutes
     """
     github: GitHub = get_github()
+    settings = get_settings()
     try:
         group = RunnerGroup.get(pk)
-        group.healthcheck(time_to_live, timeout_runner, github)
+        with group.lane(settings.lane_lease):
+            group.healthcheck(
+                time_to_live,
+                timeout_runner,
+                github,
+                concurrency=settings.provisioning_concurrency,
+            )
     except NotFoundError:
         log.error(f"Runner group {pk} not found")
+    except LaneTimeout:
+        # The next healthcheck of the group will run.
+        log.warning(f"Skipping healthcheck of {pk}, its lane is busy")
+    except RateLimitTimeout as e:
+        # The next healthcheck of the group will finish it.
+        log.warning(f"Stopping healthcheck of {pk}: {e}")
@@ -3,6 +3,9 @@ import logging
 from redis_om import NotFoundError
 
 from runner_manager import RunnerGroup
+from runner_manager.dependencies import get_settings
+from runner_manager.models.lanes import LaneTimeout
+from runner_manager.models.rate_limit import RateLimitTimeout
 
 log = logging.getLogger(__name__)
 
@@ -22,8 +25,17 @@ def runner_leaks(pk: str) -> bool:
     except NotFoundError:
         log.error(f"Runner group {pk} not found")
         return False
-    backend_runners = group.backend.list()
-    group_runners = group.get_runners()
+    # Runners created or deleted in between would be reported as leaks.
+    try:
+        with group.lane(get_settings().lane_lease):
+            backend_runners = group.backend.list()
+            group_runners = group.get_runners()
+    except LaneTimeout:
+        log.warning(f"Skipping leaks of {pk}, its lane is busy")
+        return False
+    except RateLimitTimeout as e:
+        log.warning(f"Skipping leaks of {pk}: {e}")
+        return False
     if len(backend_runners) > len(group_runners):
         log.warning(f"Runner group {pk} has leaks")
         for runner in backend_runners:
@@ -4,7 +4,10 @@ from redis_om import NotFoundError
 
 from runner_manager import RunnerGroup
 from runner_manager.clients.github import GitHub
-from runner_manager.dependencies import get_github
+from runner_manager.dependencies import get_github, get_settings
+from runner_manager.jobs.workflow_job import requeue
+from runner_manager.models.lanes import LaneTimeout
+from runner_manager.models.rate_limit import RateLimitTimeout
 
 log = logging.getLogger(__name__)
 
@@ -22,4 +25,8 @@ def group(pk: str):
         log.error(f"Runner group {pk} not found")
         raise
     else:
-        group.reset(github)
+        try:
+            with group.lane(get_settings().lane_lease):
+                group.reset(github)
+        except (LaneTimeout, RateLimitTimeout) as e:
+            requeue("runner_manager.jobs.reset.group", pk, error=e)
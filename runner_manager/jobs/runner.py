@@ -1,19 +1,34 @@
 import logging
 
+from redis_om import NotFoundError
+
 from runner_manager import RunnerGroup
 from runner_manager.clients.github import GitHub
-from runner_manager.dependencies import get_github
+from runner_manager.dependencies import get_github, get_settings
+from runner_manager.jobs.workflow_job import requeue
+from runner_manager.models.lanes import LaneTimeout
+from runner_manager.models.rate_limit import RateLimitTimeout
 
 log = logging.getLogger(__name__)
 
 
-def runner(group: RunnerGroup) -> str | None:
+def runner(pk: str) -> str | None:
     """Job to create a runner within a group.
 
     Args:
-        RunnerGroup: Runner group to create a runner in
+        pk (str): Primary key of the runner group to create a runner in
     """
+    try:
+        group: RunnerGroup = RunnerGroup.get(pk)
+    except NotFoundError:
+        log.error(f"Runner group {pk} not found")
+        return None
     github: GitHub = get_github()
-    runner = group.create_runner(github)
+    try:
+        with group.lane(get_settings().lane_lease):
+            runner = group.create_runner(github)
+    except (LaneTimeout, RateLimitTimeout) as e:
+        requeue("runner_manager.jobs.runner.runner", pk, error=e)
+        return None
     if runner is not None:
         return runner.pk
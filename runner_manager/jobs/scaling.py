@@ -0,0 +1,61 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from redis_om import NotFoundError
+from rq_scheduler import Scheduler
+
+from runner_manager.dependencies import get_scheduler, get_settings
+from runner_manager.jobs import healthcheck
+from runner_manager.models.runner_group import RunnerGroup
+from runner_manager.models.scaling import next_transition
+
+log = logging.getLogger(__name__)
+
+
+def schedule(group: RunnerGroup, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Schedule the transition job of the group at the next time one of its
+    scaling windows starts applying, lead time included, or ends.
+
+    Returns:
+        The time of the transition, None if the group has no window.
+    """
+    at = next_transition(
+        group.scaling_windows or [], now, group.scaling_lead_time or timedelta()
+    )
+    if at is None:
+        return None
+    scheduler: Scheduler = get_scheduler()
+    settings = get_settings()
+    log.info(f"Scheduling scaling transition of group {group.name} at {at}")
+    scheduler.schedule(
+        # rq-scheduler expects naive datetimes in UTC.
+        scheduled_time=at.astimezone(timezone.utc).replace(tzinfo=None),
+        func=transition,
+        args=[group.pk],
+        meta={
+            "type": "scaling",
+            "group": group.name,
+        },
+        queue_name="maintenance",
+        # The transition runs the healthcheck of the group.
+        timeout=settings.healthcheck_timeout.total_seconds(),
+    )
+    return at
+
+
+def transition(pk: str) -> Optional[datetime]:
+    """Job to apply the min of the scaling window of a runner group.
+
+    Runs the healthcheck of the group, which creates or deletes the runners
+    to reach the new min, then schedules the next transition.
+    """
+    try:
+        group = RunnerGroup.get(pk)
+    except NotFoundError:
+        log.error(f"Runner group {pk} not found")
+        return None
+    log.info(f"Runner group {group.name} min set to {group.effective_min}")
+    settings = get_settings()
+    healthcheck.group(pk, settings.time_to_live, settings.timeout_runner)
+    return schedule(group)
@@ -0,0 +1,79 @@
+"""Serialization of the jobs arguments and results.
+
+Jobs are serialized to JSON instead of pickle, values that JSON can't
+represent are tagged with their type:
+
+- datetime: {"__datetime__": "2023-01-01T00:00:00+00:00"}
+- timedelta: {"__timedelta__": 60.0}
+- pydantic models: {"__model__": "module.Class", "data": {...}}
+
+Only pydantic models defined by the runner manager can be loaded.
+"""
+
+import importlib
+import json
+import pickle
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from pydantic import BaseModel
+from rq.job import Job as BaseJob
+
+MODULE_PREFIX = "runner_manager."
+
+
+def encode(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return {"__datetime__": obj.isoformat()}
+    if isinstance(obj, timedelta):
+        return {"__timedelta__": obj.total_seconds()}
+    if isinstance(obj, BaseModel):
+        model = type(obj)
+        return {
+            "__model__": f"{model.__module__}.{model.__qualname__}",
+            "data": obj.dict(),
+        }
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def decode(obj: Dict[str, Any]) -> Any:
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__timedelta__" in obj:
+        return timedelta(seconds=obj["__timedelta__"])
+    if "__model__" in obj:
+        path: str = obj["__model__"]
+        module, _, name = path.rpartition(".")
+        if not module.startswith(MODULE_PREFIX):
+            raise ValueError(f"Model {path} can't be deserialized")
+        model = getattr(importlib.import_module(module), name)
+        if not (isinstance(model, type) and issubclass(model, BaseModel)):
+            raise ValueError(f"{path} is not a model")
+        return model.parse_obj(obj["data"])
+    return obj
+
+
+class JSONSerializer:
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=encode, separators=(",", ":")).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        # Jobs enqueued before the serializer was configured are pickled.
+        if data[:1] == b"\x80":
+            return pickle.loads(data)
+        return json.loads(data, object_hook=decode)
+
+
+class Job(BaseJob):
+    """Job using the JSON serializer by default.
+
+    rq-scheduler does not accept a serializer, it creates and fetches
+    its jobs with the job class.
+    """
+
+    def __init__(self, id=None, connection=None, serializer=None):
+        super().__init__(
+            id, connection=connection, serializer=serializer or JSONSerializer
+        )
@@ -1,8 +1,15 @@
+from typing import List
+
 from pydantic import RedisDsn
 
+from runner_manager.dependencies import QUEUES as RUNNER_MANAGER_QUEUES
 from runner_manager.dependencies import get_settings
 from runner_manager.models.settings import Settings
 
 settings: Settings = get_settings()
 
 REDIS_URL: RedisDsn | None = settings.redis_om_url
+
+# Workers consume the queues in this order, a job is only picked
+# from a queue when all the previous ones are empty.
+QUEUES: List[str] = RUNNER_MANAGER_QUEUES
@@ -2,32 +2,50 @@
 
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from redis_om import Migrator
 from rq.job import Job
 from rq_scheduler import Scheduler
 
 from runner_manager.clients.github import GitHub
-from runner_manager.dependencies import get_github, get_scheduler, get_settings
-from runner_manager.jobs import healthcheck, leaks
+from runner_manager.dependencies import (
+    get_github,
+    get_redis,
+    get_scheduler,
+    get_settings,
+)
+from runner_manager.jobs import (
+    counters,
+    download_url,
+    forecast,
+    healthcheck,
+    leaks,
+    scaling,
+)
+from runner_manager.leader import fence
+from runner_manager.models import demand
+from runner_manager.models.lanes import LaneTimeout
 from runner_manager.models.runner_group import RunnerGroup
 from runner_manager.models.settings import Settings
 
 log = logging.getLogger(__name__)
 
 
-def sync_runner_groups(settings: Settings):
+def sync_runner_groups(settings: Settings | None = None):
     """Sync runner groups between the settings of the database and GitHub.
 
     Args:
-        settings (Settings): Settings of the application
-        github (GitHub): GitHub client
+        settings (Settings): Settings of the application,
+            loaded by the worker if not provided.
     """
+    if settings is None:
+        settings = get_settings()
 
     github: GitHub = get_github()
     runner_groups_configs = settings.runner_groups
     existing_groups: List[RunnerGroup] = RunnerGroup.find().all()
+    synced_groups: List[RunnerGroup] = []
     for runner_group_config in runner_groups_configs:
         if runner_group_config.name in [group.name for group in existing_groups]:
             runner_group: RunnerGroup = RunnerGroup.find_from_base(runner_group_config)
@@ -39,10 +57,21 @@ def sync_runner_groups(settings: Settings):
                 manager=settings.name, **runner_group_config.dict()
             )
             runner_group.save(github=github)
+        synced_groups.append(runner_group)
 
     for runner_group in existing_groups:
         log.info(f"Deleting runner group {runner_group.name}")
-        runner_group.delete(pk=runner_group.pk, github=github)
+        try:
+            runner_group.delete(pk=runner_group.pk, github=github)
+        except LaneTimeout:
+            log.warning(
+                f"Runner group {runner_group.name} is busy, "
+                "it will be deleted by the next synchronization"
+            )
+
+    # Rebuild the routing snapshot from the synced groups,
+    # so that the routing indexes of all processes are rebuilt.
+    RunnerGroup.sync_routing(synced_groups)
 
 
 def bootstrap_scheduler(
@@ -54,7 +83,15 @@ def bootstrap_scheduler(
     for job in jobs:
         # Cancel any existing healthcheck jobs
         job_type = job.meta.get("type")
-        if job_type == "healthcheck" or job_type == "indexing" or job_type == "leaks":
+        if job_type in (
+            "healthcheck",
+            "indexing",
+            "leaks",
+            "counters",
+            "download_url",
+            "forecast",
+            "scaling",
+        ):
             log.info(f"Canceling {job_type} job: {job.id}")
             scheduler.cancel(job)
 
@@ -64,10 +101,46 @@ def bootstrap_scheduler(
         func=indexing,
         interval=settings.indexing_interval.total_seconds(),
         meta={"type": "indexing"},
+        queue_name="maintenance",
         result_ttl=settings.indexing_interval.total_seconds() * 10,
         repeat=None,
     )
+    # Scheduling the repair of the runner counters
+    scheduler.schedule(
+        scheduled_time=datetime.utcnow(),
+        func=counters.repair,
+        interval=settings.healthcheck_interval.total_seconds(),
+        meta={"type": "counters"},
+        queue_name="maintenance",
+        result_ttl=settings.healthcheck_interval.total_seconds() * 10,
+        repeat=None,
+    )
+    # Refresh the download urls before they expire from the cache
+    scheduler.schedule(
+        scheduled_time=datetime.utcnow(),
+        func=download_url.refresh,
+        interval=settings.download_url_ttl.total_seconds() / 2,
+        meta={"type": "download_url"},
+        queue_name="maintenance",
+        result_ttl=settings.download_url_ttl.total_seconds() * 5,
+        repeat=None,
+    )
+    # Forecast the demand of the runner groups for the next period
+    scheduler.schedule(
+        scheduled_time=datetime.utcnow(),
+        func=forecast.update,
+        interval=demand.BUCKET.total_seconds(),
+        meta={"type": "forecast"},
+        queue_name="maintenance",
+        result_ttl=demand.BUCKET.total_seconds() * 10,
+        repeat=None,
+    )
     for group in groups:
+        # Apply the min of the scaling windows ahead of their start
+        scaling.schedule(group)
+        if settings.reconciler:
+            # Healthchecks and leaks are run by the reconcilers.
+            continue
         log.info(f"Scheduling healthcheck for group {group.name}")
         scheduler.schedule(
             scheduled_time=datetime.utcnow(),
@@ -81,6 +154,7 @@ def bootstrap_scheduler(
                 "type": "healthcheck",
                 "group": group.name,
             },
+            queue_name="maintenance",
             interval=settings.healthcheck_interval.total_seconds(),
             # As described in the documentation of rq-scheduler, the result_ttl
             # must be set to a value greater than the interval, otherwise
@@ -88,7 +162,7 @@ def bootstrap_scheduler(
             # rescheduled.
             result_ttl=settings.healthcheck_interval.total_seconds() * 10,
             repeat=None,
-            timeout=settings.healthcheck_interval.total_seconds() / 2,
+            timeout=settings.healthcheck_timeout.total_seconds(),
         )
         log.info(f"Scheduling leaks job for group {group.name}")
         scheduler.schedule(
@@ -99,6 +173,7 @@ def bootstrap_scheduler(
                 "type": "leaks",
                 "group": group.name,
             },
+            queue_name="maintenance",
             interval=settings.healthcheck_interval.total_seconds() * 4,
             result_ttl=60,
             repeat=None,
@@ -120,8 +195,18 @@ def indexing():
     log.info("Indexing job complete.")
 
 
-def startup(settings: Settings = get_settings()):
-    """Bootstrap the application."""
+def startup(settings: Settings = get_settings(), fencing_token: Optional[int] = None):
+    """Bootstrap the application.
+
+    Args:
+        fencing_token (int): Token of the leader enqueuing the startup,
+            the startup is skipped if a more recent leader already ran it.
+    """
+    if fencing_token is not None and not fence(
+        get_redis(), settings.name, fencing_token
+    ):
+        log.warning(f"Skipping startup of a former leader (token {fencing_token})")
+        return
     log.info("Startup initiated.")
     indexing()
     log.info("Creating runner groups...")
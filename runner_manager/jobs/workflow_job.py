@@ -2,28 +2,33 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timedelta
+from typing import List
 
-from githubkit.versions.latest.models import (
-    WebhookWorkflowJobCompleted as WorkflowJobCompleted,
-)
-from githubkit.versions.latest.models import (
-    WebhookWorkflowJobInProgress as WorkflowJobInProgress,
-)
-from githubkit.versions.latest.models import (
-    WebhookWorkflowJobQueued as WorkflowJobQueued,
-)
-from githubkit.versions.latest.webhooks import WorkflowJobEvent
+from redis import Redis
+from rq import Retry, get_current_job
+from rq.job import Job
 
 from runner_manager import Settings
 from runner_manager.clients.github import GitHub
-from runner_manager.dependencies import get_github, get_settings
+from runner_manager.dependencies import (
+    get_github,
+    get_queue,
+    get_queues,
+    get_redis,
+    get_settings,
+)
+from runner_manager.models import lanes
+from runner_manager.models.lanes import LaneTimeout
+from runner_manager.models.rate_limit import RATE_LIMIT_RETRY, RateLimitTimeout
+from runner_manager.models.routing import normalize
 from runner_manager.models.runner import Runner
 from runner_manager.models.runner_group import RunnerGroup
+from runner_manager.models.webhook import WorkflowJobEvents
 
 log = logging.getLogger(__name__)
 
 
-def log_workflow_job(webhook: WorkflowJobEvent) -> None:
+def log_workflow_job(webhook: WorkflowJobEvents) -> None:
     log.info(
         f"Starting workflow_job event (status: {webhook.workflow_job.status}, "
         f"conclusion: {webhook.workflow_job.conclusion}, "
@@ -31,7 +36,22 @@ def log_workflow_job(webhook: WorkflowJobEvent) -> None:
     )
 
 
-def time_to_start(webhook: WorkflowJobEvent) -> timedelta:
+def requeue(func: str, *args, error: Exception) -> Job:
+    """Run the job again on its queue once the lane of its runner group
+    may be free, or the rate limit of its backend refilled, instead of
+    holding the worker while waiting for it."""
+    job = get_current_job()
+    queue = get_queues().get(job.origin, get_queue()) if job else get_queue()
+    delay = (
+        RATE_LIMIT_RETRY if isinstance(error, RateLimitTimeout) else lanes.LANE_RETRY
+    )
+    log.info(f"{type(error).__name__}: {error}, running {func} again in {delay}")
+    return queue.enqueue_in(
+        delay, func, *args, retry=Retry(max=3, interval=[30, 60, 120])
+    )
+
+
+def time_to_start(webhook: WorkflowJobEvents) -> timedelta:
     """From a given webhook, calculate the time it took to start the job"""
 
     if isinstance(webhook.workflow_job.created_at, str):
@@ -50,7 +70,7 @@ def time_to_start(webhook: WorkflowJobEvent) -> timedelta:
     return started_at - created_at
 
 
-def completed(webhook: WorkflowJobCompleted) -> int:
+def completed(webhook: WorkflowJobEvents) -> int:
     log_workflow_job(webhook)
     runner: Runner | None = Runner.find_from_webhook(webhook)
     if not runner:
@@ -62,15 +82,21 @@ def completed(webhook: WorkflowJobCompleted) -> int:
         return 0
     log.info(f"Found {runner_group} for {runner}")
     github: GitHub = get_github()
-    log.info(f"Deleting runner {runner} in group {runner_group}")
-    delete = runner_group.delete_runner(runner, github)
-    if runner_group.need_new_runner:
-        log.info(f"Runner group {runner_group.name} needs a new runner")
-        runner_group.create_runner(github)
+    runner.record("completed")
+    try:
+        with runner_group.lane(get_settings().lane_lease):
+            log.info(f"Deleting runner {runner} in group {runner_group}")
+            delete = runner_group.delete_runner(runner, github)
+            if runner_group.need_new_runner:
+                log.info(f"Runner group {runner_group.name} needs a new runner")
+                runner_group.create_runner(github, replacement=True)
+    except (LaneTimeout, RateLimitTimeout) as e:
+        requeue("runner_manager.jobs.workflow_job.completed", webhook, error=e)
+        return 0
     return delete
 
 
-def in_progress(webhook: WorkflowJobInProgress) -> str | None:
+def in_progress(webhook: WorkflowJobEvents) -> str | None:
     log_workflow_job(webhook)
     settings: Settings = get_settings()
     name: str | None = webhook.workflow_job.runner_name
@@ -78,26 +104,33 @@ def in_progress(webhook: WorkflowJobInProgress) -> str | None:
     if not runner_group:
         log.info(f"Runner group for {name} not found")
         return None
-    log.info(f"Updating runner {name} in group {runner_group.name}")
-    runner: Runner = runner_group.update_runner(webhook=webhook)
-    log.info(f"Runner {name} in group {runner_group.name} has been updated")
-    tts = time_to_start(webhook)
-    log.info(f"{runner} took {tts} to start")
-    # If the time to start is greater than settings.timeout_runner,
-    # create an extra runner.
-    # The main reason we perform this action is to ensure that
-    # in the case we have missed a webhook, we still have a runner
-    # available for the jobs that are requesting it.
-    if tts > settings.timeout_runner and runner_group.is_full is False:
-        log.info(
-            f"Time to start too high ({tts}), creating runner for {runner_group.name}"
-        )
-        github: GitHub = get_github()
-        runner_group.create_runner(github)
+    try:
+        with runner_group.lane(settings.lane_lease):
+            log.info(f"Updating runner {name} in group {runner_group.name}")
+            runner: Runner = runner_group.update_runner(webhook=webhook)
+            log.info(f"Runner {name} in group {runner_group.name} has been updated")
+            tts = time_to_start(webhook)
+            log.info(f"{runner} took {tts} to start")
+            runner_group.record_time_to_start(tts)
+            # If the time to start is greater than settings.timeout_runner,
+            # create an extra runner.
+            # The main reason we perform this action is to ensure that
+            # in the case we have missed a webhook, we still have a runner
+            # available for the jobs that are requesting it.
+            if tts > settings.timeout_runner and runner_group.is_full is False:
+                log.info(
+                    f"Time to start too high ({tts}), "
+                    f"creating runner for {runner_group.name}"
+                )
+                github: GitHub = get_github()
+                runner_group.create_runner(github)
+    except (LaneTimeout, RateLimitTimeout) as e:
+        requeue("runner_manager.jobs.workflow_job.in_progress", webhook, error=e)
+        return None
     return runner.pk
 
 
-def queued(webhook: WorkflowJobQueued) -> str | None:
+def queued(webhook: WorkflowJobEvents) -> str | None:
     log_workflow_job(webhook)
     labels = webhook.workflow_job.labels
     log.info(f"Finding runner group with labels {labels}")
@@ -108,6 +141,60 @@ def queued(webhook: WorkflowJobQueued) -> str | None:
         log.info(f"Runner group with labels {labels} not found")
         return None
     github: GitHub = get_github()
-    log.info(f"Creating runner for {runner_group}")
-    runner: Runner | None = runner_group.create_runner(github)
+    try:
+        with runner_group.lane(get_settings().lane_lease):
+            log.info(f"Creating runner for {runner_group}")
+            runner: Runner | None = runner_group.create_runner(github)
+            runner_group.record_queued()
+    except (LaneTimeout, RateLimitTimeout) as e:
+        requeue("runner_manager.jobs.workflow_job.queued", webhook, error=e)
+        return None
     return runner.pk if runner else None
+
+
+def queued_events_key(settings: Settings, labels: List[str]) -> str:
+    """Key counting the queued events of a label set not yet processed."""
+    return f"{settings.name}:webhook:queued:{','.join(sorted(normalize(labels)))}"
+
+
+def scale(labels: List[str]) -> List[str]:
+    """Scale up the runner group matching labels by the number of
+    queued events received during the coalescing window.
+
+    The counter is read and reset atomically, events received while the
+    job is running start a new window.
+    """
+    settings: Settings = get_settings()
+    redis: Redis = get_redis()
+    key = queued_events_key(settings, labels)
+    count = int(redis.getdel(key) or 0)
+    if count == 0:
+        return []
+    log.info(f"Finding runner group with labels {labels} for {count} queued jobs")
+    runner_group: RunnerGroup = RunnerGroup.find_from_labels(labels)
+    if not runner_group:
+        log.info(f"Runner group with labels {labels} not found")
+        return []
+    github: GitHub = get_github()
+    log.info(f"Scaling up {runner_group} by {count}")
+    # scale_up only raises before reserving the runners, the events are
+    # then given back. Once reserved, the runners not created are added to
+    # the queued runners of the group, created by its healthcheck.
+    try:
+        with runner_group.lane(settings.lane_lease):
+            runners: List[Runner] = runner_group.scale_up(
+                github, count, concurrency=settings.provisioning_concurrency
+            )
+    except LaneTimeout as e:
+        # Give the events back to the job run once the lane is free.
+        redis.incrby(key, count)
+        redis.expire(key, settings.timeout_runner)
+        requeue("runner_manager.jobs.workflow_job.scale", labels, error=e)
+        return []
+    except Exception:
+        # Give the events back so that the retry of the job handles them.
+        redis.incrby(key, count)
+        redis.expire(key, settings.timeout_runner)
+        raise
+    runner_group.record_queued(count)
+    return [runner.pk for runner in runners]
@@ -0,0 +1,191 @@
+"""Election of the replica of the API owning the startup of the application.
+
+The leader holds a lease, the key `{prefix}:leader` expiring after a TTL,
+and renews it periodically. Each new leadership gets a fencing token, a
+number incremented in `{prefix}:leader:token`. The startup job enqueued
+by a leader carries its token, and is skipped if a job of a more recent
+leader already ran, so that a former leader can't reschedule the jobs.
+
+The other replicas only serve the webhooks, and take over the lease when
+the leader stops renewing it.
+
+The replicas of rq-scheduler, enqueuing the periodic jobs, elect their
+leader the same way with `LeaderScheduler`.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import timedelta
+from typing import Callable, Optional
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+from redis import Redis
+from rq_scheduler import Scheduler
+
+log = logging.getLogger(__name__)
+
+# KEYS[1]: lease, KEYS[2]: last token. ARGV: holder, TTL in milliseconds.
+# Renews the lease if held by the holder, acquires it if free. Returns the
+# fencing token of the holder, 0 if the lease is held by another replica.
+ACQUIRE = """
+local value = redis.call('GET', KEYS[1])
+local prefix = ARGV[1] .. '|'
+if value then
+    if string.sub(value, 1, #prefix) ~= prefix then
+        return 0
+    end
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return tonumber(string.sub(value, #prefix + 1))
+end
+local token = redis.call('INCR', KEYS[2])
+redis.call('SET', KEYS[1], prefix .. token, 'PX', ARGV[2])
+return token
+"""
+
+# KEYS[1]: lease. ARGV: value of the lease.
+RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# KEYS[1]: token of the last fenced operation. ARGV: token.
+FENCE = """
+if tonumber(ARGV[1]) < tonumber(redis.call('GET', KEYS[1]) or 0) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class LeaderLease:
+    def __init__(
+        self,
+        db: Redis,
+        prefix: str,
+        ttl: timedelta = timedelta(seconds=30),
+        holder: Optional[str] = None,
+    ):
+        """
+        Args:
+            prefix (str): Prefix of the keys of the lease.
+            ttl (timedelta): Time after which the lease expires if the
+                leader does not renew it.
+            holder (str): Name of the replica, unique per process.
+        """
+        self.db = db
+        self.prefix = prefix
+        self.ttl = ttl
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex}"
+        self.token: Optional[int] = None
+
+    def key(self) -> str:
+        return f"{self.prefix}:leader"
+
+    def token_key(self) -> str:
+        return f"{self.key()}:token"
+
+    @property
+    def is_leader(self) -> bool:
+        return self.token is not None
+
+    def acquire(self) -> Optional[int]:
+        """Acquire or renew the lease.
+
+        Returns:
+            The fencing token of the leadership, None if another replica
+            is the leader.
+        """
+        token = self.db.eval(
+            ACQUIRE,
+            2,
+            self.key(),
+            self.token_key(),
+            self.holder,
+            int(self.ttl.total_seconds() * 1000),
+        )
+        self.token = int(token) or None
+        return self.token
+
+    def release(self) -> None:
+        """Release the lease, so that another replica takes over without
+        waiting for it to expire."""
+        if self.token is not None:
+            self.db.eval(RELEASE, 1, self.key(), f"{self.holder}|{self.token}")
+        self.token = None
+
+
+def fence(db: Redis, prefix: str, token: int) -> bool:
+    """Record that an operation of the leader with the given token runs.
+
+    Returns:
+        bool: False if an operation of a more recent leader already ran.
+    """
+    return bool(db.eval(FENCE, 1, f"{prefix}:leader:fenced", token))
+
+
+def campaign(lease: LeaderLease, on_elected: Callable[[int], None]) -> None:
+    """Acquire or renew the lease, calling on_elected with the fencing
+    token when the replica becomes the leader."""
+    previous = lease.token
+    try:
+        token = lease.acquire()
+    except Exception as e:
+        log.error(f"Failed to renew the leader lease: {e}")
+        lease.token = token = None
+    if token is not None and token != previous:
+        log.info(f"{lease.holder} is the leader (token {token})")
+        on_elected(token)
+    elif token is None and previous is not None:
+        log.warning(f"{lease.holder} is no longer the leader")
+
+
+async def elect(lease: LeaderLease, on_elected: Callable[[int], None]) -> None:
+    """Campaign for the lease forever, renewing it three times per TTL.
+
+    The calls to Redis are made in a thread, off the event loop.
+    """
+    while True:
+        await asyncio.sleep(lease.ttl.total_seconds() / 3)
+        await run_in_threadpool(campaign, lease, on_elected)
+
+
+class LeaderScheduler(Scheduler):
+    """Scheduler enqueuing the periodic jobs only while it holds the lease
+    of the schedulers, so that the other replicas stand by.
+
+    The lease is renewed at each run of the scheduler and lasts three
+    intervals, a replica takes over once the leader missed them.
+    """
+
+    def __init__(self, *args, prefix: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lease = LeaderLease(
+            self.connection,
+            f"{prefix}:scheduler",
+            ttl=timedelta(seconds=self._interval * 3),
+        )
+
+    def acquire_lock(self) -> bool:
+        previous = self.lease.token
+        try:
+            token = self.lease.acquire()
+        except Exception as e:
+            log.error(f"Failed to renew the scheduler lease: {e}")
+            return False
+        if token is None:
+            if previous is not None:
+                log.warning(f"{self.lease.holder} is no longer the scheduler")
+            return False
+        if token != previous:
+            log.info(f"{self.lease.holder} is the scheduler (token {token})")
+        return super().acquire_lock()
+
+    def register_death(self):
+        self.lease.release()
+        super().register_death()
@@ -1,13 +1,16 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from redis import Redis
 from rq import Queue
 from rq.job import Job
 
 from runner_manager import Runner, RunnerGroup, Settings, log
-from runner_manager.dependencies import get_queue, get_redis, get_settings
+from runner_manager.dependencies import get_queue, get_recorder, get_redis, get_settings
 from runner_manager.jobs.startup import startup
+from runner_manager.leader import LeaderLease, campaign, elect
 from runner_manager.routers import (
     _health,
     metrics,
@@ -31,10 +34,22 @@ async def lifespan(app: FastAPI):
     log.info("Configuring redis models")
     Runner.Meta.database = redis
     RunnerGroup.Meta.database = redis
-    job: Job = queue.enqueue(startup, settings=settings)
-    log.info(f"Startup job {job.id} is {job.get_status()}")
+
+    def on_elected(token: int):
+        # Only the leader runs the startup, the settings are loaded by the worker.
+        job: Job = queue.enqueue(startup, fencing_token=token)
+        log.info(f"Startup job {job.id} is {job.get_status()}")
+
+    lease = LeaderLease(redis, settings.name, ttl=settings.leader_lease_ttl)
+    await run_in_threadpool(campaign, lease, on_elected)
+    election = asyncio.create_task(elect(lease, on_elected))
     yield
     log.info(f"Shutting down {settings.name}")
+    election.cancel()
+    await run_in_threadpool(lease.release)
+    recorder = get_recorder()
+    if recorder is not None:
+        recorder.close()
 
 
 app = FastAPI(
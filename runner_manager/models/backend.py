@@ -16,9 +16,10 @@ from mypy_boto3_ec2.type_defs import (
     TagSpecificationTypeDef,
     TagTypeDef,
 )
-from pydantic import BaseModel, BaseSettings
+from pydantic import BaseModel, BaseSettings, Field
 
 from runner_manager.bin import startup_sh
+from runner_manager.models.rate_limit import RateLimit
 from runner_manager.models.runner import Runner
 
 
@@ -37,6 +38,11 @@ class Backends(str, Enum):
 class BackendConfig(BaseModel):
     """Base class for backend configuration."""
 
+    # Max number of operations of the backend in flight per process.
+    max_concurrency: int = Field(default=100, ge=1)
+    # Rate limit of the calls to the API of the backend, unlimited if None.
+    rate_limit: Optional[RateLimit] = None
+
 
 class RunnerEnv(BaseModel):
     """Base class for required runner instance environment variables."""
@@ -1,8 +1,13 @@
-from typing import Optional
+from typing import List, Optional, Sequence, Type, TypeVar
 
 from redis import Redis
 from redis_om import EmbeddedJsonModel, Field, JsonModel
 
+Model = TypeVar("Model", bound="BaseModel")
+
+# Number of documents written per pipeline by bulk_save.
+BULK_CHUNK_SIZE = 500
+
 
 class BaseModel(JsonModel):
     manager: Optional[str] = Field(
@@ -19,6 +24,23 @@ class BaseModel(JsonModel):
         """Post init."""
         self.manager = self.Meta.global_key_prefix
 
+    @classmethod
+    def bulk_save(
+        cls: Type[Model], models: Sequence[Model], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> List[Model]:
+        """Save the models with one round trip per chunk of models.
+
+        Unlike `add`, the `save` method of the model is called with the
+        pipeline, so the extra commands it sends are part of the chunk.
+        """
+        models = list(models)
+        for start in range(0, len(models), chunk_size):
+            pipeline = cls.db().pipeline(transaction=False)
+            for model in models[start : start + chunk_size]:
+                model.save(pipeline=pipeline)
+            pipeline.execute()
+        return models
+
 
 class EmbeddedBaseModel(EmbeddedJsonModel):
     pass
@@ -0,0 +1,165 @@
+"""Counters of the runners of each runner group.
+
+The state of each runner is kept in a hash, `{prefix}:runner_states`,
+mapping the runner primary key to `{group}:{state}`. The counters of a group
+are kept in the hash `{prefix}:runner_counters:{group}`.
+
+Both are updated atomically by Lua scripts whenever a runner is saved or
+deleted, so that reading the counters of a group is O(1).
+"""
+
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import redis
+from pydantic import BaseModel
+from redis import Redis
+from redis.exceptions import WatchError
+
+# KEYS[1]: runner states, KEYS[2]: counters of the group of the runner
+# ARGV: runner pk, group name, state
+# A runner never changes group: if it did, the counters of its former group
+# are not declared and are left to the repair of the counters.
+UPDATE_STATE = """
+local value = ARGV[2] .. ':' .. ARGV[3]
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+if previous == value then
+    return 0
+end
+if previous then
+    local group, state = string.match(previous, '^(.*):([^:]*)$')
+    if group == ARGV[2] then
+        redis.call('HINCRBY', KEYS[2], state, -1)
+        redis.call('HINCRBY', KEYS[2], 'total', -1)
+    end
+end
+redis.call('HINCRBY', KEYS[2], ARGV[3], 1)
+redis.call('HINCRBY', KEYS[2], 'total', 1)
+redis.call('HSET', KEYS[1], ARGV[1], value)
+return 1
+"""
+
+# KEYS[1]: runner states, KEYS[2]: counters of the group of the runner
+# ARGV: runner pk, group name
+DELETE_STATE = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+if not previous then
+    return 0
+end
+local group, state = string.match(previous, '^(.*):([^:]*)$')
+if group ~= ARGV[2] then
+    return 0
+end
+redis.call('HINCRBY', KEYS[2], state, -1)
+redis.call('HINCRBY', KEYS[2], 'total', -1)
+redis.call('HDEL', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class RunnerCounters(BaseModel):
+    total: int = 0
+    offline: int = 0
+    idle: int = 0
+    active: int = 0
+
+    @property
+    def not_active(self) -> int:
+        return self.total - self.active
+
+
+def states_key(prefix: Optional[str]) -> str:
+    return f"{prefix}:runner_states"
+
+
+def counters_key(prefix: Optional[str], group: str = "") -> str:
+    return f"{prefix}:runner_counters:{group}"
+
+
+def update_state(
+    db: Redis,
+    prefix: Optional[str],
+    pk: str,
+    group: str,
+    state: str,
+    pipeline: Optional[redis.client.Pipeline] = None,
+) -> None:
+    """Record the state of a runner and update the counters of its group."""
+    db.register_script(UPDATE_STATE)(
+        keys=[states_key(prefix), counters_key(prefix, group)],
+        args=[pk, group, state],
+        client=pipeline or db,
+    )
+
+
+def delete_state(
+    db: Redis,
+    prefix: Optional[str],
+    pk: str,
+    pipeline: Optional[redis.client.Pipeline] = None,
+) -> None:
+    """Forget a runner and update the counters of its group.
+
+    The group of the runner is read from its state first, so that the
+    script is given the key of the counters of the group.
+    """
+    previous: Optional[str] = db.hget(states_key(prefix), pk)
+    if previous is None:
+        return
+    group = previous.rsplit(":", 1)[0]
+    db.register_script(DELETE_STATE)(
+        keys=[states_key(prefix), counters_key(prefix, group)],
+        args=[pk, group],
+        client=pipeline or db,
+    )
+
+
+def get_counters(db: Redis, prefix: Optional[str], group: str) -> RunnerCounters:
+    counters: Dict[str, str] = db.hgetall(counters_key(prefix, group))
+    return RunnerCounters(**counters)
+
+
+def rebuild(
+    db: Redis,
+    prefix: Optional[str],
+    fetch: Callable[[], Tuple[Iterable[Tuple[str, str, str]], Iterable[str]]],
+    retries: int = 3,
+) -> Dict[str, RunnerCounters]:
+    """Replace the states and the counters by the runners returned by fetch.
+
+    The rebuild is retried if a runner is saved or deleted in the meantime.
+
+    Args:
+        fetch: Returns the pk, group name and state of every runner, and
+            the groups whose counters must exist even without runners.
+
+    Returns:
+        The counters of each group.
+    """
+    for _ in range(retries):
+        with db.pipeline(transaction=True) as pipeline:
+            pipeline.watch(states_key(prefix))
+            runners, groups = fetch()
+            counters: Dict[str, RunnerCounters] = {
+                group: RunnerCounters() for group in groups
+            }
+            states: Dict[str, str] = {}
+            for pk, group, state in runners:
+                group_counters = counters.setdefault(group, RunnerCounters())
+                group_counters.total += 1
+                setattr(group_counters, state, getattr(group_counters, state) + 1)
+                states[pk] = f"{group}:{state}"
+            stale = list(db.scan_iter(f"{counters_key(prefix)}*"))
+            pipeline.multi()
+            pipeline.delete(states_key(prefix), *stale)
+            if states:
+                pipeline.hset(states_key(prefix), mapping=states)
+            for group, group_counters in counters.items():
+                pipeline.hset(
+                    counters_key(prefix, group), mapping=group_counters.dict()
+                )
+            try:
+                pipeline.execute()
+            except WatchError:
+                continue
+            return counters
+    raise WatchError("Runners changed during the rebuild of the counters")
@@ -0,0 +1,175 @@
+"""Demand history and forecast of the runner groups.
+
+The queued workflow jobs of each group are counted in buckets of
+`BUCKET` in the hash `{prefix}:demand:{group}`, the times to start of
+the jobs are kept in the list `{prefix}:demand:{group}:tts`.
+
+The forecast of the number of jobs queued in the next bucket combines:
+
+- an exponentially weighted moving average of the last buckets,
+  following the current trend;
+- a seasonal value, the mean of the same hour of the week in the
+  previous weeks, anticipating the daily and weekly peaks.
+
+The number of idle runners to keep follows Little's law: the jobs
+expected during the time a job waits for a new runner.
+"""
+
+import math
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+from redis import Redis
+
+BUCKET = timedelta(minutes=15)
+WEEK = timedelta(weeks=1)
+# Number of weeks of history kept for the seasonal forecast.
+RETENTION_WEEKS = 4
+# Number of buckets followed by the moving average, and its smoothing.
+EWMA_SPAN = 8
+EWMA_ALPHA = 2 / (EWMA_SPAN + 1)
+# Number of times to start kept to estimate the time to get a new runner.
+TTS_SAMPLES = 500
+TTS_PERCENTILE = 90
+# Time to get a new runner until times to start are recorded.
+DEFAULT_LEAD_TIME = timedelta(minutes=5)
+
+
+class Forecast(BaseModel):
+    ewma: float
+    seasonal: Optional[float]
+    # Jobs expected in the next bucket.
+    expected: float
+    # Time a job waits for a new runner, in seconds.
+    lead_time: float = 0
+    # Idle runners needed to absorb the expected jobs.
+    min: int = 0
+
+
+def demand_key(prefix: Optional[str], group: str) -> str:
+    return f"{prefix}:demand:{group}"
+
+
+def tts_key(prefix: Optional[str], group: str) -> str:
+    return f"{demand_key(prefix, group)}:tts"
+
+
+def bucket_of(timestamp: float) -> int:
+    return int(timestamp // BUCKET.total_seconds())
+
+
+def record_queued(
+    db: Redis,
+    prefix: Optional[str],
+    group: str,
+    timestamp: Optional[float] = None,
+    amount: int = 1,
+) -> None:
+    """Count queued jobs in the current bucket of the group."""
+    bucket = bucket_of(time.time() if timestamp is None else timestamp)
+    db.hincrby(demand_key(prefix, group), str(bucket), amount)
+
+
+def record_time_to_start(
+    db: Redis, prefix: Optional[str], group: str, tts: timedelta
+) -> None:
+    """Keep the time a job of the group waited for a runner."""
+    pipeline = db.pipeline(transaction=False)
+    pipeline.lpush(tts_key(prefix, group), tts.total_seconds())
+    pipeline.ltrim(tts_key(prefix, group), 0, TTS_SAMPLES - 1)
+    pipeline.execute()
+
+
+def history(
+    db: Redis, prefix: Optional[str], group: str, now: Optional[float] = None
+) -> Dict[int, int]:
+    """Return the number of queued jobs by bucket, dropping the buckets
+    older than the retention."""
+    key = demand_key(prefix, group)
+    current = bucket_of(time.time() if now is None else now)
+    oldest = current - buckets_per_week() * RETENTION_WEEKS
+    counts: Dict[int, int] = {}
+    expired: List[str] = []
+    for bucket, count in db.hgetall(key).items():
+        if int(bucket) < oldest:
+            expired.append(bucket)
+        else:
+            counts[int(bucket)] = int(count)
+    if expired:
+        db.hdel(key, *expired)
+    return counts
+
+
+def buckets_per_week() -> int:
+    return int(WEEK / BUCKET)
+
+
+def series(counts: Dict[int, int], start: int, end: int) -> List[int]:
+    """Number of queued jobs of each bucket from start to end excluded."""
+    return [counts.get(bucket, 0) for bucket in range(start, end)]
+
+
+def ewma(values: Sequence[float], alpha: float = EWMA_ALPHA) -> float:
+    level = 0.0
+    for i, value in enumerate(values):
+        level = value if i == 0 else alpha * value + (1 - alpha) * level
+    return level
+
+
+def seasonal(counts: Dict[int, int], bucket: int, first: int) -> Optional[float]:
+    """Mean of the same bucket of the week in the previous weeks recorded."""
+    week = buckets_per_week()
+    values = [
+        counts.get(bucket - weeks * week, 0)
+        for weeks in range(1, RETENTION_WEEKS + 1)
+        if bucket - weeks * week >= first
+    ]
+    if not values:
+        return None
+    return sum(values) / len(values)
+
+
+def predict(
+    counts: Dict[int, int], bucket: int, first: int, end: Optional[int] = None
+) -> Forecast:
+    """Forecast the queued jobs of bucket from the buckets before it.
+
+    Args:
+        counts: Queued jobs by bucket.
+        bucket: The bucket to forecast.
+        first: The first bucket recorded, older buckets are unknown.
+        end: The buckets followed by the moving average end before it,
+            defaults to bucket.
+    """
+    end = bucket if end is None else end
+    level = ewma(series(counts, max(end - EWMA_SPAN * 3, first), end))
+    season = seasonal(counts, bucket, first)
+    expected = level if season is None else (level + season) / 2
+    return Forecast(ewma=level, seasonal=season, expected=expected)
+
+
+def lead_time(db: Redis, prefix: Optional[str], group: str) -> float:
+    """Time a job waits for a new runner, in seconds."""
+    samples = sorted(float(tts) for tts in db.lrange(tts_key(prefix, group), 0, -1))
+    if not samples:
+        return DEFAULT_LEAD_TIME.total_seconds()
+    rank = math.ceil(TTS_PERCENTILE / 100 * len(samples))
+    return samples[max(rank - 1, 0)]
+
+
+def forecast(
+    db: Redis, prefix: Optional[str], group: str, now: Optional[float] = None
+) -> Forecast:
+    """Forecast the demand of the group for the next bucket and the
+    number of idle runners needed to absorb it without waiting."""
+    now = time.time() if now is None else now
+    counts = history(db, prefix, group, now)
+    current = bucket_of(now)
+    # The current bucket is not complete, it is left out of the average.
+    result = predict(counts, current + 1, min(counts, default=current), end=current)
+    result.lead_time = lead_time(db, prefix, group)
+    rate = result.expected / BUCKET.total_seconds()
+    result.min = math.ceil(rate * result.lead_time)
+    return result
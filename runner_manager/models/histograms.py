@@ -0,0 +1,55 @@
+"""Histograms kept in Redis, so that the observations of all the workers
+are exposed by the metrics endpoint.
+
+The buckets of a histogram are counted in a hash, in the fields
+`{label}|...|{upper bound}`, with the sum of the observations in the field
+`{label}|...|sum`. Labels must not contain `|`.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import redis
+from redis import Redis
+
+# Upper bounds of the buckets, in seconds.
+BUCKETS = (1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 3600.0)
+
+Histogram = Tuple[List[Tuple[str, float]], float]
+
+
+def observe(
+    db: Redis,
+    key: str,
+    labels: Sequence[str],
+    value: float,
+    buckets: Sequence[float] = BUCKETS,
+    pipeline: Optional[redis.client.Pipeline] = None,
+) -> None:
+    """Count the value in its bucket of the histogram with the labels."""
+    bound = next((str(b) for b in buckets if value <= b), "+Inf")
+    series = "|".join(labels)
+    client = pipeline or db.pipeline(transaction=True)
+    client.hincrby(key, f"{series}|{bound}", 1)
+    client.hincrbyfloat(key, f"{series}|sum", value)
+    if pipeline is None:
+        client.execute()
+
+
+def histograms(
+    db: Redis, key: str, buckets: Sequence[float] = BUCKETS
+) -> Dict[Tuple[str, ...], Histogram]:
+    """Return the cumulative buckets and the sum of each histogram,
+    by labels."""
+    counts: Dict[Tuple[str, ...], Dict[str, float]] = {}
+    for field, value in db.hgetall(key).items():
+        *labels, name = field.split("|")
+        counts.setdefault(tuple(labels), {})[name] = float(value)
+    result: Dict[Tuple[str, ...], Histogram] = {}
+    for labels, values in counts.items():
+        cumulative: List[Tuple[str, float]] = []
+        total = 0.0
+        for bound in [str(b) for b in buckets] + ["+Inf"]:
+            total += values.get(bound, 0)
+            cumulative.append((bound, total))
+        result[labels] = (cumulative, values.get("sum", 0))
+    return result
@@ -0,0 +1,107 @@
+"""Execution lanes serializing the jobs mutating the runners of a group.
+
+A lane is a lock per runner group, `{prefix}:lane:{group}`, held by the
+jobs while they create, update or delete the runners of the group, so
+that the jobs of a group run one after the other while the jobs of
+different groups run in parallel.
+
+The time waited for the lanes is kept in the histogram
+`{prefix}:lane_waits` and the number of times a lane was already held or
+could not be acquired in the hash `{prefix}:lane_contentions`.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, Iterator, Optional
+
+from redis import Redis
+from redis.exceptions import LockError, LockNotOwnedError
+
+from runner_manager.models import histograms
+
+log = logging.getLogger(__name__)
+
+# Default timeout of the RQ jobs.
+JOB_TIMEOUT = timedelta(seconds=180)
+# Time a lane is kept after the timeout of the job holding it.
+LEASE_MARGIN = timedelta(minutes=1)
+# Time after which a lane is released if the job holding it died, for the
+# default settings, see `Settings.lane_lease`.
+LANE_TIMEOUT = timedelta(minutes=7, seconds=30) + LEASE_MARGIN
+# Time a job waits for a lane before giving up, short so that a worker of
+# the queues creating runners is not held by a slow job of the group.
+LANE_WAIT = timedelta(seconds=2)
+# Time the deletion of a runner group waits for the jobs of the group,
+# below the timeout of the job deleting it.
+DELETE_WAIT = timedelta(seconds=30)
+# Delay before a job that could not get its lane runs again.
+LANE_RETRY = timedelta(seconds=10)
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class LaneTimeout(LockError):
+    """The lane of a runner group could not be acquired in time."""
+
+
+def lane_key(prefix: Optional[str], group: str) -> str:
+    return f"{prefix}:lane:{group}"
+
+
+def waits_key(prefix: Optional[str]) -> str:
+    return f"{prefix}:lane_waits"
+
+
+def contentions_key(prefix: Optional[str]) -> str:
+    return f"{prefix}:lane_contentions"
+
+
+@contextmanager
+def lane(
+    db: Redis,
+    prefix: Optional[str],
+    group: str,
+    timeout: timedelta = LANE_TIMEOUT,
+    wait: timedelta = LANE_WAIT,
+) -> Iterator[None]:
+    """Hold the lane of the group, waiting for the job holding it.
+
+    Args:
+        timeout (timedelta): Lease of the lane, longer than the timeout of
+            the job holding it.
+
+    Raises:
+        LaneTimeout: The lane was held for longer than wait.
+    """
+    lock = db.lock(
+        lane_key(prefix, group),
+        timeout=timeout.total_seconds(),
+        blocking_timeout=wait.total_seconds(),
+        thread_local=False,
+    )
+    start = time.monotonic()
+    if not lock.acquire(blocking=False):
+        db.hincrby(contentions_key(prefix), f"{group}|contended", 1)
+        if not lock.acquire():
+            db.hincrby(contentions_key(prefix), f"{group}|timeout", 1)
+            raise LaneTimeout(f"Timed out waiting for the lane of {group}")
+    histograms.observe(
+        db, waits_key(prefix), (group,), time.monotonic() - start, WAIT_BUCKETS
+    )
+    try:
+        yield
+    finally:
+        try:
+            lock.release()
+        except LockNotOwnedError:
+            log.warning(f"The lane of {group} expired before it was released")
+
+
+def contentions(db: Redis, prefix: Optional[str]) -> Dict[str, Dict[str, int]]:
+    """Number of times the lane of each group was contended or timed out."""
+    result: Dict[str, Dict[str, int]] = {}
+    for field, value in db.hgetall(contentions_key(prefix)).items():
+        group, name = field.split("|")
+        result.setdefault(group, {})[name] = int(value)
+    return result
@@ -0,0 +1,127 @@
+"""Rate limits of the calls of the backends to the cloud APIs.
+
+The calls of a backend to an account or region of its cloud provider share
+a token bucket, the hash `{prefix}:rate_limit:{backend}:{scope}`, so that
+the limit applies to all the workers at once:
+
+    backend:
+      name: gcloud
+      config:
+        rate_limit:
+          rate: 5
+          burst: 20
+
+The bucket holds up to `burst` tokens and is refilled with `rate` tokens
+per second. Each call to the API takes a token, waiting for it when the
+bucket is empty. A job whose call would wait longer than `max_wait` is
+run again later. The time waited is kept in the
+histogram `{prefix}:backend_rate_limit_waits`.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from typing import Optional
+
+from pydantic import BaseModel, Field
+from redis import Redis
+
+from runner_manager.models import histograms
+
+log = logging.getLogger(__name__)
+
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+# Time after which a job given up because of the rate limit runs again.
+RATE_LIMIT_RETRY = timedelta(minutes=1)
+
+# KEYS[1]: bucket. ARGV: rate per second, burst, max wait in seconds.
+# Refills the bucket and takes a token, which may be missing: the caller
+# then waits for it, so that the callers are served in order. Returns the
+# wait in microseconds, -1 without taking the token if it exceeds max wait.
+TAKE = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1]) or burst
+local at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - at, 0) * rate) - 1
+local wait = math.max(-tokens / rate, 0)
+if wait > tonumber(ARGV[3]) then
+    return -1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst / rate + wait) * 1000) + 1000)
+return math.floor(wait * 1000000)
+"""
+
+
+class RateLimit(BaseModel):
+    # Tokens added to the bucket per second.
+    rate: float = Field(gt=0)
+    # Max number of tokens in the bucket, the calls allowed at once.
+    burst: int = Field(default=1, ge=1)
+    # Time a call waits for a token before giving up, shorter than the
+    # timeout of the jobs so that they are enqueued again instead of killed.
+    max_wait: timedelta = timedelta(seconds=30)
+
+
+class RateLimitTimeout(Exception):
+    """A call would wait longer than the max wait of the rate limit."""
+
+
+def bucket_key(prefix: Optional[str], backend: str, scope: str) -> str:
+    return f"{prefix}:rate_limit:{backend}:{scope}"
+
+
+def waits_key(prefix: Optional[str]) -> str:
+    return f"{prefix}:backend_rate_limit_waits"
+
+
+def take(db: Redis, key: str, limit: RateLimit) -> Optional[float]:
+    """Take a token of the bucket.
+
+    Returns:
+        The seconds to wait before using the token, None if it exceeds the
+        max wait of the limit.
+    """
+    wait = int(
+        db.eval(
+            TAKE,
+            1,
+            key,
+            repr(limit.rate),
+            limit.burst,
+            repr(limit.max_wait.total_seconds()),
+        )
+    )
+    return None if wait < 0 else wait / 1_000_000
+
+
+def acquire(
+    db: Redis,
+    prefix: Optional[str],
+    backend: str,
+    scope: str,
+    operation: str,
+    limit: RateLimit,
+) -> float:
+    """Wait for a token of the bucket of the backend and scope.
+
+    Returns:
+        float: The seconds waited.
+
+    Raises:
+        RateLimitTimeout: The token would be available after the max wait.
+    """
+    wait = take(db, bucket_key(prefix, backend, scope), limit)
+    if wait is None:
+        raise RateLimitTimeout(
+            f"Rate limit of {backend} {scope} exceeded for {operation}"
+        )
+    if wait > 0:
+        log.info(f"Waiting {wait:.2f}s for the rate limit of {backend} {scope}")
+        time.sleep(wait)
+    histograms.observe(db, waits_key(prefix), (backend, operation), wait, WAIT_BUCKETS)
+    return wait
@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set
+
+from pydantic import BaseModel
+
+
+class RoutingEntry(BaseModel):
+    pk: str
+    name: str
+    labels: FrozenSet[str]
+
+
+class RoutingIndex:
+    """In memory index of the labels of the runner groups.
+
+    The index is built from a snapshot of the groups identified by a
+    version, it is rebuilt when the version of the snapshot changes.
+    The time the version was last checked is kept so that it is only
+    checked once per TTL.
+    Labels are matched case-insensitively, as GitHub does.
+    """
+
+    def __init__(self):
+        self.key: Optional[str] = None
+        self.version: Optional[int] = None
+        self.checked_at: Optional[float] = None
+        self.entries: Dict[str, RoutingEntry] = {}
+        self.labels: Dict[str, Set[str]] = {}
+        self.lock = threading.Lock()
+
+    def is_current(self, key: str, version: int) -> bool:
+        return self.key == key and self.version == version
+
+    def is_fresh(self, key: str, ttl: float) -> bool:
+        """Whether the version was checked less than ttl seconds ago."""
+        checked_at = self.checked_at
+        return (
+            self.key == key
+            and checked_at is not None
+            and time.monotonic() - checked_at < ttl
+        )
+
+    def checked(self) -> None:
+        """Record that the version of the index was checked."""
+        self.checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Check the version on the next lookup."""
+        self.checked_at = None
+
+    def build(self, key: str, version: int, snapshot: Mapping[str, str]) -> None:
+        """Build the index from the snapshot of the groups."""
+        entries: Dict[str, RoutingEntry] = {}
+        labels: Dict[str, Set[str]] = {}
+        for pk, value in snapshot.items():
+            entry = RoutingEntry(pk=pk, **json.loads(value))
+            entries[pk] = entry
+            for label in entry.labels:
+                labels.setdefault(label, set()).add(pk)
+        with self.lock:
+            self.key, self.version = key, version
+            self.entries, self.labels = entries, labels
+            self.checked_at = time.monotonic()
+
+    def candidates(self, labels: Iterable[str]) -> List[RoutingEntry]:
+        """Return the groups having all the labels, best fit first.
+
+        The best fit is the group with the fewest labels not requested,
+        groups with as many extra labels are ordered by name.
+        """
+        with self.lock:
+            entries, index = self.entries, self.labels
+        requested = normalize(labels)
+        if not requested:
+            return []
+        pks: Optional[Set[str]] = None
+        # Start from the least used label to keep the intersection small.
+        for label in sorted(requested, key=lambda label: len(index.get(label, ()))):
+            matching = index.get(label)
+            if not matching:
+                return []
+            pks = set(matching) if pks is None else pks & matching
+            if not pks:
+                return []
+        return sorted(
+            (entries[pk] for pk in pks or ()),
+            key=lambda entry: (len(entry.labels - requested), entry.name),
+        )
+
+    def route(self, labels: Iterable[str]) -> Optional[RoutingEntry]:
+        """Return the group that best fits the labels."""
+        candidates = self.candidates(labels)
+        return candidates[0] if candidates else None
+
+
+def normalize(labels: Iterable[str]) -> Set[str]:
+    """Labels compared case-insensitively."""
+    return {label.lower() for label in labels}
+
+
+def routing_value(name: str, labels: Iterable[str]) -> str:
+    """Value stored in the routing snapshot for a runner group."""
+    return json.dumps({"name": name, "labels": sorted(normalize(labels))})
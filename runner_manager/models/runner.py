@@ -1,17 +1,19 @@
 import logging
 from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 import redis
 from githubkit.exception import RequestFailed
 from githubkit.versions.latest.models import Runner as GitHubRunner
-from githubkit.versions.latest.webhooks import WorkflowJobEvent
 from pydantic import BaseModel as PydanticBaseModel
 from redis_om import Field, NotFoundError
 
-from runner_manager.clients.github import GitHub
+from runner_manager.clients.github import GitHub, RunnersSnapshot
+from runner_manager.models import counters
 from runner_manager.models.base import BaseModel
+from runner_manager.models.timeline import Event, RunnerTimeline, observe
+from runner_manager.models.webhook import WorkflowJobEvents
 
 log = logging.getLogger(__name__)
 # Ideally the runner model would have been inherited
@@ -70,6 +72,8 @@ class Runner(BaseModel):
     organization: str = Field(default=None, index=True, description="Organization name")
     created_at: Optional[datetime]
     started_at: Optional[datetime]
+    idle_since: Optional[datetime] = None
+    timeline: RunnerTimeline = RunnerTimeline()
     job_started_script: Optional[str] = ""
     job_completed_script: Optional[str] = ""
 
@@ -82,7 +86,7 @@ class Runner(BaseModel):
         return self.id == other.id or self.name == other.name
 
     @classmethod
-    def find_from_webhook(cls, webhook: WorkflowJobEvent) -> "Runner | None":
+    def find_from_webhook(cls, webhook: WorkflowJobEvents) -> "Runner | None":
         """Find a runner from a webhook payload
 
         Args:
@@ -132,6 +136,15 @@ class Runner(BaseModel):
         """
         return self.status == RunnerStatus.online and self.busy is False
 
+    @property
+    def state(self) -> Literal["offline", "idle", "active"]:
+        """State of the runner as counted in the counters of its group."""
+        if self.is_active:
+            return "active"
+        if self.is_idle:
+            return "idle"
+        return "offline"
+
     @property
     def time_since_created(self) -> timedelta:
         """Time since the runner was created
@@ -157,6 +170,13 @@ class Runner(BaseModel):
             return now - self.started_at
         return timedelta()
 
+    @property
+    def time_since_idle(self) -> timedelta:
+        """How long the runner has been idle, as of its last save."""
+        if self.is_idle and self.idle_since:
+            return datetime.now(timezone.utc) - self.idle_since
+        return timedelta()
+
     def time_to_start_expired(self, timeout: timedelta) -> bool:
         return self.is_offline and self.time_since_created > timeout
 
@@ -164,7 +184,10 @@ class Runner(BaseModel):
         return self.is_active and self.time_since_started > time_to_live
 
     def update_from_github(
-        self, github: GitHub, headers: Optional[Dict[str, str]] = None
+        self,
+        github: GitHub,
+        headers: Optional[Dict[str, str]] = None,
+        pipeline: Optional[redis.client.Pipeline] = None,
     ) -> "Runner":
         if self.id is not None:
             try:
@@ -181,7 +204,59 @@ class Runner(BaseModel):
                 self.status = RunnerStatus(github_runner.status)
                 self.busy = github_runner.busy
         log.info(f"Runner {self.name} status updated to {self.status}")
-        return self.save()
+        return self.save(pipeline=pipeline)
+
+    def update_from_snapshot(self, snapshot: RunnersSnapshot) -> bool:
+        """Update the status of the runner from a snapshot of the runners
+        of its organization, without saving it.
+
+        Returns:
+            bool: True if the status of the runner changed.
+        """
+        if self.id is None:
+            return False
+        state = snapshot.runners.get(self.id)
+        if state is not None:
+            status, busy = RunnerStatus(state.status), state.busy
+        elif self.created_at and self.created_at > snapshot.fetched_at:
+            # Registered after the snapshot was taken.
+            return False
+        else:
+            log.info(f"Runner {self.name} does not exist anymore.")
+            status, busy = RunnerStatus.offline, False
+        changed = self.status != status or self.busy != busy
+        self.status, self.busy = status, busy
+        return changed
+
+    def record(
+        self,
+        event: Event,
+        at: Optional[datetime] = None,
+        backend: Optional[str] = None,
+        pipeline: Optional[redis.client.Pipeline] = None,
+    ) -> None:
+        """Record a transition of the lifecycle of the runner, without
+        saving it, and observe the duration of the stage it ends.
+
+        Args:
+            backend: Name of the backend of the runner, if the instance
+                is not created yet.
+        """
+        stage = self.timeline.record(event, at)
+        if stage is None:
+            return
+        name, seconds = stage
+        backend = backend or self.backend or "unknown"
+        # Backends set their name on the runner as a member of Backends.
+        observe(
+            self.db(),
+            self.Meta.global_key_prefix,
+            name,
+            self.runner_group_name,
+            backend.value if isinstance(backend, Enum) else backend,
+            seconds,
+            pipeline=pipeline,
+        )
 
     def generate_jit_config(self, github: GitHub) -> "Runner":
         """Generate JIT config for the runner"""
@@ -210,7 +285,32 @@ class Runner(BaseModel):
         """
         if self.created_at is None:
             self.created_at = datetime.now(timezone.utc)
-        return super().save(pipeline=pipeline)
+        if self.status == RunnerStatus.online:
+            self.record("online", pipeline=pipeline)
+        if self.is_active:
+            self.record("busy", pipeline=pipeline)
+        if not self.is_idle:
+            self.idle_since = None
+        elif self.idle_since is None:
+            self.idle_since = datetime.now(timezone.utc)
+        runner = super().save(pipeline=pipeline)
+        counters.update_state(
+            self.db(),
+            self.Meta.global_key_prefix,
+            self.pk,
+            self.runner_group_name,
+            self.state,
+            pipeline=pipeline,
+        )
+        return runner
+
+    @classmethod
+    def delete(cls, pk: Any, pipeline: Optional[redis.client.Pipeline] = None) -> int:
+        """Delete a runner and remove it from the counters of its group."""
+        counters.delete_state(
+            cls.db(), cls.Meta.global_key_prefix, pk, pipeline=pipeline
+        )
+        return super().delete(pk, pipeline=pipeline)
 
 
 Runner.update_forward_refs()
@@ -1,13 +1,16 @@
+import asyncio
 import logging
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Any, List, Optional, Self, Union
+from typing import Any, Iterator, List, Literal, Optional, Self, Union
 from uuid import uuid4
 
 import redis
 from githubkit import Response
 from githubkit.exception import RequestFailed
-from githubkit.versions.latest.webhooks import WorkflowJobEvent
 from pydantic import BaseModel as PydanticBaseModel
 from pydantic import Field as PydanticField
 from pydantic import root_validator, validator
@@ -23,13 +26,88 @@ from runner_manager.backend.scaleway import ScalewayBackend
 from runner_manager.backend.vsphere import VsphereBackend
 from runner_manager.clients.github import GitHub
 from runner_manager.clients.github import RunnerGroup as GitHubRunnerGroup
+from runner_manager.models import demand, lanes
+from runner_manager.models.backend import BackendConfig
 from runner_manager.models.base import BaseModel
+from runner_manager.models.counters import RunnerCounters, counters_key, get_counters
+from runner_manager.models.routing import RoutingIndex, routing_value
 from runner_manager.models.runner import Runner, RunnerLabel, RunnerStatus
+from runner_manager.models.scaling import ScaleDownPolicy, ScalingWindow, scheduled_min
+from runner_manager.models.webhook import WorkflowJobEvents
 
 log = logging.getLogger(__name__)
 
 regex = re.compile(r"[a-z](?:[-a-z0-9]{0,61}[a-z0-9])?|[1-9][0-9]{0,19}")
 
+# Routing snapshot: KEYS[1] is the snapshot hash, KEYS[2] its version.
+# The version is only incremented when the labels of a group change.
+ROUTING_SET = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    return redis.call('INCR', KEYS[2])
+end
+return 0
+"""
+ROUTING_DELETE = """
+if redis.call('HDEL', KEYS[1], ARGV[1]) == 1 then
+    return redis.call('INCR', KEYS[2])
+end
+return 0
+"""
+
+# Capacity reservation: KEYS[1] is the sorted set of the reservations of the
+# group scored by their expiration, KEYS[2] the counters of the group and
+# KEYS[3] the runner group document.
+# ARGV: token, now, expiration, max, number of runners requested.
+# Grants as many slots as the group can hold, counting its runners and the
+# reservations of other workers, and moves the runners that did not get a
+# slot to the queued runners. Returns the number of slots granted and the
+# new number of queued runners, -1 if the group is not saved.
+RESERVE = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+local count = tonumber(ARGV[5])
+local total = tonumber(redis.call('HGET', KEYS[2], 'total') or 0)
+local available = tonumber(ARGV[4]) - total - redis.call('ZCARD', KEYS[1])
+local granted = math.max(math.min(count, available), 0)
+for i = 1, granted do
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1] .. ':' .. i)
+end
+if granted > 0 then
+    redis.call('EXPIREAT', KEYS[1], math.ceil(tonumber(ARGV[3])))
+end
+local queued = redis.call('JSON.GET', KEYS[3], '$.queued')
+if not queued then
+    return {granted, -1}
+end
+queued = cjson.decode(queued)[1] or 0
+local updated = math.max(queued - granted, 0) + count - granted
+if updated ~= queued then
+    redis.call('JSON.NUMINCRBY', KEYS[3], '$.queued', updated - queued)
+end
+return {granted, updated}
+"""
+
+# Reservations are released once the runner is saved, they only expire
+# when the worker holding them dies.
+RESERVATION_TTL = timedelta(minutes=5)
+
+# The version of the routing snapshot is checked at most once per TTL,
+# groups changed by another process are routed to once it expires.
+ROUTING_TTL = timedelta(seconds=5)
+
+routing_index = RoutingIndex()
+
+
+class ProvisioningResult(PydanticBaseModel):
+    """Outcome of the creation of a runner by `RunnerGroup.create_runners`."""
+
+    runner: Optional[Runner] = None
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
 
 class BaseRunnerGroup(PydanticBaseModel):
     name: str
@@ -50,6 +128,10 @@ class BaseRunnerGroup(PydanticBaseModel):
     labels: List[str]
     job_started_script: Optional[str] = ""
     job_completed_script: Optional[str] = ""
+    forecast_min: Optional[bool] = False
+    scaling_windows: Optional[List[ScalingWindow]] = []
+    scaling_lead_time: Optional[timedelta] = timedelta(minutes=10)
+    scale_down_policy: Optional[ScaleDownPolicy] = ScaleDownPolicy()
 
     backend: Annotated[
         Union[
@@ -74,6 +156,9 @@ class RunnerGroup(BaseModel, BaseRunnerGroup):
     min: int = Field(index=True, ge=0, default=0)
     labels: List[str] = Field(index=True)
     queued: int = Field(default=0, ge=0)
+    dynamic_min: Optional[int] = Field(default=None, ge=0)
+    last_scale_up: Optional[datetime] = None
+    last_scale_down: Optional[datetime] = None
     os: str = Field(default="linux")
     arch: str = Field(default="x64")
     job_started_script: Optional[str] = Field(default="")
@@ -82,7 +167,7 @@ class RunnerGroup(BaseModel, BaseRunnerGroup):
     def __str__(self) -> str:
         return (
             f"{self.name} (max: {self.max}, min: {self.min}, "
-            f"current: {len(self.get_runners())}, queued: {self.queued})"
+            f"current: {self.counters().total}, queued: {self.queued})"
         )
 
     @root_validator(skip_on_failure=True)
@@ -133,52 +218,262 @@ class RunnerGroup(BaseModel, BaseRunnerGroup):
             pass
         return runners
 
+    def counters(self) -> RunnerCounters:
+        """Get the number of runners of the group by state.
+
+        The counters are updated when runners are saved or deleted,
+        reading them does not load the runners.
+        """
+        return get_counters(self.db(), self.Meta.global_key_prefix, self.name)
+
     def download_url(self, github: GitHub) -> str:
-        try:
-            apps = github.rest.actions.list_runner_applications_for_org(
-                org=self.organization
-            ).parsed_data
-            for app in apps:
-                if app.os == self.os and app.architecture == self.arch:
-                    return app.download_url
-        except RequestFailed as e:
-            log.error("Failed to retrieve runner applications")
-            raise e
-        raise Exception("No runner application found")
-
-    def create_runner(self, github: GitHub) -> Runner | None:
+        return github.runner_download_url(self.organization, self.os, self.arch)
+
+    def register_runner(
+        self,
+        github: GitHub,
+        download_url: str,
+        reserved_at: Optional[datetime] = None,
+    ) -> Runner:
+        """Save a new runner and generate its JIT config.
+
+        The runner is not created on the backend.
+
+        Args:
+            reserved_at: Time the slot of the runner was reserved at.
+
+        Returns:
+            Runner: Runner instance.
+        """
+        runner: Runner = Runner(
+            name=self.generate_runner_name(),
+            organization=self.organization,
+            status=RunnerStatus.offline,
+            busy=False,
+            runner_group_id=self.id,
+            created_at=datetime.now(timezone.utc),
+            runner_group_name=self.name,
+            labels=self.runner_labels,
+            manager=self.manager,
+            download_url=download_url,
+            job_started_script=self.job_started_script,
+            job_completed_script=self.job_completed_script,
+        )
+        if reserved_at is not None:
+            runner.record("reserved", reserved_at, backend=self.backend.name)
+        runner.save()
+        runner.generate_jit_config(github)
+        runner.record("jit_generated", backend=self.backend.name)
+        return runner
+
+    def create_instance(self, runner: Runner) -> Runner:
+        """Create the backend instance of a registered runner."""
+        runner.record("create_requested", backend=self.backend.name)
+        runner = self.backend.create(runner)
+        runner.record("created")
+        return runner.save()
+
+    def create_runner(self, github: GitHub, replacement: bool = False) -> Runner | None:
         """Create a runner instance.
 
+        If the group is full, the runner is added to the queued runners.
+        The runner is deleted if its instance can't be created.
+
+        Args:
+            replacement (bool): The runner replaces a deleted runner, the
+                group is not scaled up and its cooldown is kept.
+
         Returns:
             Runner: Runner instance.
         """
-        count = len(self.get_runners())
-        if count < self.max and self.id:
-            runner: Runner = Runner(
-                name=self.generate_runner_name(),
-                organization=self.organization,
-                status=RunnerStatus.offline,
-                busy=False,
-                runner_group_id=self.id,
-                created_at=datetime.now(timezone.utc),
-                runner_group_name=self.name,
-                labels=self.runner_labels,
-                manager=self.manager,
-                download_url=self.download_url(github),
-                job_started_script=self.job_started_script,
-                job_completed_script=self.job_completed_script,
+        tokens = self.reserve()
+        if not tokens:
+            return None
+        reserved_at = datetime.now(timezone.utc)
+        try:
+            runner: Runner = self.register_runner(
+                github, self.download_url(github), reserved_at
             )
-            runner.save()
-            runner.generate_jit_config(github)
-            if self.queued > 0:
-                self.queued -= 1
-                self.save()
-            return self.backend.create(runner)
-        else:
-            self.queued += 1
+        finally:
+            self.release(*tokens)
+        if not replacement:
+            self.record_scale("up")
+        try:
+            return self.create_instance(runner)
+        except Exception:
+            # Such as a rate limit, the job creates another runner later.
+            self.discard_runner(runner, github)
+            raise
+
+    def scale_up(
+        self, github: GitHub, count: int, concurrency: int = 1
+    ) -> List[Runner]:
+        """Create up to `count` runners at once.
+
+        Runners that can't be created because the group is full are added
+        to the queue, the same way `create_runner` does for a single runner.
+        Runners that failed to be created are added back to the queue, so
+        that the healthcheck creates them later. It only raises before the
+        runners are reserved, when none of them was added to the queue.
+
+        Returns:
+            List[Runner]: The runners created.
+        """
+        results = self.create_runners(github, count, concurrency)
+        failed = len([result for result in results if not result.success])
+        if failed:
+            self.increment_queued(failed)
+        if failed < len(results):
+            self.record_scale("up")
+        return [result.runner for result in results if result.success]
+
+    async def acreate_instance(self, runner: Runner) -> Runner:
+        """Create the backend instance of a registered runner, see
+        `create_instance`.
+
+        The runner is recorded and saved in the same thread as the call to
+        the backend, off the event loop.
+        """
+        return await self.backend.run(self.create_instance, runner)
+
+    def create_runners(
+        self, github: GitHub, count: int, concurrency: int = 1
+    ) -> List[ProvisioningResult]:
+        """Create up to `count` runners concurrently, see `acreate_runners`.
+
+        The threads waiting for GitHub and the backend are bounded by
+        `concurrency` and the `max_concurrency` of the backend, the latter
+        being shared by all the calls to the backend in the process.
+        """
+        max_concurrency = (self.backend.config or BackendConfig()).max_concurrency
+        workers = max(min(count, concurrency + max_concurrency), 1)
+        with asyncio.Runner() as runner, ThreadPoolExecutor(workers) as pool:
+            runner.get_loop().set_default_executor(pool)
+            return runner.run(self.acreate_runners(github, count, concurrency))
+
+    async def acreate_runners(
+        self, github: GitHub, count: int, concurrency: int = 1
+    ) -> List[ProvisioningResult]:
+        """Create up to `count` runners concurrently.
+
+        The slots of the runners are reserved at once and the download url
+        is only retrieved once for all the runners. Up to `concurrency` JIT
+        configurations are then generated at once, and the backend
+        instances are created as soon as their runner is registered, up to
+        the `max_concurrency` of the backend.
+
+        The reservation of a runner is released once it is saved or if its
+        registration fails. A runner whose instance can't be created is
+        deleted to free its slot. Once the slots are reserved, failures are
+        only reported in the results.
+
+        Returns:
+            List[ProvisioningResult]: The outcome of each runner created.
+        """
+        tokens = await asyncio.to_thread(self.reserve, count)
+        if not tokens:
+            return []
+        reserved_at = datetime.now(timezone.utc)
+        try:
+            download_url = await asyncio.to_thread(self.download_url, github)
+        except Exception as e:
+            log.error(f"Failed to get the download url for {self.name}: {e}")
+            await asyncio.to_thread(self.release, *tokens)
+            return [ProvisioningResult(error=str(e)) for _ in tokens]
+        registrations = asyncio.Semaphore(concurrency)
+
+        async def provision(token: str) -> ProvisioningResult:
+            try:
+                async with registrations:
+                    runner: Runner = await asyncio.to_thread(
+                        self.register_runner, github, download_url, reserved_at
+                    )
+            except Exception as e:
+                log.error(f"Failed to register a runner for {self.name}: {e}")
+                return ProvisioningResult(error=str(e))
+            finally:
+                await asyncio.to_thread(self.release, token)
+            try:
+                return ProvisioningResult(runner=await self.acreate_instance(runner))
+            except Exception as e:
+                log.error(f"Failed to create runner {runner.name}: {e}")
+                await self.backend.run(self.discard_runner, runner, github)
+                return ProvisioningResult(runner=runner, error=str(e))
+
+        results = list(await asyncio.gather(*(provision(token) for token in tokens)))
+        log.info(
+            f"Created {len([result for result in results if result.success])}"
+            f"/{len(results)} runners for {self.name}"
+        )
+        return results
+
+    def discard_runner(self, runner: Runner, github: GitHub) -> None:
+        """Delete a runner whose instance could not be created."""
+        try:
+            self.delete_runner(runner, github)
+        except Exception as e:
+            log.warning(f"Failed to delete runner {runner.name}: {e}")
+            Runner.delete(runner.pk)
+
+    def reservations_key(self) -> str:
+        return f"{self.Meta.global_key_prefix}:reservations:{self.name}"
+
+    def reserve(self, count: int = 1) -> List[str]:
+        """Atomically reserve slots for up to `count` runners.
+
+        Concurrent workers can't reserve more slots than the max of the
+        group. Runners that get a slot are removed from the queued runners,
+        the others are added to them.
+
+        Reservations must be released with `release` once the runner is
+        saved or if it can't be created.
+
+        Returns:
+            List[str]: The reservation tokens, one per slot.
+        """
+        token = str(uuid4())
+        now = time.time()
+        granted, queued = self.db().register_script(RESERVE)(
+            keys=[
+                self.reservations_key(),
+                counters_key(self.Meta.global_key_prefix, self.name),
+                self.key(),
+            ],
+            args=[
+                token,
+                now,
+                now + RESERVATION_TTL.total_seconds(),
+                self.max if self.id else 0,
+                count,
+            ],
+        )
+        granted, queued = int(granted), int(queued)
+        if queued < 0:
+            # The group is not saved yet, nobody else can update it.
+            self.queued = max(self.queued - granted, 0) + count - granted
             self.save()
+        else:
+            self.queued = queued
+        return [f"{token}:{i}" for i in range(1, granted + 1)]
 
-    def update_runner(self: Self, webhook: WorkflowJobEvent) -> Runner:
+    def release(self, *tokens: str) -> None:
+        """Release reserved slots."""
+        if tokens:
+            self.db().zrem(self.reservations_key(), *tokens)
+
+    def increment_queued(self, amount: int = 1) -> int:
+        """Atomically increment the number of queued runners in the database.
+
+        Unlike `save`, concurrent increments are never lost.
+
+        Returns:
+            int: The new number of queued runners.
+        """
+        result = self.db().json().numincrby(self.key(), "$.queued", amount)
+        self.queued = int(result[0])
+        return self.queued
+
+    def update_runner(self: Self, webhook: WorkflowJobEvents) -> Runner:
         """Update a runner instance.
 
         Returns:
@@ -216,7 +511,9 @@ class RunnerGroup(BaseModel, BaseRunnerGroup):
                 github.rest.actions.delete_self_hosted_runner_from_org(
                     org=self.organization, runner_id=runner.id
                 )
-        return self.backend.delete(runner)
+        deleted = self.backend.delete(runner)
+        runner.record("deleted")
+        return deleted
 
     def find_github_group(self, github: GitHub) -> GitHubRunnerGroup | None:
         """
@@ -236,15 +533,98 @@ class RunnerGroup(BaseModel, BaseRunnerGroup):
 
     @property
     def need_new_runner(self) -> bool:
-        runners = self.get_runners()
-        not_active = len([runner for runner in runners if runner.is_active is False])
-        count = len(runners)
-        return (not_active < self.min or self.queued > 0) and count < self.max
+        counters = self.counters()
+        return (
+            counters.not_active < self.effective_min or self.queued > 0
+        ) and counters.total < self.max
+
+    @property
+    def effective_min(self) -> int:
+        """Min of the group, replaced by the min of the scaling window
+        applying now and raised to the forecast demand if enabled.
+
+        The max remains the bound of both.
+        """
+        value = self.scheduled_min()
+        if self.forecast_min and self.dynamic_min is not None:
+            value = max(value, self.dynamic_min)
+        return min(value, self.max)
+
+    def scheduled_min(self, at: Optional[datetime] = None) -> int:
+        """Min of the scaling windows applying at the given time,
+        lead time included, or the min of the group."""
+        return scheduled_min(
+            self.scaling_windows or [],
+            self.min,
+            at,
+            self.scaling_lead_time or timedelta(),
+        )
+
+    def set_dynamic_min(self, value: int) -> None:
+        """Store the min forecast for the group without saving the rest
+        of the document."""
+        self.db().json().set(self.key(), "$.dynamic_min", value)
+        self.dynamic_min = value
+
+    def record_scale(
+        self, direction: Literal["up", "down"], at: Optional[datetime] = None
+    ) -> None:
+        """Store the time of the last scale-up or scale-down of the group
+        without saving the rest of the document."""
+        at = datetime.now(timezone.utc) if at is None else at
+        self.db().json().set(self.key(), f"$.last_scale_{direction}", at.isoformat())
+        setattr(self, f"last_scale_{direction}", at)
+
+    @contextmanager
+    def lane(
+        self,
+        lease: timedelta = lanes.LANE_TIMEOUT,
+        wait: timedelta = lanes.LANE_WAIT,
+    ) -> Iterator[None]:
+        """Serialize the jobs mutating the runners of the group.
+
+        Args:
+            lease (timedelta): Time after which the lane is released if the
+                job died, see `Settings.lane_lease`.
+
+        Raises:
+            LaneTimeout: Another job held the lane for longer than wait.
+        """
+        with lanes.lane(self.db(), self.Meta.global_key_prefix, self.name, lease, wait):
+            yield
+
+    def record_queued(self, amount: int = 1) -> None:
+        """Record queued jobs in the demand history of the group."""
+        demand.record_queued(
+            self.db(), self.Meta.global_key_prefix, self.name, amount=amount
+        )
+
+    def record_time_to_start(self, tts: timedelta) -> None:
+        """Record the time a job of the group waited for a runner."""
+        demand.record_time_to_start(
+            self.db(), self.Meta.global_key_prefix, self.name, tts
+        )
+
+    def forecast(self) -> demand.Forecast:
+        return demand.forecast(self.db(), self.Meta.global_key_prefix, self.name)
+
+    @property
+    def deficit(self) -> int:
+        """Number of runners to create to satisfy the effective min of the
+        group and the queued runners, without exceeding the max."""
+        counters = self.counters()
+        return max(
+            min(
+                max(self.effective_min - counters.not_active, self.queued),
+                self.max - counters.total,
+            ),
+            0,
+        )
 
     @property
     def is_full(self) -> bool:
         """Return True if the max number of runners has been reached."""
-        return len(self.get_runners()) >= self.max
+        return self.counters().total >= self.max
 
     def create_github_group(self, github: GitHub) -> GitHubRunnerGroup:
         """Create a GitHub runner group."""
@@ -287,10 +667,57 @@ class RunnerGroup(BaseModel, BaseRunnerGroup):
         if github:
             github_group: GitHubRunnerGroup = self.create_github_group(github)
             self.id = github_group.id
-        return super().save(pipeline=pipeline)
+        group = super().save(pipeline=pipeline)
+        self.db().register_script(ROUTING_SET)(
+            keys=self.routing_keys(),
+            args=[self.pk, routing_value(self.name, self.labels)],
+            client=pipeline or self.db(),
+        )
+        routing_index.invalidate()
+        return group
+
+    @classmethod
+    def routing_keys(cls) -> List[str]:
+        """Keys of the routing snapshot and of its version."""
+        key = f"{cls.Meta.global_key_prefix}:routing"
+        return [key, f"{key}:version"]
+
+    @classmethod
+    def routing(cls) -> RoutingIndex:
+        """Return the routing index, rebuilt if the groups changed.
+
+        The version of the snapshot is read at most once per `ROUTING_TTL`,
+        the index is invalidated when the groups are changed locally.
+        """
+        db = cls.db()
+        key, version_key = cls.routing_keys()
+        if routing_index.is_fresh(key, ROUTING_TTL.total_seconds()):
+            return routing_index
+        version = int(db.get(version_key) or 0)
+        if routing_index.is_current(key, version):
+            routing_index.checked()
+        else:
+            pipeline = db.pipeline(transaction=True)
+            pipeline.get(version_key)
+            pipeline.hgetall(key)
+            version, snapshot = pipeline.execute()
+            routing_index.build(key, int(version or 0), snapshot)
+        return routing_index
 
     @classmethod
-    def find_from_webhook(cls, webhook: WorkflowJobEvent) -> "RunnerGroup | None":
+    def sync_routing(cls, groups: List["RunnerGroup"]) -> None:
+        """Replace the routing snapshot by the given groups."""
+        key, version_key = cls.routing_keys()
+        pipeline = cls.db().pipeline(transaction=True)
+        pipeline.delete(key)
+        for group in groups:
+            pipeline.hset(key, group.pk, routing_value(group.name, group.labels))
+        pipeline.incr(version_key)
+        pipeline.execute()
+        routing_index.invalidate()
+
+    @classmethod
+    def find_from_webhook(cls, webhook: WorkflowJobEvents) -> "RunnerGroup | None":
         """Find the runner group from a webhook instance.
 
         Args:
@@ -310,54 +737,139 @@ class RunnerGroup(BaseModel, BaseRunnerGroup):
         return group
 
     @classmethod
-    def find_from_labels(cls, labels: List[str]) -> "RunnerGroup":
+    def find_from_labels(cls, labels: List[str]) -> "RunnerGroup | None":
         """Find the runner group from a list of labels.
 
+        The group is looked up in the routing index, among the groups
+        having all the labels the one with the fewest extra labels is
+        returned.
+
         Args:
             labels (List[str]): List of labels.
 
         Returns:
             RunnerGroup: Runner group instance.
         """
-        try:
-            group: RunnerGroup | None = cls.find(
-                *(cls.labels << label for label in labels)  # pyright: ignore
-            ).first()
-        except NotFoundError:
-            group = None
-        return group
+        for entry in cls.routing().candidates(labels):
+            try:
+                return cls.get(entry.pk)
+            except NotFoundError:
+                # The group was deleted without updating the routing snapshot.
+                log.warning(f"Runner group {entry.name} not found")
+        return None
 
     def healthcheck(
-        self, time_to_live: timedelta, timeout_runner: timedelta, github: GitHub
+        self,
+        time_to_live: timedelta,
+        timeout_runner: timedelta,
+        github: GitHub,
+        concurrency: int = 1,
     ):
-        """Healthcheck runner group."""
+        """Healthcheck runner group.
+
+        The status of the runners is read from the snapshot of the runners
+        of the organization, only the runners whose status changed are saved,
+        along with the idle runners whose idle time is unknown.
+        Missing runners are created by batch, see `create_runners`, the
+        group is only scaled up when it gets more runners than it deleted.
+
+        The runners are left untouched if the snapshot can not be refreshed,
+        an outdated status could lead to delete busy runners.
+        """
         runners = self.get_runners()
+        try:
+            snapshot = github.runners_snapshot(self.organization)
+        except Exception as e:
+            log.warning(
+                f"Skipping healthcheck of {self.name}, "
+                f"failed to list the runners of {self.organization}: {e}"
+            )
+            return
+        Runner.bulk_save(
+            [
+                runner
+                for runner in runners
+                if runner.update_from_snapshot(snapshot)
+                # Runners idle before idle_since was recorded.
+                or (runner.is_idle and runner.idle_since is None)
+            ]
+        )
+        deleted = 0
         for runner in runners:
-            runner.update_from_github(github)
             if runner.time_to_live_expired(time_to_live):
                 self.delete_runner(runner, github)
-            if runner.time_to_start_expired(timeout_runner):
+                deleted += 1
+            elif runner.time_to_start_expired(timeout_runner):
                 self.delete_runner(runner, github)
-        while self.need_new_runner:
-            runner: Runner = self.create_runner(github)
-            if runner:
-                log.info(f"Runner {runner.name} created")
+                deleted += 1
+        deficit = self.deficit
+        if deficit > 0:
+            created = 0
+            for result in self.create_runners(github, deficit, concurrency):
+                if result.success and result.runner:
+                    log.info(f"Runner {result.runner.name} created")
+                    created += 1
+            # Replacing the deleted runners is not a scale-up, it would
+            # restart the cooldown of the group at each healthcheck.
+            if created > deleted:
+                self.record_scale("up")
+        self.scale_down(github)
+
+    def scale_down(self, github: GitHub) -> List[Runner]:
+        """Delete the idle runners above the effective min of the group.
+
+        Following the scale-down policy of the group, no runner is deleted
+        during the cooldown after a scale-up, only the runners idle for
+        long enough are deleted, the longest idle first, and at most
+        `max_deletions` of them.
+
+        Returns:
+            List[Runner]: The runners deleted.
+        """
+        policy = self.scale_down_policy or ScaleDownPolicy()
         idle_runners = [runner for runner in self.get_runners() if runner.is_idle]
-        # check if there's more idle runners than the minimum
-        while len(idle_runners) > self.min:
-            runner = idle_runners.pop()
+        excess = len(idle_runners) - self.effective_min
+        if excess <= 0:
+            return []
+        if policy.cooling_down(self.last_scale_up):
+            log.info(f"Runner group {self.name} scaled up recently, not scaling down")
+            return []
+        if policy.max_deletions is not None:
+            excess = min(excess, policy.max_deletions)
+        candidates = sorted(
+            (
+                runner
+                for runner in idle_runners
+                if runner.time_since_idle >= policy.idle_age
+            ),
+            key=lambda runner: runner.time_since_idle,
+            reverse=True,
+        )
+        deleted = candidates[:excess]
+        for runner in deleted:
             self.delete_runner(runner, github)
             log.info(f"Deleted idle {runner}")
+        if deleted:
+            self.record_scale("down")
+        return deleted
 
     def reset(self, github: GitHub):
-        """Reset runner group."""
-        for runner in self.get_runners():
+        """Reset runner group.
+
+        The inactive runners are replaced, the document of the group is
+        only updated through `create_runner`, so that concurrent changes
+        of its counters are kept.
+        """
+        runners = self.get_runners()
+        pipeline = self.db().pipeline(transaction=False)
+        for runner in runners:
             if runner.id is not None:
-                runner.update_from_github(github)
+                runner.update_from_github(github, pipeline=pipeline)
+        pipeline.execute()
+        for runner in runners:
             if not runner.is_active:
                 self.delete_runner(runner, github)
-                self.create_runner(github)
-                self.save()
+                self.create_runner(github, replacement=True)
 
     @classmethod
     def find_from_base(cls, basegroup: "BaseRunnerGroup") -> "RunnerGroup":
@@ -414,15 +926,24 @@ class RunnerGroup(BaseModel, BaseRunnerGroup):
             pk (Any): Runner group primary key.
             github (GitHub): GitHub instance.
 
+        Raises:
+            LaneTimeout: The jobs of the group did not release its lane in
+                time, the group is left untouched.
+
         Returns: int
         """
         group: RunnerGroup = cls.get(pk)
-        runners: List[Runner] = group.get_runners()
         if github:
-            for runner in runners:
-                group.delete_runner(runner, github)
+            # Wait for the jobs of the group, within the job deleting it.
+            with group.lane(wait=lanes.DELETE_WAIT):
+                for runner in group.get_runners():
+                    group.delete_runner(runner, github)
             group.delete_github_group(github)
         db = cls._get_db(pipeline)
+        cls.db().register_script(ROUTING_DELETE)(
+            keys=cls.routing_keys(), args=[pk], client=db
+        )
+        routing_index.invalidate()
 
         return cls._delete(db, cls.make_primary_key(pk))
 
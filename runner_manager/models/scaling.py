@@ -0,0 +1,138 @@
+"""Scheduled scaling windows and scale-down policies of the runner groups.
+
+A window raises the min of a group on given days between two times of the
+day, in the timezone of the window:
+
+    scaling_windows:
+      - days: mon-fri
+        start: "08:00"
+        end: "19:00"
+        timezone: Europe/Paris
+        min: 25
+
+The min of the window applies from its start minus the lead time of the
+group, so that the runners have booted when the window starts. Outside of
+the windows, the min of the group applies.
+
+The idle runners above the min are deleted following the scale-down
+policy of the group, so that a runner is not destroyed right before the
+next burst of jobs:
+
+    scale_down_policy:
+      idle_age: "00:05:00"
+      cooldown: "00:10:00"
+      max_deletions: 5
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pydantic import BaseModel, Field, validator
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+class ScalingWindow(BaseModel):
+    days: List[str] = WEEKDAYS
+    start: time
+    end: time
+    timezone: str = "UTC"
+    min: int = Field(ge=0)
+
+    @validator("days", pre=True)
+    def parse_days(cls, v):
+        """Accept day names and ranges, such as `mon-fri` or `sat,sun`."""
+        if isinstance(v, str):
+            v = v.split(",")
+        days: List[str] = []
+        for item in v:
+            first, _, last = str(item).strip().lower().partition("-")
+            last = last or first
+            if first not in WEEKDAYS or last not in WEEKDAYS:
+                raise ValueError(f"Invalid day {item}, expected one of {WEEKDAYS}")
+            start, end = WEEKDAYS.index(first), WEEKDAYS.index(last)
+            if end < start:
+                end += len(WEEKDAYS)
+            days.extend(WEEKDAYS[i % len(WEEKDAYS)] for i in range(start, end + 1))
+        return [day for day in WEEKDAYS if day in days]
+
+    @validator("timezone")
+    def validate_timezone(cls, v):
+        try:
+            ZoneInfo(v)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone {v}")
+        return v
+
+    def occurrences(self, at: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """Start and end of the occurrences of the window, from the one
+        starting the day before at in the timezone of the window.
+
+        A window ending before its start ends on the next day.
+        """
+        tz = ZoneInfo(self.timezone)
+        first: date = at.astimezone(tz).date() - timedelta(days=1)
+        for offset in range(len(WEEKDAYS) + 2):
+            day = first + timedelta(days=offset)
+            if WEEKDAYS[day.weekday()] not in self.days:
+                continue
+            start = datetime.combine(day, self.start, tzinfo=tz)
+            end = datetime.combine(day, self.end, tzinfo=tz)
+            if end <= start:
+                end = datetime.combine(day + timedelta(days=1), self.end, tzinfo=tz)
+            yield start, end
+
+    def active(self, at: datetime, lead_time: timedelta = timedelta()) -> bool:
+        """Whether the window applies at the given time, lead time included."""
+        return any(start - lead_time <= at < end for start, end in self.occurrences(at))
+
+
+def scheduled_min(
+    windows: Sequence[ScalingWindow],
+    default: int,
+    at: Optional[datetime] = None,
+    lead_time: timedelta = timedelta(),
+) -> int:
+    """Min of the windows applying at the given time, default otherwise.
+
+    If several windows apply, the highest min is used.
+    """
+    at = datetime.now(timezone.utc) if at is None else at
+    mins = [window.min for window in windows if window.active(at, lead_time)]
+    return max(mins) if mins else default
+
+
+def next_transition(
+    windows: Sequence[ScalingWindow],
+    at: Optional[datetime] = None,
+    lead_time: timedelta = timedelta(),
+) -> Optional[datetime]:
+    """Next time a window starts applying, lead time included, or ends."""
+    at = datetime.now(timezone.utc) if at is None else at
+    transitions = [
+        transition
+        for window in windows
+        for start, end in window.occurrences(at)
+        for transition in (start - lead_time, end)
+        if transition > at
+    ]
+    return min(transitions, default=None)
+
+
+class ScaleDownPolicy(BaseModel):
+    # Time a runner must have been idle before it can be deleted.
+    idle_age: timedelta = timedelta(minutes=5)
+    # Time after the last scale-up during which no runner is deleted.
+    cooldown: timedelta = timedelta(minutes=10)
+    # Max number of runners deleted by healthcheck, unlimited if None.
+    max_deletions: Optional[int] = Field(default=None, ge=1)
+
+    def cooling_down(
+        self, last_scale_up: Optional[datetime], at: Optional[datetime] = None
+    ) -> bool:
+        """Whether the group scaled up less than the cooldown ago."""
+        if last_scale_up is None:
+            return False
+        at = datetime.now(timezone.utc) if at is None else at
+        return at - last_scale_up < self.cooldown
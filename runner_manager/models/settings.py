@@ -6,6 +6,7 @@ import yaml
 from githubkit import AppInstallationAuthStrategy, TokenAuthStrategy
 from pydantic import AnyHttpUrl, BaseSettings, ConfigError, Field, RedisDsn, SecretStr
 
+from runner_manager.models import lanes
 from runner_manager.models.runner_group import BaseRunnerGroup
 
 
@@ -37,6 +38,14 @@ class Settings(BaseSettings):
     indexing_interval: timedelta = timedelta(minutes=15)
     github_base_url: Optional[AnyHttpUrl] = Field(default="https://api.github.com")
     github_webhook_secret: Optional[SecretStr] = None
+    webhook_delivery_ttl: timedelta = timedelta(hours=24)
+    queued_coalescing_window: timedelta = timedelta(seconds=2)
+    webhook_defer_queue_depth: Optional[int] = Field(default=None, ge=0)
+    webhook_reject_queue_depth: Optional[int] = Field(default=10000, ge=0)
+    webhook_record_dir: Optional[Path] = None
+    provisioning_concurrency: int = Field(default=10, ge=1)
+    reconciler: bool = False
+    leader_lease_ttl: timedelta = timedelta(seconds=30)
     github_token: Optional[SecretStr] = None
     github_app_id: int | str = 0
     github_private_key: SecretStr = SecretStr("")
@@ -44,6 +53,18 @@ class Settings(BaseSettings):
     github_client_id: Optional[str] = None
     github_client_secret: SecretStr = SecretStr("")
     github_auto_retry: bool = True
+    download_url_ttl: timedelta = timedelta(hours=1)
+    runners_snapshot_ttl: timedelta = timedelta(minutes=1)
+
+    @property
+    def healthcheck_timeout(self) -> timedelta:
+        return self.healthcheck_interval / 2
+
+    @property
+    def lane_lease(self) -> timedelta:
+        """Time after which the lane of a runner group is released if the
+        job holding it died: after the timeout of the longest jobs."""
+        return max(self.healthcheck_timeout, lanes.JOB_TIMEOUT) + lanes.LEASE_MARGIN
 
     @property
     def app_install(self) -> bool:
@@ -0,0 +1,109 @@
+"""Lifecycle timeline of the runners and latency histograms of its stages.
+
+Each runner records the time of the transitions of its lifecycle, in
+order: reserved, JIT config generated, backend instance requested and
+confirmed, online, busy, job completed and deleted.
+
+When a transition is recorded right after the previous one, the duration
+of the stage between them is observed in a histogram per stage, runner
+group and backend. The histograms are kept in the hash
+`{prefix}:runner_lifecycle`, so that the observations of all the workers
+are exposed by the metrics endpoint.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Literal, Optional, Tuple
+
+import redis
+from pydantic import BaseModel
+from redis import Redis
+
+from runner_manager.models import histograms as redis_histograms
+
+Event = Literal[
+    "reserved",
+    "jit_generated",
+    "create_requested",
+    "created",
+    "online",
+    "busy",
+    "completed",
+    "deleted",
+]
+EVENTS: List[str] = list(Event.__args__)  # type: ignore
+# Stage ending with each event, from the previous event.
+STAGES: Dict[str, str] = {
+    "jit_generated": "github",
+    "create_requested": "queue",
+    "created": "backend",
+    "online": "boot",
+    "busy": "idle",
+    "completed": "job",
+    "deleted": "teardown",
+}
+# Jobs and idle runners can last for hours.
+BUCKETS = redis_histograms.BUCKETS + (14400.0,)
+
+
+class RunnerTimeline(BaseModel):
+    reserved: Optional[datetime] = None
+    jit_generated: Optional[datetime] = None
+    create_requested: Optional[datetime] = None
+    created: Optional[datetime] = None
+    online: Optional[datetime] = None
+    busy: Optional[datetime] = None
+    completed: Optional[datetime] = None
+    deleted: Optional[datetime] = None
+
+    def record(
+        self, event: Event, at: Optional[datetime] = None
+    ) -> Optional[Tuple[str, float]]:
+        """Set the time of the event, unless it is already recorded.
+
+        Returns:
+            The stage ending with the event and its duration in seconds,
+            None if the previous event was not recorded.
+        """
+        if getattr(self, event) is not None:
+            return None
+        at = datetime.now(timezone.utc) if at is None else at
+        setattr(self, event, at)
+        index = EVENTS.index(event)
+        if index == 0:
+            return None
+        previous: Optional[datetime] = getattr(self, EVENTS[index - 1])
+        if previous is None:
+            return None
+        return STAGES[event], max((at - previous).total_seconds(), 0)
+
+
+def histograms_key(prefix: Optional[str]) -> str:
+    return f"{prefix}:runner_lifecycle"
+
+
+def observe(
+    db: Redis,
+    prefix: Optional[str],
+    stage: str,
+    group: str,
+    backend: str,
+    seconds: float,
+    pipeline: Optional[redis.client.Pipeline] = None,
+) -> None:
+    """Count the duration of a stage in its bucket of the histogram."""
+    redis_histograms.observe(
+        db,
+        histograms_key(prefix),
+        (stage, group, backend),
+        seconds,
+        BUCKETS,
+        pipeline=pipeline,
+    )
+
+
+def histograms(
+    db: Redis, prefix: Optional[str]
+) -> Dict[Tuple[str, ...], redis_histograms.Histogram]:
+    """Return the cumulative buckets and the sum of each histogram,
+    by stage, runner group and backend."""
+    return redis_histograms.histograms(db, histograms_key(prefix), BUCKETS)
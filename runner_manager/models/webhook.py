@@ -1,8 +1,9 @@
-from typing import Union
+from datetime import datetime
+from typing import Any, List, Literal, Optional, Union
 
 from githubkit.versions.latest.models import WebhookPing
 from githubkit.versions.latest.webhooks import WorkflowJobEvent
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 
 
 class WebhookResponse(BaseModel):
@@ -12,3 +13,56 @@ class WebhookResponse(BaseModel):
 
 
 AcceptedWebhookEvents = Union[WorkflowJobEvent, WebhookPing]
+
+
+class WorkflowJob(BaseModel):
+    """Subset of the workflow_job object used by the runner manager."""
+
+    id: int
+    run_id: Optional[int] = None
+    run_attempt: Optional[int] = None
+    name: Optional[str] = None
+    workflow_name: Optional[str] = None
+    status: Optional[str] = None
+    conclusion: Optional[str] = None
+    labels: List[str] = []
+    runner_id: Optional[int] = None
+    runner_name: Optional[str] = None
+    runner_group_id: Optional[int] = None
+    runner_group_name: Optional[str] = None
+    created_at: Optional[Union[datetime, str]] = None
+    started_at: Optional[Union[datetime, str]] = None
+
+
+class WorkflowJobRepository(BaseModel):
+    name: str
+    full_name: str
+    organization: Optional[str] = None
+
+    @validator("organization", pre=True)
+    def organization_login(cls, v: Any) -> Any:
+        """The organization may be sent either as a login or as an object."""
+        if isinstance(v, dict):
+            return v.get("login")
+        return v
+
+
+class WorkflowJobOrganization(BaseModel):
+    login: str
+
+
+class WorkflowJobWebhook(BaseModel):
+    """Lightweight representation of a workflow_job webhook.
+
+    Parsing the full githubkit models is expensive and most of their fields
+    are never read by the jobs, this model only keeps what the jobs need.
+    Unknown fields are ignored.
+    """
+
+    action: Literal["queued", "in_progress", "completed", "waiting"]
+    workflow_job: WorkflowJob
+    repository: WorkflowJobRepository
+    organization: Optional[WorkflowJobOrganization] = None
+
+
+WorkflowJobEvents = Union[WorkflowJobEvent, WorkflowJobWebhook]
@@ -0,0 +1,240 @@
+"""Reconcile the runner groups from a schedule shared by the reconcilers.
+
+The next run of the healthcheck and of the leaks job of each group is kept
+in the sorted set `{prefix}:reconciler:schedule`, scored by timestamp.
+The groups are given evenly spread phases in the interval of each task,
+and each run is slightly delayed at random within its slot, so that the
+groups do not all run at the same moment.
+
+Each reconciler process registers itself with a heartbeat in
+`{prefix}:reconciler:workers`, and only runs the groups assigned to it by
+consistent hashing over the live reconcilers: adding a reconciler only
+moves a share of the groups to it. A run is claimed by moving its score
+forward atomically, so that a group moving to another reconciler is not
+run twice.
+
+The runs are enqueued on the maintenance queue, the jobs of the
+healthchecks with the timeout their lane lease is based on, so that a slow
+healthcheck never holds the reconciler past its heartbeat.
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import random
+import socket
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from redis import Redis
+from rq import Queue
+
+from runner_manager.dependencies import get_queues
+from runner_manager.jobs import healthcheck, leaks
+from runner_manager.models.runner_group import RunnerGroup
+from runner_manager.models.settings import Settings
+
+log = logging.getLogger(__name__)
+
+# Time after which a reconciler missing its heartbeats leaves the ring.
+HEARTBEAT_TTL = timedelta(seconds=30)
+# Time between the synchronizations of the schedule with the runner groups.
+SYNC_INTERVAL = timedelta(minutes=1)
+
+# KEYS[1]: schedule. ARGV: member, expected score, next score.
+# Moves the next run of the member only if no other reconciler did.
+CLAIM = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score or tonumber(score) ~= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], 'XX', ARGV[3], ARGV[1])
+return 1
+"""
+
+
+def ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hashing of keys over nodes, with virtual nodes to even
+    out the share of each node."""
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 64):
+        self.ring: List[Tuple[int, str]] = sorted(
+            (ring_hash(f"{node}#{i}"), node)
+            for node in set(nodes)
+            for i in range(replicas)
+        )
+        self.hashes = [value for value, _ in self.ring]
+
+    def node(self, key: str) -> Optional[str]:
+        if not self.ring:
+            return None
+        index = bisect.bisect(self.hashes, ring_hash(key)) % len(self.ring)
+        return self.ring[index][1]
+
+
+class Task(NamedTuple):
+    # Job run with the pk of the group followed by args.
+    func: Callable[..., object]
+    interval: timedelta
+    args: Tuple[Any, ...] = ()
+    timeout: Optional[timedelta] = None
+
+
+def next_slot(now: float, phase: float, interval: float) -> float:
+    """First time strictly after now at phase seconds into the interval."""
+    delay = (phase - now) % interval
+    return now + (delay if delay > 0 else interval)
+
+
+class Reconciler:
+    def __init__(
+        self,
+        db: Redis,
+        settings: Settings,
+        name: Optional[str] = None,
+        jitter: float = 0.25,
+        queue: Optional[Queue] = None,
+    ):
+        """
+        Args:
+            name (str): Name of the reconciler in the ring, unique per process.
+            jitter (float): Max delay of a run after its slot, as a
+                fraction of the time between the slots of two groups.
+            queue (Queue): Queue the runs are enqueued on, the maintenance
+                queue by default.
+        """
+        self.db = db
+        self.settings = settings
+        self.queue = queue or get_queues()["maintenance"]
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.jitter = jitter
+        self.synced_at = 0.0
+        self.tasks: Dict[str, Task] = {
+            "healthcheck": Task(
+                healthcheck.group,
+                settings.healthcheck_interval,
+                (settings.time_to_live, settings.timeout_runner),
+                settings.healthcheck_timeout,
+            ),
+            "leaks": Task(
+                leaks.runner_leaks,
+                settings.healthcheck_interval * 4,
+            ),
+        }
+
+    def key(self, name: str) -> str:
+        return f"{self.settings.name}:reconciler:{name}"
+
+    def heartbeat(self, now: float) -> List[str]:
+        """Register the reconciler and return the live reconcilers."""
+        pipeline = self.db.pipeline(transaction=True)
+        pipeline.zadd(self.key("workers"), {self.name: now})
+        pipeline.zremrangebyscore(
+            self.key("workers"), "-inf", now - HEARTBEAT_TTL.total_seconds()
+        )
+        pipeline.zrange(self.key("workers"), 0, -1)
+        return pipeline.execute()[-1]
+
+    def leave(self) -> None:
+        self.db.zrem(self.key("workers"), self.name)
+
+    def sync(self, groups: List[RunnerGroup], now: float) -> None:
+        """Spread the runs of the groups evenly over the interval of each
+        task, and schedule the first run of the new groups."""
+        pks = sorted(group.pk for group in groups)
+        phases: Dict[str, float] = {}
+        for name, task in self.tasks.items():
+            interval = task.interval.total_seconds()
+            for i, pk in enumerate(pks):
+                phases[f"{name}:{pk}"] = interval * i / len(pks)
+        scheduled = self.db.zrange(self.key("schedule"), 0, -1)
+        stale = [member for member in scheduled if member not in phases]
+        pipeline = self.db.pipeline(transaction=True)
+        if stale:
+            pipeline.zrem(self.key("schedule"), *stale)
+            pipeline.hdel(self.key("phases"), *stale)
+        if phases:
+            pipeline.hset(self.key("phases"), mapping=phases)
+            for member, phase in phases.items():
+                interval = self.tasks[member.split(":")[0]].interval.total_seconds()
+                pipeline.zadd(
+                    self.key("schedule"),
+                    {member: next_slot(now, phase, interval)},
+                    nx=True,
+                )
+        pipeline.execute()
+        self.synced_at = now
+
+    def claim(self, member: str, score: float, now: float) -> bool:
+        """Schedule the next run of the member in its next slot, if it was
+        not claimed by another reconciler."""
+        task = self.tasks[member.split(":")[0]]
+        interval = task.interval.total_seconds()
+        phase = float(self.db.hget(self.key("phases"), member) or 0)
+        count = max(self.db.hlen(self.key("phases")) / len(self.tasks), 1)
+        spread = interval / count * self.jitter
+        next_run = next_slot(now, phase, interval) + random.uniform(0, spread)
+        return bool(
+            self.db.eval(
+                CLAIM, 1, self.key("schedule"), member, repr(score), repr(next_run)
+            )
+        )
+
+    def due(self, workers: List[str], now: float) -> List[Tuple[str, float]]:
+        """Runs due before now, of the groups assigned to this reconciler."""
+        ring = HashRing(workers)
+        return [
+            (member, score)
+            for member, score in self.db.zrangebyscore(
+                self.key("schedule"), "-inf", now, withscores=True
+            )
+            if ring.node(member.split(":", 1)[1]) == self.name
+        ]
+
+    def run_once(self, now: Optional[float] = None) -> List[str]:
+        """Enqueue the tasks due of the groups assigned to this reconciler.
+
+        Returns:
+            List[str]: The runs enqueued, as `{task}:{group pk}`.
+        """
+        now = time.time() if now is None else now
+        workers = self.heartbeat(now)
+        if now - self.synced_at >= SYNC_INTERVAL.total_seconds():
+            self.sync(RunnerGroup.find().all(), now)
+        done: List[str] = []
+        for member, score in self.due(workers, now):
+            if not self.claim(member, score, now):
+                continue
+            name, pk = member.split(":", 1)
+            task = self.tasks[name]
+            log.info(f"Enqueuing {name} of runner group {pk}")
+            try:
+                self.queue.enqueue(
+                    task.func,
+                    pk,
+                    *task.args,
+                    job_timeout=task.timeout.total_seconds() if task.timeout else None,
+                    result_ttl=task.interval.total_seconds(),
+                    meta={"type": name, "group": pk},
+                )
+            except Exception as e:
+                log.error(f"Failed to enqueue {name} of runner group {pk}: {e}")
+            done.append(member)
+        return done
+
+    def run(self, poll_interval: float = 1.0, burst: bool = False) -> None:
+        log.info(f"Reconciler {self.name} started")
+        try:
+            while True:
+                self.run_once()
+                if burst:
+                    break
+                time.sleep(poll_interval)
+        finally:
+            self.leave()
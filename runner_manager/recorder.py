@@ -0,0 +1,98 @@
+"""Record the webhooks received by the runner manager.
+
+Webhooks are written to gzip compressed NDJSON segments, one webhook per line,
+so that they can be replayed later with the `replay` script.
+"""
+
+import gzip
+import heapq
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from pydantic import BaseModel
+
+log = logging.getLogger(__name__)
+
+# Headers of the webhook that are kept in the recordings.
+RECORDED_HEADERS = {"content-type", "user-agent"}
+RECORDED_HEADERS_PREFIX = "x-github-"
+
+
+class RecordedWebhook(BaseModel):
+    timestamp: float
+    headers: Dict[str, str]
+    body: str
+
+
+class WebhookRecorder:
+    """Append webhooks to compressed segment files.
+
+    A new segment is started every `segment_size` webhooks, a segment is
+    only complete once it has been closed. Segments are named after the
+    process id so that several workers can record in the same directory.
+    """
+
+    def __init__(self, directory: Path, segment_size: int = 10000):
+        self.directory = directory
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._count = 0
+
+    def _open(self) -> IO[str]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"webhooks-{os.getpid()}-{time.time_ns()}.ndjson.gz"
+        log.info(f"Recording webhooks to {self.directory / name}")
+        return gzip.open(self.directory / name, "wt", encoding="utf-8")
+
+    def record(self, headers: Mapping[str, str], body: bytes) -> None:
+        webhook = RecordedWebhook(
+            timestamp=time.time(),
+            headers={
+                key.lower(): value
+                for key, value in headers.items()
+                if key.lower() in RECORDED_HEADERS
+                or key.lower().startswith(RECORDED_HEADERS_PREFIX)
+            },
+            body=body.decode(),
+        )
+        line = webhook.json() + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(line)
+            self._count += 1
+            if self._count >= self.segment_size:
+                self._close()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+def read_segment(path: Path) -> Iterator[RecordedWebhook]:
+    """Read the webhooks of a segment, a truncated segment is read
+    up to the last complete webhook."""
+    with gzip.open(path, "rt", encoding="utf-8") as segment:
+        try:
+            for line in segment:
+                if line.endswith("\n"):
+                    yield RecordedWebhook.parse_raw(line)
+        except EOFError:
+            log.warning(f"Segment {path} is truncated")
+
+
+def read_segments(paths: Iterable[Path]) -> Iterator[RecordedWebhook]:
+    """Read the webhooks of several segments ordered by arrival time."""
+    segments: List[Iterator[RecordedWebhook]] = [read_segment(p) for p in paths]
+    return heapq.merge(*segments, key=lambda webhook: webhook.timestamp)
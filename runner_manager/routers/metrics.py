@@ -1,22 +1,141 @@
-from typing import List
+from typing import Callable, Dict, List, Optional, Sequence
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from fastapi.responses import PlainTextResponse
-from prometheus_client import Gauge, generate_latest
+from prometheus_client import REGISTRY, Gauge, generate_latest
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+from prometheus_client.registry import Collector
+from rq import Queue
 
-from runner_manager import RunnerGroup
-from runner_manager.models.runner import Runner
+from runner_manager import Runner, RunnerGroup
+from runner_manager.dependencies import get_cache, get_queues
+from runner_manager.models import histograms, lanes, rate_limit, timeline
 
 router = APIRouter(prefix="/metrics")
 
 runners_count = Gauge("runners_count", "Number of runners", ["runner_group"])
+queue_depth = Gauge("queue_depth", "Number of jobs waiting in the queue", ["queue"])
+
+
+class RedisHistogramCollector(Collector):
+    """Expose histograms observed by all the workers and kept in Redis,
+    see `runner_manager.models.histograms`."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: List[str],
+        key: Callable[[Optional[str]], str],
+        buckets: Sequence[float],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.key = key
+        self.buckets = buckets
+
+    def family(self) -> HistogramMetricFamily:
+        return HistogramMetricFamily(self.name, self.documentation, labels=self.labels)
+
+    def describe(self):
+        yield self.family()
+
+    def collect(self):
+        family = self.family()
+        stored = histograms.histograms(
+            Runner.db(), self.key(Runner.Meta.global_key_prefix), self.buckets
+        )
+        for labels, (buckets, total) in stored.items():
+            family.add_metric(list(labels), buckets, total)
+        yield family
+
+
+class GitHubCacheCollector(Collector):
+    """Expose the statistics of the cache of the GitHub responses, counted
+    by all the processes and kept in Redis."""
+
+    def family(self) -> CounterMetricFamily:
+        return CounterMetricFamily(
+            "github_cache_requests",
+            "Number of conditional GitHub requests answered from the cache or not",
+            labels=["result"],
+        )
+
+    def describe(self):
+        yield self.family()
+
+    def collect(self):
+        family = self.family()
+        stats = get_cache().stats()
+        family.add_metric(["hit"], stats.get("hits", 0))
+        family.add_metric(["miss"], stats.get("misses", 0))
+        yield family
+
+
+class LaneContentionsCollector(Collector):
+    """Expose the contentions of the lanes of the runner groups, counted by
+    all the workers and kept in Redis, see `runner_manager.models.lanes`."""
+
+    def family(self) -> CounterMetricFamily:
+        return CounterMetricFamily(
+            "runner_group_lane_contentions",
+            "Number of times the lane of a runner group was already held "
+            "(contended) or could not be acquired in time (timeout)",
+            labels=["runner_group", "result"],
+        )
+
+    def describe(self):
+        yield self.family()
+
+    def collect(self):
+        family = self.family()
+        contentions = lanes.contentions(Runner.db(), Runner.Meta.global_key_prefix)
+        for group, counts in contentions.items():
+            for result in ("contended", "timeout"):
+                family.add_metric([group, result], counts.get(result, 0))
+        yield family
+
+
+REGISTRY.register(GitHubCacheCollector())
+REGISTRY.register(LaneContentionsCollector())
+REGISTRY.register(
+    RedisHistogramCollector(
+        "runner_lifecycle_seconds",
+        "Duration of the stages of the lifecycle of the runners",
+        ["stage", "runner_group", "backend"],
+        timeline.histograms_key,
+        timeline.BUCKETS,
+    )
+)
+REGISTRY.register(
+    RedisHistogramCollector(
+        "runner_group_lane_wait_seconds",
+        "Time waited by the jobs for the lane of a runner group",
+        ["runner_group"],
+        lanes.waits_key,
+        lanes.WAIT_BUCKETS,
+    )
+)
+REGISTRY.register(
+    RedisHistogramCollector(
+        "backend_rate_limit_wait_seconds",
+        "Time waited by the calls of the backends for their rate limit",
+        ["backend", "operation"],
+        rate_limit.waits_key,
+        rate_limit.WAIT_BUCKETS,
+    )
+)
 
 
 @router.get("/", response_class=PlainTextResponse)
-def compute_metrics() -> PlainTextResponse:
+def compute_metrics(
+    queues: Dict[str, Queue] = Depends(get_queues),
+) -> PlainTextResponse:
     groups: List[RunnerGroup] = RunnerGroup.find().all()
     for group in groups:
-        runners: List[Runner] = group.get_runners()
-        runners_count.labels(runner_group=group.name).set(len(runners))
+        runners_count.labels(runner_group=group.name).set(group.counters().total)
+    for name, queue in queues.items():
+        queue_depth.labels(queue=name).set(queue.count)
     metrics = generate_latest().decode()
     return PlainTextResponse(content=metrics)
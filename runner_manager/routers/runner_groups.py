@@ -13,6 +13,7 @@ from runner_manager.jobs.reset import group as group_reset
 from runner_manager.jobs.runner import runner as runner_create
 from runner_manager.jobs.startup import sync_runner_groups
 from runner_manager.models.api import JobResponse
+from runner_manager.models.lanes import LaneTimeout
 from runner_manager.models.runner import Runner
 
 router = APIRouter(prefix="/groups")
@@ -24,11 +25,9 @@ def list() -> List[RunnerGroup]:
 
 
 @router.post("/sync")
-def sync(
-    queue: Queue = Depends(get_queue),
-    settings: Settings = Depends(get_settings),
-) -> JobResponse:
-    job: Job = queue.enqueue(sync_runner_groups, settings)
+def sync(queue: Queue = Depends(get_queue)) -> JobResponse:
+    # The settings are loaded by the worker.
+    job: Job = queue.enqueue(sync_runner_groups)
     return JobResponse(id=job.id, status=job.get_status())
 
 
@@ -46,9 +45,13 @@ def delete(name: str, github: GitHub = Depends(get_github)) -> Dict[str, str]:
         group = RunnerGroup.find(RunnerGroup.name == name).first()
     except NotFoundError:
         raise HTTPException(status_code=404, detail=f"Runner group {name} not found.")
-    else:
+    try:
         group.delete(pk=group.pk, github=github)
-        return {"message": f"Runner group {name} deleted."}
+    except LaneTimeout:
+        raise HTTPException(
+            status_code=409, detail=f"Runner group {name} is busy, retry later."
+        )
+    return {"message": f"Runner group {name} deleted."}
 
 
 @router.post("/{name}/healthcheck")
@@ -90,7 +93,7 @@ def create_runner(name: str, queue: Queue = Depends(get_queue)) -> JobResponse:
     except NotFoundError:
         raise HTTPException(status_code=404, detail=f"Runner group {name} not found.")
     else:
-        job: Job = queue.enqueue(runner_create, group)
+        job: Job = queue.enqueue(runner_create, group.pk)
         return JobResponse(id=job.id, status=job.get_status())
 
 
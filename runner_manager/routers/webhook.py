@@ -1,13 +1,33 @@
-from typing import Annotated, Set
-
-from fastapi import APIRouter, Depends, Header, HTTPException, Request, Security
-from githubkit.versions.latest.models import WebhookPing
+from typing import Annotated, Dict, Set
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    Security,
+)
+from fastapi.concurrency import run_in_threadpool
 from githubkit.webhooks import verify
+from prometheus_client import Counter
+from pydantic import ValidationError
+from redis import Redis
 from rq import Queue, Retry
-
-from runner_manager.dependencies import get_queue, get_settings
+from rq.job import Job
+
+from runner_manager.dependencies import (
+    get_queues,
+    get_recorder,
+    get_redis,
+    get_settings,
+)
+from runner_manager.jobs.workflow_job import queued_events_key
+from runner_manager.models.runner_group import RunnerGroup
 from runner_manager.models.settings import Settings
-from runner_manager.models.webhook import AcceptedWebhookEvents, WebhookResponse
+from runner_manager.models.webhook import WebhookResponse, WorkflowJobWebhook
+from runner_manager.recorder import WebhookRecorder
 
 router = APIRouter(prefix="/webhook")
 
@@ -17,17 +37,55 @@ IMPLEMENTED_WEBHOOKS: Set[str] = {
     "workflow_job.in_progress",
 }
 
+duplicate_deliveries = Counter(
+    "webhook_duplicate_deliveries",
+    "Number of webhook deliveries dropped because they were already received",
+    ["event"],
+)
+
+shed_webhooks = Counter(
+    "webhook_shed",
+    "Number of webhooks deferred or rejected because of the queue depth "
+    "or the capacity of the runner group",
+    ["event", "outcome"],
+)
+
+
+def delivery_key(settings: Settings, delivery: str) -> str:
+    return f"{settings.name}:webhook:delivery:{delivery}"
+
+
+def register_delivery(redis: Redis, settings: Settings, delivery: str) -> bool:
+    """Record a delivery GUID, returns False if it was already recorded.
+
+    SET NX is atomic, when the same delivery is received concurrently
+    only one of the requests will register it.
+    """
+    return bool(
+        redis.set(
+            delivery_key(settings, delivery),
+            1,
+            nx=True,
+            ex=settings.webhook_delivery_ttl,
+        )
+    )
+
 
 async def validate_webhook(
     request: Request,
     settings: Settings = Depends(get_settings),
     x_hub_signature_256: Annotated[str | None, Header()] = None,
-) -> bool:
+) -> bytes:
+    """Verify the signature of the webhook and return its raw payload.
+
+    The body is only read once, the same bytes are used to verify
+    the signature and to parse the event.
+    """
 
     body = await request.body()
 
     if settings.github_webhook_secret is None:
-        return True
+        return body
     elif x_hub_signature_256 is None:
         raise HTTPException(status_code=401, detail="Missing signature")
     valid: bool = verify(
@@ -42,29 +100,154 @@ async def validate_webhook(
             detail="Signature values do not match - check webhook secret value",
         )
 
-    return valid
+    return body
+
+
+async def recorded_webhook(
+    request: Request,
+    body: bytes = Security(validate_webhook),
+    recorder: WebhookRecorder | None = Depends(get_recorder),
+) -> bytes:
+    """Record the webhook when `webhook_record_dir` is configured.
+
+    The recording is compressed and written in the thread pool, so that
+    it does not block the event loop.
+    """
+    if recorder is not None:
+        await run_in_threadpool(recorder.record, request.headers, body)
+    return body
+
+
+def coalesce_queued(
+    webhook: WorkflowJobWebhook, queue: Queue, redis: Redis, settings: Settings
+) -> Job | None:
+    """Count a queued event for its labels.
+
+    The first event of a window schedules the job that will scale up
+    the runner group by the number of events received until it runs.
+    Returns the scheduled job, None if the event joined an existing window.
+    """
+    key = queued_events_key(settings, webhook.workflow_job.labels)
+    pipeline = redis.pipeline()
+    pipeline.incr(key)
+    # Don't keep counting events forever if the scale job was lost.
+    pipeline.expire(key, settings.timeout_runner)
+    count, _ = pipeline.execute()
+    if count > 1:
+        return None
+    try:
+        return queue.enqueue_in(
+            settings.queued_coalescing_window,
+            "runner_manager.jobs.workflow_job.scale",
+            webhook.workflow_job.labels,
+            retry=Retry(max=3, interval=[30, 60, 120]),
+        )
+    except Exception:
+        redis.decr(key)
+        raise
+
+
+def defer_full_group(webhook: WorkflowJobWebhook) -> RunnerGroup | None:
+    """Add a queued event to the queued runners of its group if the group
+    is full, instead of enqueueing a job that can't create a runner.
+
+    The runners are created by the healthcheck or once a runner of the
+    group is deleted. The group is found in the routing index and its size
+    read from its counters, without loading its runners.
+    Returns the runner group if the event was deferred.
+    """
+    runner_group: RunnerGroup | None = RunnerGroup.find_from_labels(
+        webhook.workflow_job.labels
+    )
+    if runner_group is None or not runner_group.is_full:
+        return None
+    runner_group.increment_queued()
+    runner_group.record_queued()
+    return runner_group
+
+
+def queue_depth(queue: Queue) -> int:
+    """Number of jobs waiting in the queue, including the scheduled ones."""
+    return queue.count + queue.scheduled_job_registry.count
 
 
 @router.post("/")
 def post(
-    webhook: AcceptedWebhookEvents,
+    response: Response,
+    body: bytes = Security(recorded_webhook),
     x_github_event: Annotated[str | None, Header()] = None,
-    valid: bool = Security(validate_webhook),
-    queue: Queue = Depends(get_queue),
+    x_github_delivery: Annotated[str | None, Header()] = None,
+    queues: Dict[str, Queue] = Depends(get_queues),
+    redis: Redis = Depends(get_redis),
+    settings: Settings = Depends(get_settings),
 ) -> WebhookResponse:
 
-    if not isinstance(webhook, WebhookPing):
-        action = webhook.action
-    else:
-        action = None
-    event_name = f"{x_github_event}.{action}"
+    if x_github_event != "workflow_job":
+        return WebhookResponse(success=False, message="Not implemented")
+
+    # Only the fields read by the jobs are parsed, the rest of the
+    # payload is ignored.
+    try:
+        webhook = WorkflowJobWebhook.parse_raw(body)
+    except ValidationError as exp:
+        raise HTTPException(status_code=422, detail=exp.errors())
+    event_name = f"{x_github_event}.{webhook.action}"
 
     if event_name in IMPLEMENTED_WEBHOOKS:
         job_name = f"runner_manager.jobs.{event_name}"
-
-        job = queue.enqueue(
-            job_name, webhook, retry=Retry(max=3, interval=[30, 60, 120])
+        # Each action has its own queue so that slow deletions of
+        # completed jobs don't delay the creation of runners.
+        queue: Queue = queues[webhook.action]
+
+        # Rejected deliveries are not recorded so that they can be redelivered.
+        depth = queue_depth(queue)
+        threshold = settings.webhook_reject_queue_depth
+        if threshold is not None and depth >= threshold:
+            shed_webhooks.labels(event=event_name, outcome="rejected").inc()
+            raise HTTPException(
+                status_code=503,
+                detail=f"Queue {queue.name} is full",
+                headers={"Retry-After": "60"},
+            )
+
+        if x_github_delivery is not None:
+            if not register_delivery(redis, settings, x_github_delivery):
+                duplicate_deliveries.labels(event=event_name).inc()
+                return WebhookResponse(success=True, message="Duplicate delivery")
+
+        # When the queue is too long, queued events are deferred: they are
+        # counted for their labels like during the coalescing window, so
+        # that a single scale job per label set is waiting.
+        threshold = settings.webhook_defer_queue_depth
+        deferred = (
+            webhook.action == "queued" and threshold is not None and depth >= threshold
         )
+        try:
+            if webhook.action == "queued" and defer_full_group(webhook):
+                shed_webhooks.labels(event=event_name, outcome="deferred").inc()
+                response.status_code = 202
+                return WebhookResponse(success=True, message="Deferred")
+            if webhook.action == "queued" and (
+                settings.queued_coalescing_window or deferred
+            ):
+                job = coalesce_queued(webhook, queue, redis, settings)
+                if deferred:
+                    shed_webhooks.labels(event=event_name, outcome="deferred").inc()
+                    response.status_code = 202
+                    return WebhookResponse(
+                        success=True, message="Deferred", job_id=job.id if job else None
+                    )
+                if job is None:
+                    return WebhookResponse(success=True, message="Job coalesced")
+            else:
+                job = queue.enqueue(
+                    job_name, webhook, retry=Retry(max=3, interval=[30, 60, 120])
+                )
+        except Exception:
+            # Forget the delivery so that it can be redelivered.
+            if x_github_delivery is not None:
+                redis.delete(delivery_key(settings, x_github_delivery))
+            raise
 
         return WebhookResponse(success=True, message="Job queued", job_id=job.id)
     return WebhookResponse(success=False, message="Not implemented")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Evaluate the demand forecast against the recorded history.
+
+For each bucket of the history of a runner group, the queued jobs are
+forecast from the buckets before it, the same way the forecast job does,
+and compared to the jobs actually queued.
+
+The forecast combining the moving average and the seasonal value is
+compared to each of them alone and to the naive forecast repeating the
+previous bucket. Lower errors are better, a negative bias means the
+forecast is below the demand: runners would be missing.
+"""
+
+import argparse
+import math
+from typing import Dict, List, Optional, Tuple
+
+from runner_manager import Settings
+from runner_manager.dependencies import get_redis, get_settings
+from runner_manager.models import demand
+
+
+def score(pairs: List[Tuple[float, int]]) -> Tuple[float, float, float]:
+    """Mean absolute error, root mean squared error and mean bias."""
+    errors = [predicted - actual for predicted, actual in pairs]
+    mae = sum(abs(error) for error in errors) / len(errors)
+    rmse = math.sqrt(sum(error * error for error in errors) / len(errors))
+    bias = sum(errors) / len(errors)
+    return mae, rmse, bias
+
+
+def evaluate(
+    counts: Dict[int, int], first: int, last: int, warmup: int
+) -> Dict[str, List[Tuple[float, int]]]:
+    """Forecast each bucket from first + warmup to last excluded."""
+    results: Dict[str, List[Tuple[float, int]]] = {
+        "naive": [],
+        "ewma": [],
+        "seasonal": [],
+        "forecast": [],
+    }
+    for bucket in range(first + warmup, last):
+        actual = counts.get(bucket, 0)
+        forecast = demand.predict(counts, bucket, first)
+        season: Optional[float] = forecast.seasonal
+        results["naive"].append((counts.get(bucket - 1, 0), actual))
+        results["ewma"].append((forecast.ewma, actual))
+        results["seasonal"].append(
+            (forecast.ewma if season is None else season, actual)
+        )
+        results["forecast"].append((forecast.expected, actual))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("group", help="name of the runner group")
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=demand.EWMA_SPAN,
+        help="buckets of history used before the first forecast",
+    )
+    args = parser.parse_args()
+
+    settings: Settings = get_settings()
+    db = get_redis()
+    counts = demand.history(db, settings.name, args.group)
+    if not counts:
+        print(f"No history recorded for {args.group}")
+        return
+    first = min(counts)
+    # The last bucket may not be complete, it is not evaluated.
+    last = max(counts)
+    results = evaluate(counts, first, last, args.warmup)
+    buckets = len(results["forecast"])
+    if buckets == 0:
+        print(f"Not enough history for {args.group}: {last - first} buckets")
+        return
+    print(
+        f"{args.group}: {buckets} buckets of {demand.BUCKET}, "
+        f"{sum(counts.values())} queued jobs"
+    )
+    print(f"{'':>10} {'mae':>8} {'rmse':>8} {'bias':>8}")
+    for name, pairs in results.items():
+        mae, rmse, bias = score(pairs)
+        print(f"{name:>10} {mae:8.2f} {rmse:8.2f} {bias:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
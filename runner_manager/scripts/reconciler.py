@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+import argparse
+
+from runner_manager import Settings
+from runner_manager.dependencies import get_redis, get_settings
+from runner_manager.logging import log
+from runner_manager.reconciler import Reconciler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reconciler of the runner groups of the runner-manager"
+    )
+    parser.add_argument(
+        "-b",
+        "--burst",
+        action="store_true",
+        default=False,
+        help="Run in burst mode (quit after the runs due are done)",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="poll interval in seconds"
+    )
+    parser.add_argument("--name", help="name of the reconciler, unique per process")
+    args = parser.parse_args()
+
+    settings: Settings = get_settings()
+    log.setLevel(settings.log_level)
+    if not settings.reconciler:
+        log.warning(
+            "The reconciler setting is disabled, healthchecks are also "
+            "scheduled by rq-scheduler"
+        )
+
+    log.info("Booting up reconciler")
+    reconciler = Reconciler(get_redis(), settings, name=args.name)
+    reconciler.run(poll_interval=args.interval, burst=args.burst)
+
+
+if __name__ == "__main__":
+    main()
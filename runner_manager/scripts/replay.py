@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""Replay recorded webhooks against a runner manager.
+
+Webhooks recorded with `webhook_record_dir` are sent again to the webhook
+endpoint, respecting their original spacing divided by `--speed`.
+Once done, the latency between each queued webhook and the creation of a
+runner is reported.
+
+Runners are matched to the queued webhooks in order: the first runner
+created after the replay started is matched with the first queued webhook.
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import httpx
+from githubkit.webhooks import sign
+
+from runner_manager import Runner, Settings
+from runner_manager.dependencies import get_redis, get_settings
+from runner_manager.logging import log
+from runner_manager.recorder import RecordedWebhook, read_segments
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Nearest rank percentile of a list of values."""
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank - 1, 0)]
+
+
+class RunnerWatcher(threading.Thread):
+    """Poll the runners of the database and keep the time their instance
+    was confirmed by the backend.
+
+    Runners may be deleted before the end of the replay, so they are
+    polled while the webhooks are sent.
+    """
+
+    def __init__(self, since: datetime, interval: float):
+        super().__init__(daemon=True)
+        self.since = since
+        self.interval = interval
+        self.created: Dict[str, datetime] = {}
+        self._stopped = threading.Event()
+
+    def poll(self):
+        for runner in Runner.find().all():
+            created = runner.timeline.created
+            if created and created >= self.since:
+                self.created.setdefault(runner.name, created)
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        self.poll()
+
+
+def send(
+    client: httpx.Client,
+    url: str,
+    webhook: RecordedWebhook,
+    secret: Optional[str],
+    keep_delivery: bool,
+) -> Tuple[int, float]:
+    """Send a webhook.
+
+    Returns:
+        The status code of the response and the time the request was sent,
+        which may be later than its submission when the senders are busy.
+    """
+    headers = dict(webhook.headers)
+    body = webhook.body.encode()
+    if not keep_delivery:
+        # A new delivery id prevents the webhook to be dropped as a duplicate.
+        headers["x-github-delivery"] = str(uuid4())
+    if secret:
+        headers["x-hub-signature-256"] = sign(secret, body, method="sha256")
+    sent_at = time.time()
+    response = client.post(url, content=body, headers=headers)
+    return response.status_code, sent_at
+
+
+def is_queued(webhook: RecordedWebhook) -> bool:
+    if webhook.headers.get("x-github-event") != "workflow_job":
+        return False
+    return json.loads(webhook.body).get("action") == "queued"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("segments", nargs="+", type=Path, help="recorded segments")
+    parser.add_argument("--url", default="http://localhost:8000/webhook/")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="speed multiplier, 0 to send the webhooks as fast as possible",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--wait",
+        type=float,
+        default=60,
+        help="seconds to wait for the runners once all webhooks are sent",
+    )
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument(
+        "--keep-delivery",
+        action="store_true",
+        default=False,
+        help="keep the recorded delivery ids",
+    )
+    args = parser.parse_args()
+
+    settings: Settings = get_settings()
+    log.setLevel(settings.log_level)
+    Runner.Meta.database = get_redis()
+    secret = (
+        settings.github_webhook_secret.get_secret_value()
+        if settings.github_webhook_secret
+        else None
+    )
+
+    started_at = datetime.now(timezone.utc)
+    watcher = RunnerWatcher(since=started_at, interval=args.poll_interval)
+    watcher.start()
+
+    # The futures of the webhooks sent, and whether they are queued events.
+    results: List[Tuple[Future, bool]] = []
+    first: Optional[float] = None
+    start = time.monotonic()
+    with httpx.Client(timeout=30) as client, ThreadPoolExecutor(
+        max_workers=args.concurrency
+    ) as executor:
+        for webhook in read_segments(args.segments):
+            if first is None:
+                first = webhook.timestamp
+            if args.speed > 0:
+                delay = (webhook.timestamp - first) / args.speed
+                time.sleep(max(start + delay - time.monotonic(), 0))
+            future = executor.submit(
+                send, client, args.url, webhook, secret, args.keep_delivery
+            )
+            results.append((future, is_queued(webhook)))
+    elapsed = time.monotonic() - start
+    responses = [(future.result(), queued) for future, queued in results]
+    statuses = Counter(status for (status, _), _ in responses)
+    sent = sorted(sent_at for (_, sent_at), queued in responses if queued)
+    print(f"Sent {len(results)} webhooks in {elapsed:.1f}s")
+    print(f"Status codes: {dict(statuses)}")
+
+    deadline = time.monotonic() + args.wait
+    while len(watcher.created) < len(sent) and time.monotonic() < deadline:
+        time.sleep(args.poll_interval)
+    watcher.stop()
+
+    created = sorted(watcher.created.values())
+    latencies = [
+        created_at.timestamp() - sent_at for sent_at, created_at in zip(sent, created)
+    ]
+    print(f"Queued webhooks: {len(sent)}, runners created: {len(created)}")
+    if not latencies:
+        return
+    for percent in (50, 90, 95, 99, 100):
+        print(f"p{percent}: {percentile(latencies, percent):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
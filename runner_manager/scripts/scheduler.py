@@ -3,10 +3,10 @@
 import argparse
 
 from rq import Queue
-from rq_scheduler.scheduler import Scheduler
 
 from runner_manager import Settings
 from runner_manager.dependencies import get_queue, get_settings
+from runner_manager.leader import LeaderScheduler
 from runner_manager.logging import log
 
 
@@ -28,10 +28,13 @@ def main():
 
     log.info("Booting up scheduler")
 
-    scheduler = Scheduler(
+    # Only the replica holding the lease of the schedulers enqueues the jobs.
+    scheduler = LeaderScheduler(
         queue=queue,
         connection=queue.connection,
         interval=args.interval,
+        job_class=queue.job_class,
+        prefix=settings.name,
     )
     scheduler.run(burst=args.burst)
 
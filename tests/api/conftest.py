@@ -11,7 +11,8 @@ from rq import Queue
 
 from runner_manager import BaseRunnerGroup, Settings
 from runner_manager.backend.base import BaseBackend
-from runner_manager.dependencies import get_queue, get_settings
+from runner_manager.dependencies import QUEUES, get_queue, get_queues, get_settings
+from runner_manager.jobs.serializer import Job, JSONSerializer
 from runner_manager.main import app
 
 from ..conftest import get_next_monkeypatch
@@ -50,7 +51,24 @@ def api_queue():
     redis: Redis = get_redis_connection(
         url=settings.redis_om_url, decode_responses=False
     )
-    return Queue(connection=redis, is_async=False)
+    return Queue(
+        connection=redis, is_async=False, serializer=JSONSerializer, job_class=Job
+    )
+
+
+@lru_cache()
+def api_queues():
+    queue = api_queue()
+    return {
+        name: Queue(
+            name,
+            connection=queue.connection,
+            is_async=queue.is_async,
+            serializer=queue.serializer,
+            job_class=queue.job_class,
+        )
+        for name in QUEUES
+    }
 
 
 @pytest.fixture(scope="function")
@@ -59,6 +77,7 @@ def fastapp(monkeypatch):
     fastapp.dependency_overrides = {}
     fastapp.dependency_overrides[get_settings] = api_settings
     fastapp.dependency_overrides[get_queue] = api_queue
+    fastapp.dependency_overrides[get_queues] = api_queues
     monkeypatch.setattr(Paginator, "_get_next_page", get_next_monkeypatch)
     return fastapp
 
@@ -2,6 +2,8 @@ from rq import Queue
 from rq.job import Job, JobStatus
 from starlette.testclient import TestClient
 
+from runner_manager.jobs.serializer import Job as SerializedJob
+from runner_manager.jobs.serializer import JSONSerializer
 from runner_manager.jobs.startup import startup
 
 
@@ -16,6 +18,13 @@ def enqueue_startup(queue: Queue) -> bool:
 
 
 def test_lifespan(fastapp, queue: Queue):
+    # The application enqueues jobs with the JSON serializer
+    queue = Queue(
+        connection=queue.connection,
+        is_async=False,
+        serializer=JSONSerializer,
+        job_class=SerializedJob,
+    )
     with TestClient(fastapp) as client:
         # Application's lifespan is called on entering the block.
         response = client.get("/")
@@ -1,7 +1,12 @@
+from datetime import timedelta
+
+import pytest
 from fastapi.testclient import TestClient
 
 from runner_manager import RunnerGroup
 from runner_manager.clients.github import GitHub
+from runner_manager.dependencies import QUEUES
+from runner_manager.models.lanes import LaneTimeout
 
 
 def test_metrics_endpoint(client: TestClient, runner_group: RunnerGroup):
@@ -63,3 +68,67 @@ def test_runner_count(client: TestClient, runner_group: RunnerGroup, github: Git
         f'runners_count{{runner_group="{runner_group.name}"}} {want:.1f}'
         in after_delete
     )
+
+
+def test_queue_depth(client: TestClient):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    lines = [line for line in response.text.splitlines() if line.startswith("queue_")]
+    for name in QUEUES:
+        assert any(line.startswith(f'queue_depth{{queue="{name}"}}') for line in lines)
+
+
+def test_github_cache_metrics(client: TestClient):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    lines = [
+        line
+        for line in response.text.splitlines()
+        if line.startswith("github_cache_requests")
+    ]
+    assert any(
+        line.startswith('github_cache_requests_total{result="hit"}') for line in lines
+    )
+    assert any(
+        line.startswith('github_cache_requests_total{result="miss"}') for line in lines
+    )
+
+
+def test_runner_lifecycle_metrics(
+    client: TestClient, runner_group: RunnerGroup, github: GitHub
+):
+    runner_group.save()
+    runner = runner_group.create_runner(github)
+    assert runner is not None
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    lines = [
+        line
+        for line in response.text.splitlines()
+        if line.startswith("runner_lifecycle_seconds_count")
+    ]
+    for stage in ("github", "queue", "backend"):
+        assert (
+            f'runner_lifecycle_seconds_count{{backend="base",'
+            f'runner_group="{runner_group.name}",stage="{stage}"}} 1.0'
+        ) in lines
+
+
+def test_lane_metrics(client: TestClient, runner_group: RunnerGroup):
+    runner_group.save()
+    with runner_group.lane():
+        with pytest.raises(LaneTimeout):
+            with runner_group.lane(wait=timedelta()):
+                pass
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert (
+        f'runner_group_lane_wait_seconds_count{{runner_group="{runner_group.name}"}}'
+        " 1.0"
+    ) in lines
+    for result in ("contended", "timeout"):
+        assert (
+            "runner_group_lane_contentions_total"
+            f'{{result="{result}",runner_group="{runner_group.name}"}} 1.0'
+        ) in lines
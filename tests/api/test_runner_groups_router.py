@@ -3,8 +3,11 @@ from typing import List
 from fastapi.testclient import TestClient
 
 from runner_manager import RunnerGroup
+from runner_manager.jobs import startup
 from runner_manager.models.api import JobResponse
 
+from .conftest import api_settings
+
 
 def test_list_groups(client: TestClient, runner_group: RunnerGroup):
     runner_group.save()
@@ -73,7 +76,9 @@ def test_create_runner(client: TestClient, runner_group: RunnerGroup):
     assert job.status == "finished"
 
 
-def test_sync_runner_groups(client: TestClient):
+def test_sync_runner_groups(client: TestClient, monkeypatch):
+    # The job loads the settings of the worker
+    monkeypatch.setattr(startup, "get_settings", api_settings)
     response = client.post("/groups/sync")
     assert response.status_code == 200
     job: JobResponse = JobResponse.parse_obj(response.json())
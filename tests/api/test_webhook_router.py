@@ -1,17 +1,28 @@
 from functools import lru_cache
+from uuid import uuid4
 
 from githubkit.versions.latest.models import (
     WebhookWorkflowJobCompleted as WorkflowJobCompleted,
 )
 from githubkit.webhooks import sign
 from hypothesis import given
+from prometheus_client import REGISTRY
 from pytest import fixture
 from rq import Queue
+from rq.job import Job
 
-from runner_manager.dependencies import get_settings
+from runner_manager import Runner
+from runner_manager.dependencies import get_queues, get_settings
+from runner_manager.jobs.workflow_job import queued_events_key
+from runner_manager.models.runner_group import RunnerGroup
 from runner_manager.models.settings import Settings
+from runner_manager.models.webhook import WorkflowJobWebhook
 
-from ..strategies import PingStrategy, WorkflowJobCompletedStrategy
+from ..strategies import (
+    PingStrategy,
+    WorkflowJobCompletedStrategy,
+    WorkflowJobQueuedStrategy,
+)
 
 
 @lru_cache()
@@ -57,11 +68,153 @@ def test_webhook_retry_job(workflow_job, client, queue: Queue):
     )
     assert response.status_code == 200
     job_id = response.json()["job_id"]
-    job = queue.fetch_job(job_id)
+    job = Job.fetch(job_id, connection=queue.connection)
+    assert job.origin == "completed"
     assert job is not None
     assert job.retries_left == 3
 
 
+@given(workflow_job=WorkflowJobCompletedStrategy)
+def test_webhook_lightweight_payload(workflow_job, client, queue: Queue):
+    data = workflow_job.json(exclude_unset=True)
+    response = client.post(
+        "/webhook/", content=data, headers={"X-GitHub-Event": "workflow_job"}
+    )
+    assert response.status_code == 200
+    job = Job.fetch(response.json()["job_id"], connection=queue.connection)
+    assert job is not None
+    webhook = job.args[0]
+    assert isinstance(webhook, WorkflowJobWebhook)
+    assert webhook.action == workflow_job.action
+    assert webhook.workflow_job.id == workflow_job.workflow_job.id
+    assert webhook.workflow_job.labels == workflow_job.workflow_job.labels
+    assert webhook.workflow_job.runner_id == workflow_job.workflow_job.runner_id
+
+
+@given(workflow_job=WorkflowJobCompletedStrategy)
+def test_webhook_duplicate_delivery(workflow_job, client, queue: Queue):
+    data = workflow_job.json(exclude_unset=True)
+    headers = {"X-GitHub-Event": "workflow_job", "X-GitHub-Delivery": uuid4().hex}
+    labels = {"event": "workflow_job.completed"}
+    before = (
+        REGISTRY.get_sample_value("webhook_duplicate_deliveries_total", labels) or 0
+    )
+    response = client.post("/webhook/", content=data, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["job_id"] is not None
+    # The same delivery is dropped before reaching the queue
+    response = client.post("/webhook/", content=data, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["job_id"] is None
+    assert response.json()["message"] == "Duplicate delivery"
+    after = REGISTRY.get_sample_value("webhook_duplicate_deliveries_total", labels)
+    assert after == before + 1
+    # Another delivery of the same event is accepted
+    headers["X-GitHub-Delivery"] = uuid4().hex
+    response = client.post("/webhook/", content=data, headers=headers)
+    assert response.json()["job_id"] is not None
+
+
+@given(workflow_job=WorkflowJobQueuedStrategy)
+def test_webhook_queued_coalescing(workflow_job, client, queue: Queue):
+    workflow_job.workflow_job.labels = [uuid4().hex]
+    data = workflow_job.json(exclude_unset=True)
+    headers = {"X-GitHub-Event": "workflow_job"}
+    response = client.post("/webhook/", content=data, headers=headers)
+    assert response.status_code == 200
+    job = Job.fetch(response.json()["job_id"], connection=queue.connection)
+    assert job is not None
+    assert job.origin == "queued"
+    assert job.func_name == "runner_manager.jobs.workflow_job.scale"
+    assert job.args == (workflow_job.workflow_job.labels,)
+    # Following events with the same labels are counted by the scheduled job
+    for _ in range(2):
+        response = client.post("/webhook/", content=data, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["job_id"] is None
+        assert response.json()["message"] == "Job coalesced"
+
+
+def test_webhook_invalid_payload(client):
+    response = client.post(
+        "/webhook/", content=b"{}", headers={"X-GitHub-Event": "workflow_job"}
+    )
+    assert response.status_code == 422
+    response = client.post(
+        "/webhook/", content=b"not json", headers={"X-GitHub-Event": "workflow_job"}
+    )
+    assert response.status_code == 422
+
+
+@given(workflow_job=WorkflowJobCompletedStrategy)
+def test_webhook_rejected(workflow_job, client, fastapp):
+    fastapp.dependency_overrides[get_settings] = lambda: Settings(
+        webhook_reject_queue_depth=0
+    )
+    data = workflow_job.json(exclude_unset=True)
+    response = client.post(
+        "/webhook/", content=data, headers={"X-GitHub-Event": "workflow_job"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "60"
+
+
+@given(workflow_job=WorkflowJobQueuedStrategy)
+def test_webhook_deferred(workflow_job, client, fastapp, runner_group: RunnerGroup):
+    deferring = Settings(queued_coalescing_window=0, webhook_defer_queue_depth=0)
+    fastapp.dependency_overrides[get_settings] = lambda: deferring
+    workflow_job.workflow_job.labels = runner_group.labels
+    data = workflow_job.json(exclude_unset=True)
+    headers = {"X-GitHub-Event": "workflow_job"}
+    queue: Queue = fastapp.dependency_overrides[get_queues]()["queued"]
+    key = queued_events_key(deferring, runner_group.labels)
+    queue.connection.delete(key)
+    scheduled = queue.scheduled_job_registry.count
+    # The queue is considered too long, the events are counted by a
+    # single scheduled scale job.
+    response = client.post("/webhook/", content=data, headers=headers)
+    assert response.status_code == 202
+    assert response.json()["message"] == "Deferred"
+    job = Job.fetch(response.json()["job_id"], connection=queue.connection)
+    assert job.func_name == "runner_manager.jobs.workflow_job.scale"
+    response = client.post("/webhook/", content=data, headers=headers)
+    assert response.status_code == 202
+    assert response.json()["job_id"] is None
+    assert queue.scheduled_job_registry.count == scheduled + 1
+    queue.scheduled_job_registry.remove(job, delete_job=True)
+
+
+@given(workflow_job=WorkflowJobQueuedStrategy)
+def test_webhook_full_group(workflow_job, client, fastapp, runner_group: RunnerGroup):
+    fastapp.dependency_overrides[get_settings] = lambda: Settings(
+        queued_coalescing_window=0
+    )
+    runner_group.max = 1
+    runner_group.save()
+    if not runner_group.is_full:
+        Runner(
+            name=runner_group.generate_runner_name(),
+            organization=runner_group.organization,
+            runner_group_id=runner_group.id,
+            runner_group_name=runner_group.name,
+            status="online",
+            busy=True,
+            labels=runner_group.runner_labels,
+            manager=runner_group.manager,
+        ).save()
+    queued = RunnerGroup.get(runner_group.pk).queued
+    workflow_job.workflow_job.labels = runner_group.labels
+    data = workflow_job.json(exclude_unset=True)
+    response = client.post(
+        "/webhook/", content=data, headers={"X-GitHub-Event": "workflow_job"}
+    )
+    # No job is enqueued, the runner is queued in the group.
+    assert response.status_code == 202
+    assert response.json()["message"] == "Deferred"
+    assert response.json()["job_id"] is None
+    assert RunnerGroup.get(runner_group.pk).queued == queued + 1
+
+
 @given(workflow_job=WorkflowJobCompletedStrategy)
 def test_webhook_authentication(workflow_job, client, authentified_app):
     data = workflow_job.json(exclude_unset=True)
@@ -14,6 +14,7 @@ from rq_scheduler import Scheduler
 from runner_manager import Runner, RunnerGroup, Settings
 from runner_manager.backend.base import BaseBackend
 from runner_manager.clients.github import GitHub
+from runner_manager.jobs.serializer import Job, JSONSerializer
 from runner_manager.models.runner_group import BaseRunnerGroup
 
 RT = TypeVar("RT")
@@ -117,13 +118,17 @@ def queue(settings) -> Queue:
     redis: Redis = get_redis_connection(
         url=settings.redis_om_url, decode_responses=False
     )
-    return Queue(is_async=False, connection=redis)
+    return Queue(
+        is_async=False, connection=redis, serializer=JSONSerializer, job_class=Job
+    )
 
 
 @fixture(scope="function")
 def scheduler(queue) -> Scheduler:
     """Return a RQ Scheduler instance."""
-    return Scheduler(queue=queue, connection=queue.connection)
+    return Scheduler(
+        queue=queue, connection=queue.connection, job_class=queue.job_class
+    )
 
 
 @fixture()
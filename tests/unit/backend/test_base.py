@@ -1,6 +1,11 @@
+import asyncio
+import threading
+import time
+
 from redis_om import Migrator
 
 from runner_manager import RunnerGroup
+from runner_manager.backend.base import BaseBackend
 from runner_manager.models.backend import InstanceConfig
 
 
@@ -74,3 +79,40 @@ def test_job_scripts(runner_group, runner):
     template = runner_group.backend.instance_config.template_startup(runner)
     assert 'echo "job started"' in template
     assert 'echo "job completed"' in template
+
+
+def test_backend_max_concurrency(backend, runner, monkeypatch):
+    backend.config.max_concurrency = 2
+    in_flight = peak = 0
+    lock = threading.Lock()
+
+    def slow_create(self, runner):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return runner
+
+    monkeypatch.setattr(BaseBackend, "create", slow_create)
+
+    async def create_all():
+        return await asyncio.gather(
+            *(backend.run(backend.create, runner) for _ in range(6))
+        )
+
+    assert len(asyncio.run(create_all())) == 6
+    assert peak == 2
+
+    # The bound is shared by the event loops of the process.
+    peak = 0
+    loops = [
+        threading.Thread(target=asyncio.run, args=(create_all(),)) for _ in range(3)
+    ]
+    for loop in loops:
+        loop.start()
+    for loop in loops:
+        loop.join()
+    assert peak == 2
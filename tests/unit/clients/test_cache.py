@@ -0,0 +1,112 @@
+from datetime import timedelta
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from runner_manager.clients.cache import Cache
+from runner_manager.clients.github import GitHub
+
+
+def test_cache_fetch(redis, settings):
+    cache = Cache(redis, f"{settings.name}:github")
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"url": f"https://example.com/{len(calls)}"}
+
+    assert cache.fetch("key", fetch, ttl=timedelta(hours=1)) == {
+        "url": "https://example.com/1"
+    }
+    # The entry is shared through redis.
+    other = Cache(redis, f"{settings.name}:github")
+    assert other.fetch("key", fetch, ttl=timedelta(hours=1)) == {
+        "url": "https://example.com/1"
+    }
+    assert len(calls) == 1
+    # Expired entries are fetched again.
+    assert cache.fetch("key", fetch, ttl=timedelta(0)) == {
+        "url": "https://example.com/2"
+    }
+    assert cache.refresh("key", fetch) == {"url": "https://example.com/3"}
+
+
+def test_cache_fallback(redis, settings):
+    cache = Cache(redis, f"{settings.name}:github")
+
+    def fail():
+        raise Exception("GitHub is down")
+
+    with pytest.raises(Exception, match="GitHub is down"):
+        cache.fetch("key", fail, ttl=timedelta(hours=1))
+    cache.set("key", "last-known")
+    assert cache.fetch("key", fail, ttl=timedelta(0)) == "last-known"
+    with pytest.raises(Exception, match="GitHub is down"):
+        cache.refresh("key", fail)
+
+
+def test_runner_download_url(github: GitHub, redis, settings, monkeypatch):
+    github.cache = Cache(redis, f"{settings.name}:github")
+    url = github.runner_download_url("octo-org", "linux", "x64")
+    assert url
+
+    def fail(*args, **kwargs):
+        raise Exception("GitHub is down")
+
+    monkeypatch.setattr(github.rest.actions, "list_runner_applications_for_org", fail)
+    assert github.runner_download_url("octo-org", "linux", "x64") == url
+    github.download_url_ttl = timedelta(0)
+    assert github.runner_download_url("octo-org", "linux", "x64") == url
+    with pytest.raises(Exception, match="GitHub is down"):
+        github.refresh_runner_download_url("octo-org", "linux", "x64")
+
+
+def test_runners_snapshot(github: GitHub, redis, settings, monkeypatch):
+    github.cache = Cache(redis, f"{settings.name}:github")
+    snapshot = github.runners_snapshot("octo-org")
+    assert snapshot.runners
+    for state in snapshot.runners.values():
+        assert state.status in ["online", "offline"]
+
+    def fail(*args, **kwargs):
+        raise Exception("GitHub is down")
+
+    # The snapshot is shared by the runner groups of the organization.
+    monkeypatch.setattr(github, "paginate", fail)
+    assert github.runners_snapshot("octo-org") == snapshot
+    # An expired snapshot is not returned when GitHub fails.
+    github.runners_snapshot_ttl = timedelta(0)
+    with pytest.raises(Exception, match="GitHub is down"):
+        github.runners_snapshot("octo-org")
+
+
+def test_conditional_get(github: GitHub, redis, settings, monkeypatch):
+    github.cache = Cache(redis, f"{settings.name}:github")
+    request = github._request
+    sent: List[Dict[str, str]] = []
+
+    def conditional_request(method, url, *, headers=None, **kwargs):
+        sent.append(dict(headers or {}))
+        response = request(method, url, headers=headers, **kwargs)
+        if headers and headers.get("If-None-Match") == '"etag"':
+            return httpx.Response(304, request=response.request)
+        return httpx.Response(
+            response.status_code,
+            content=response.content,
+            headers={"Content-Type": "application/json", "ETag": '"etag"'},
+            request=response.request,
+        )
+
+    monkeypatch.setattr(github, "_request", conditional_request)
+    group = github.rest.actions.get_self_hosted_runner_group_for_org(
+        org="octo-org", runner_group_id=2
+    ).parsed_data
+    assert "If-None-Match" not in sent[-1]
+    cached = github.rest.actions.get_self_hosted_runner_group_for_org(
+        org="octo-org", runner_group_id=2
+    )
+    assert sent[-1]["If-None-Match"] == '"etag"'
+    assert cached.status_code == 200
+    assert cached.parsed_data == group
+    assert github.cache.stats() == {"hits": 1, "misses": 1}
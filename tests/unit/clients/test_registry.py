@@ -0,0 +1,111 @@
+import threading
+import time
+from datetime import timedelta
+
+from runner_manager import RunnerGroup
+from runner_manager.clients.registry import ClientRegistry, registry
+
+
+def test_registry_get():
+    clients = ClientRegistry(ttl=timedelta(seconds=0.1))
+    client = clients.get(("base", "test"), object)
+    assert clients.get(("base", "test"), object) is client
+    assert clients.get(("base", "other"), object) is not client
+    clients.invalidate(("base", "test"))
+    rebuilt = clients.get(("base", "test"), object)
+    assert rebuilt is not client
+    time.sleep(0.1)
+    assert clients.get(("base", "test"), object) is not rebuilt
+    clients.clear()
+    assert len(clients) == 0
+
+
+def test_registry_close():
+    class Client:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    clients = ClientRegistry(ttl=timedelta(seconds=0.1), grace=timedelta())
+    client = clients.get(("base", "test"), Client)
+    clients.invalidate(("base", "test"))
+    assert client.closed
+    # Expired clients are closed once replaced.
+    client = clients.get(("base", "test"), Client)
+    time.sleep(0.1)
+    assert clients.get(("base", "test"), Client) is not client
+    assert client.closed
+    client = clients.get(("base", "test"), Client)
+    clients.clear()
+    assert not client.closed
+    client = clients.get(("base", "test"), Client)
+    clients.clear(close_clients=True)
+    assert client.closed
+
+
+def test_registry_grace():
+    class Client:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    clients = ClientRegistry(ttl=timedelta(seconds=0.1), grace=timedelta(seconds=0.2))
+    client = clients.get(("base", "test"), Client)
+    time.sleep(0.1)
+    rebuilt = clients.get(("base", "test"), Client)
+    # The evicted client may still be used by other threads.
+    assert rebuilt is not client
+    assert not client.closed
+    time.sleep(0.2)
+    clients.get(("base", "other"), Client)
+    assert client.closed
+    assert not rebuilt.closed
+    clients.invalidate(("base", "test"))
+    assert not rebuilt.closed
+    clients.clear(close_clients=True)
+    assert rebuilt.closed
+
+
+def test_registry_disabled():
+    clients = ClientRegistry(ttl=timedelta())
+    assert clients.get(("base", "test"), object) is not clients.get(
+        ("base", "test"), object
+    )
+    assert len(clients) == 0
+
+
+def test_registry_threads():
+    clients = ClientRegistry()
+    built = []
+
+    def factory():
+        time.sleep(0.05)
+        built.append(object())
+        return built[-1]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(clients.get(("k",), factory)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # The client is built once and shared by all the threads.
+    assert len(built) == 1
+    assert all(result is built[0] for result in results)
+
+
+def test_backend_cached_client(runner_group: RunnerGroup):
+    other = RunnerGroup(**runner_group.dict(exclude={"pk", "id", "name"}), name="other")
+    client = runner_group.backend.cached_client("test", object)
+    # Backends with the same config share their clients.
+    assert other.backend.cached_client("test", object) is client
+    other.backend.config.max_concurrency = 1
+    assert other.backend.cached_client("test", object) is not client
+    registry.invalidate(runner_group.backend.client_key("test"))
+    assert runner_group.backend.cached_client("test", object) is not client
+    registry.clear()
@@ -0,0 +1,24 @@
+from rq import Queue
+
+from runner_manager import Runner, RunnerGroup
+from runner_manager.clients.github import GitHub
+from runner_manager.jobs.counters import repair
+
+
+def test_repair_counters(
+    runner_group: RunnerGroup, queue: Queue, github: GitHub, redis
+):
+    runner_group.save()
+    runner = runner_group.create_runner(github)
+    assert runner is not None
+    assert runner_group.counters().total == 1
+    # Simulate counters that drifted.
+    Runner.delete_many([runner])
+    redis.delete(f"{Runner.Meta.global_key_prefix}:runner_counters:{runner_group.name}")
+    runner.save()
+    runner_group.create_runner(github)
+    assert runner_group.counters().total == 1
+
+    job = queue.enqueue(repair)
+    assert job.return_value()[runner_group.name].total == 2
+    assert runner_group.counters().total == 2
@@ -87,6 +87,60 @@ def test_need_new_runner_healthcheck(
     assert len(runner_group.get_runners()) == 1
 
 
+def test_healthcheck_idle_since(
+    runner_group: RunnerGroup, settings: Settings, github: GitHub
+):
+    runner_group.save()
+    runner: Runner = runner_group.create_runner(github)
+    # Removing id to avoid retrieving info from GitHub mock API
+    runner.id = None
+    runner.status = RunnerStatus.online
+    runner.save()
+    # Runner idle before idle_since was recorded
+    runner.db().json().set(runner.key(), "$.idle_since", None)
+    assert Runner.get(runner.pk).idle_since is None
+    runner_group.healthcheck(settings.time_to_live, settings.timeout_runner, github)
+    assert Runner.get(runner.pk).idle_since is not None
+    assert runner in runner_group.get_runners()
+
+
+def test_healthcheck_replacement(
+    runner_group: RunnerGroup, settings: Settings, github: GitHub
+):
+    runner_group.min = 1
+    runner_group.save()
+    runner: Runner = runner_group.create_runner(github, replacement=True)
+    assert runner_group.last_scale_up is None
+    # The runner never came online.
+    runner.id = None
+    runner.created_at = datetime.now(timezone.utc) - (
+        settings.timeout_runner + timedelta(minutes=1)
+    )
+    runner.save()
+    runner_group.healthcheck(settings.time_to_live, settings.timeout_runner, github)
+    runners = runner_group.get_runners()
+    assert runner not in runners
+    assert len(runners) == 1
+    # Replacing a runner does not restart the cooldown of the group.
+    assert RunnerGroup.get(runner_group.pk).last_scale_up is None
+
+
+def test_healthcheck_github_down(
+    runner_group: RunnerGroup, settings: Settings, github: GitHub, monkeypatch
+):
+    runner_group.max = 1
+    runner_group.min = 1
+    runner_group.save()
+
+    def fail(org: str):
+        raise Exception("GitHub is down")
+
+    monkeypatch.setattr(github, "runners_snapshot", fail)
+    runner_group.healthcheck(settings.time_to_live, settings.timeout_runner, github)
+    # The runner group is left untouched until the runners can be listed.
+    assert len(runner_group.get_runners()) == 0
+
+
 def test_time_to_start(runner: Runner, settings: Settings):
     runner.created_at = datetime.now(timezone.utc) - (
         settings.timeout_runner + timedelta(minutes=1)
@@ -37,6 +37,18 @@ def test_reset_job(runner_group: RunnerGroup, queue: Queue, github: GitHub):
     assert len(runner_group.get_runners()) == 1
 
 
+def test_reset_keeps_concurrent_changes(runner_group: RunnerGroup, github: GitHub):
+    runner_group.save()
+    runner = runner_group.create_runner(github)
+    runner.id = None
+    runner.save()
+    # The group is updated by another job while it is reset.
+    RunnerGroup.get(runner_group.pk).set_dynamic_min(2)
+    runner_group.reset(github)
+    assert runner not in runner_group.get_runners()
+    assert RunnerGroup.get(runner_group.pk).dynamic_min == 2
+
+
 def test_reset_job_group_not_found(queue: Queue, runner_group: RunnerGroup):
     # run job before creating runner group
     job = queue.enqueue(
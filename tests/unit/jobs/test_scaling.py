@@ -0,0 +1,26 @@
+from datetime import datetime, time, timedelta, timezone
+
+from rq_scheduler import Scheduler
+
+from runner_manager import RunnerGroup, Settings
+from runner_manager.jobs import scaling
+from runner_manager.models.scaling import ScalingWindow
+
+
+def test_schedule(runner_group: RunnerGroup, scheduler: Scheduler, settings: Settings):
+    assert scaling.schedule(runner_group) is None
+    runner_group.scaling_windows = [
+        ScalingWindow(start=time(8), end=time(19), min=2),
+    ]
+    runner_group.scaling_lead_time = timedelta(minutes=10)
+    runner_group.save()
+    now = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+    at = scaling.schedule(runner_group, now)
+    assert at == now.replace(hour=19)
+    jobs = [job for job in scheduler.get_jobs() if job.meta.get("type") == "scaling"]
+    assert len(jobs) == 1
+    assert jobs[0].args == [runner_group.pk]
+    assert jobs[0].origin == "maintenance"
+    assert jobs[0].timeout == settings.healthcheck_timeout.total_seconds()
+    at = scaling.schedule(runner_group, at)
+    assert at == now.replace(hour=7, minute=50) + timedelta(days=1)
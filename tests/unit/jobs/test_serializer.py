@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from hypothesis import given
+from rq import Queue
+from rq.serializers import DefaultSerializer
+
+from runner_manager.backend.docker import DockerBackend
+from runner_manager.jobs import workflow_job
+from runner_manager.jobs.serializer import Job, JSONSerializer
+from runner_manager.models.backend import DockerConfig
+from runner_manager.models.runner_group import BaseRunnerGroup
+from runner_manager.models.webhook import WorkflowJobWebhook
+
+from ...strategies import WorkflowJobInProgressStrategy
+
+
+@given(webhook=WorkflowJobInProgressStrategy)
+def test_serialize_webhook(webhook):
+    slim = WorkflowJobWebhook.parse_raw(webhook.json(exclude_unset=True))
+    data = JSONSerializer.dumps(("func", None, [slim], {}))
+    _, _, args, _ = JSONSerializer.loads(data)
+    assert args == [slim]
+    assert isinstance(args[0], WorkflowJobWebhook)
+
+
+def test_serialize_values():
+    values = {
+        "datetime": datetime(2023, 1, 1, tzinfo=timezone.utc),
+        "timedelta": timedelta(minutes=15),
+        "list": [1, "a", None],
+    }
+    assert JSONSerializer.loads(JSONSerializer.dumps(values)) == values
+
+
+def test_serialize_defaults():
+    # The discriminator of the backends is kept even if it was not set.
+    group = BaseRunnerGroup(
+        name="test",
+        organization="octo-org",
+        labels=["label"],
+        backend=DockerBackend(config=DockerConfig()),
+    )
+    loaded = JSONSerializer.loads(JSONSerializer.dumps(group))
+    assert isinstance(loaded.backend, DockerBackend)
+    assert loaded == group
+
+
+def test_serialize_unknown_model():
+    data = b'{"__model__": "os.system", "data": {}}'
+    with pytest.raises(ValueError):
+        JSONSerializer.loads(data)
+    with pytest.raises(TypeError):
+        JSONSerializer.dumps(object())
+
+
+def test_load_pickled_job():
+    # Jobs enqueued before the JSON serializer was configured
+    data = ("func", None, ["pk"], {})
+    assert JSONSerializer.loads(DefaultSerializer.dumps(data)) == data
+
+
+@given(webhook=WorkflowJobInProgressStrategy)
+def test_json_job(webhook, queue: Queue):
+    queue = Queue(
+        connection=queue.connection,
+        is_async=False,
+        serializer=JSONSerializer,
+        job_class=Job,
+    )
+    now = datetime.now(timezone.utc)
+    slim = WorkflowJobWebhook.parse_raw(webhook.json(exclude_unset=True))
+    slim.workflow_job.created_at = now
+    slim.workflow_job.started_at = now + timedelta(seconds=30)
+    job = queue.enqueue(workflow_job.time_to_start, slim)
+    fetched = Job.fetch(job.id, connection=queue.connection)
+    assert list(fetched.args) == [slim]
+    assert fetched.return_value() == timedelta(seconds=30)
@@ -62,6 +62,7 @@ def test_scheduler(
     is_runner_leaks: bool = False
     for job in jobs:
         job_type = job.meta.get("type")
+        assert job.origin == "maintenance"
         if job_type == "indexing":
             is_indexing = True
         elif job_type == "healthcheck":
@@ -75,6 +76,18 @@ def test_scheduler(
     assert is_runner_leaks is True
 
 
+def test_scheduler_reconciler(
+    queue: Queue, settings: Settings, github: GitHub, scheduler: Scheduler
+):
+    """Healthchecks and leaks are not scheduled when run by the reconcilers."""
+    settings.reconciler = True
+    queue.enqueue(startup, settings)
+    job_types = {job.meta.get("type") for job in scheduler.get_jobs()}
+    assert "indexing" in job_types
+    assert "healthcheck" not in job_types
+    assert "leaks" not in job_types
+
+
 def test_update_group_sync(settings: Settings, github: GitHub):
     sync_runner_groups(settings)
     runner_group: RunnerGroup = RunnerGroup.find().first()
@@ -16,10 +16,14 @@ from rq import Queue
 from rq.job import Job, JobStatus
 
 from runner_manager import Settings
+from runner_manager.backend.base import BaseBackend
+from runner_manager.dependencies import get_queues, get_settings
 from runner_manager.jobs import workflow_job
 from runner_manager.models.base import BaseModel
+from runner_manager.models.rate_limit import RateLimitTimeout
 from runner_manager.models.runner import Runner
 from runner_manager.models.runner_group import RunnerGroup
+from runner_manager.models.webhook import WorkflowJobWebhook
 
 from ...strategies import (
     QueueStrategy,
@@ -203,6 +207,48 @@ def test_workflow_job_queued(
     assert runner.status == "offline"
 
 
+@settings(max_examples=10)
+@given(
+    webhook=WorkflowJobQueuedStrategy,
+    queue=QueueStrategy,
+    settings=SettingsStrategy,
+    redis=RedisStrategy,
+)
+def test_workflow_job_scale(
+    webhook: WorkflowJobQueued, queue: Queue, settings: Settings, redis: Redis
+):
+    init_model(Runner, redis, settings)
+    init_model(RunnerGroup, redis, settings)
+    assert webhook.organization
+    runner_group: RunnerGroup = RunnerGroup(
+        id=1,
+        organization=webhook.organization.login,
+        name=f"queued-{uuid4().hex.lower()}",
+        labels=webhook.workflow_job.labels,
+        manager=settings.name,
+        backend={"name": "base"},
+        max=2,
+    )
+    runner_group.save()
+    Migrator().run()
+    wait_for_migration(RunnerGroup)
+
+    # Three queued events were received during the window
+    labels = webhook.workflow_job.labels
+    # The job reads the settings of the application
+    key = workflow_job.queued_events_key(get_settings(), labels)
+    redis.set(key, 3)
+    job: Job = queue.enqueue(workflow_job.scale, labels)
+    assert job.get_status() == JobStatus.FINISHED
+    assert len(job.result) == 2
+    assert redis.get(key) is None
+    assert len(runner_group.get_runners()) == 2
+    assert RunnerGroup.get(runner_group.pk).queued == 1
+    # Nothing left to process
+    job = queue.enqueue(workflow_job.scale, labels)
+    assert job.result == []
+
+
 @settings(max_examples=10)
 @given(
     webhook=WorkflowJobInProgressStrategy,
@@ -260,3 +306,67 @@ def test_workflow_job_time_to_start(
     # ensure we remain with two runners given that the max for the runner group is 2
     queue.enqueue(workflow_job.in_progress, webhook)
     assert len(runner_group.get_runners()) == 2
+
+
+def test_workflow_job_scale_lane_busy(
+    runner_group: RunnerGroup, queue: Queue, redis: Redis
+):
+    runner_group.save()
+    labels = runner_group.labels
+    key = workflow_job.queued_events_key(get_settings(), labels)
+    redis.set(key, 2)
+    scheduled = get_queues()[queue.name].scheduled_job_registry
+    count = scheduled.count
+    with runner_group.lane():
+        job: Job = queue.enqueue(workflow_job.scale, labels)
+    # The job does not wait for the lane, it runs again later.
+    assert job.get_status() == JobStatus.FINISHED
+    assert job.result == []
+    assert redis.get(key) == "2"
+    assert scheduled.count == count + 1
+    assert runner_group.get_runners() == []
+
+
+def test_workflow_job_scale_failed(
+    runner_group: RunnerGroup, queue: Queue, redis: Redis, monkeypatch
+):
+    runner_group.max = 2
+    runner_group.save()
+    labels = runner_group.labels
+    key = workflow_job.queued_events_key(get_settings(), labels)
+    redis.set(key, 3)
+
+    def failing_create(self, runner: Runner) -> Runner:
+        raise Exception("Failed to create instance")
+
+    monkeypatch.setattr(BaseBackend, "create", failing_create)
+    job: Job = queue.enqueue(workflow_job.scale, labels)
+    assert job.result == []
+    # The runners not created are queued once, the events are not given back.
+    assert redis.get(key) is None
+    assert RunnerGroup.get(runner_group.pk).queued == 3
+
+
+def test_workflow_job_queued_rate_limited(
+    runner_group: RunnerGroup, queue: Queue, monkeypatch
+):
+    runner_group.save()
+    webhook = WorkflowJobWebhook.parse_obj(
+        {
+            "action": "queued",
+            "workflow_job": {"id": 1, "labels": runner_group.labels},
+            "repository": {"name": "repo", "full_name": "octo-org/repo"},
+        }
+    )
+
+    def rate_limited(self, github):
+        raise RateLimitTimeout("Rate limit of base default exceeded for create")
+
+    monkeypatch.setattr(RunnerGroup, "create_runner", rate_limited)
+    scheduled = get_queues()[queue.name].scheduled_job_registry
+    count = scheduled.count
+    job: Job = queue.enqueue(workflow_job.queued, webhook)
+    # The job runs again once the rate limit is refilled.
+    assert job.get_status() == JobStatus.FINISHED
+    assert job.result is None
+    assert scheduled.count == count + 1
@@ -0,0 +1,81 @@
+from runner_manager import Runner, RunnerGroup
+from runner_manager.models import counters
+from runner_manager.models.runner import RunnerStatus
+
+
+def test_counters_save_delete(runner_group: RunnerGroup):
+    runner_group.save()
+    runner = Runner(
+        name="runner",
+        runner_group_name=runner_group.name,
+        runner_group_id=runner_group.id,
+        status=RunnerStatus.offline,
+        busy=False,
+    )
+    runner.save()
+    group_counters = runner_group.counters()
+    assert group_counters.total == 1
+    assert group_counters.offline == 1
+    assert group_counters.not_active == 1
+
+    # Saving the runner again must not count it twice.
+    runner.save()
+    assert runner_group.counters().total == 1
+
+    runner.status = RunnerStatus.online
+    runner.busy = True
+    runner.save()
+    group_counters = runner_group.counters()
+    assert group_counters.total == 1
+    assert group_counters.offline == 0
+    assert group_counters.active == 1
+    assert group_counters.not_active == 0
+
+    runner.busy = False
+    runner.save()
+    assert runner_group.counters().idle == 1
+    assert runner_group.counters().active == 0
+
+    Runner.delete(runner.pk)
+    group_counters = runner_group.counters()
+    assert group_counters.total == 0
+    assert group_counters.idle == 0
+    # Deleting an unknown runner does not change the counters.
+    Runner.delete(runner.pk)
+    assert runner_group.counters().total == 0
+
+
+def test_counters_rebuild(runner_group: RunnerGroup, redis):
+    runner_group.save()
+    runners = [
+        Runner(
+            name=f"runner-{i}",
+            runner_group_name=runner_group.name,
+            runner_group_id=runner_group.id,
+            status=RunnerStatus.online,
+            busy=i % 2 == 0,
+        )
+        for i in range(3)
+    ]
+    for runner in runners:
+        runner.save()
+    # delete_many bypasses the counters.
+    Runner.delete_many(runners[:1])
+    assert runner_group.counters().total == 3
+
+    prefix = Runner.Meta.global_key_prefix
+    redis.hset(counters.counters_key(prefix, "removed"), "total", 1)
+    result = counters.rebuild(
+        redis,
+        prefix,
+        lambda: (
+            [(r.pk, r.runner_group_name, r.state) for r in runners[1:]],
+            [runner_group.name],
+        ),
+    )
+    assert result[runner_group.name].total == 2
+    group_counters = runner_group.counters()
+    assert group_counters.total == 2
+    assert group_counters.active == 1
+    assert group_counters.idle == 1
+    assert not redis.exists(counters.counters_key(prefix, "removed"))
@@ -0,0 +1,69 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from runner_manager import RunnerGroup
+from runner_manager.models import demand
+
+
+def test_ewma():
+    assert demand.ewma([]) == 0
+    assert demand.ewma([4, 4, 4]) == 4
+    assert demand.ewma([0, 0, 10], alpha=0.5) == 5
+
+
+def test_seasonal():
+    week = demand.buckets_per_week()
+    counts = {10: 4, 10 + week: 8}
+    assert demand.seasonal(counts, 10 + 2 * week, first=10) == 6
+    # Weeks before the first bucket recorded are unknown.
+    assert demand.seasonal(counts, 10 + 2 * week, first=11) == 8
+    assert demand.seasonal(counts, 10, first=10) is None
+
+
+def test_predict():
+    week = demand.buckets_per_week()
+    counts = {bucket: 2 for bucket in range(week + 10)}
+    # A peak at the same time last week.
+    counts[week + 10] = 0
+    counts[10] = 20
+    forecast = demand.predict(counts, week + 10, first=0)
+    assert forecast.ewma == pytest.approx(2)
+    assert forecast.seasonal == 20
+    assert forecast.expected == pytest.approx(11)
+
+
+def test_forecast(runner_group: RunnerGroup):
+    runner_group.forecast_min = True
+    runner_group.min = 1
+    runner_group.max = 5
+    runner_group.save()
+    prefix = runner_group.Meta.global_key_prefix
+    now = time.time()
+    current = demand.bucket_of(now)
+    db = runner_group.db()
+    for bucket in range(current - 8, current):
+        db.hset(demand.demand_key(prefix, runner_group.name), str(bucket), 90)
+    # Expired buckets are dropped.
+    old = current - demand.buckets_per_week() * (demand.RETENTION_WEEKS + 1)
+    db.hset(demand.demand_key(prefix, runner_group.name), str(old), 1)
+    runner_group.record_time_to_start(timedelta(seconds=30))
+    runner_group.record_time_to_start(timedelta(seconds=40))
+    forecast = runner_group.forecast()
+    assert forecast.expected == pytest.approx(90)
+    assert forecast.lead_time == 40
+    # 90 jobs in 15 minutes, 4 jobs queued while a runner starts.
+    assert forecast.min == 4
+    assert not db.hexists(demand.demand_key(prefix, runner_group.name), str(old))
+
+    runner_group.set_dynamic_min(forecast.min)
+    assert RunnerGroup.get(runner_group.pk).effective_min == 4
+    runner_group.set_dynamic_min(10)
+    # The max remains the bound of the forecast.
+    assert runner_group.effective_min == 5
+    runner_group.set_dynamic_min(0)
+    assert runner_group.effective_min == 1
+    runner_group.forecast_min = False
+    runner_group.set_dynamic_min(4)
+    assert runner_group.effective_min == 1
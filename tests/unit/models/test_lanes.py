@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List, Tuple
+
+import pytest
+
+from runner_manager import Runner, RunnerGroup
+from runner_manager.models import histograms, lanes
+
+
+def test_lane(runner_group: RunnerGroup):
+    runner_group.save()
+    events: List[Tuple[str, int]] = []
+
+    def job(i: int):
+        with runner_group.lane():
+            events.append(("start", i))
+            time.sleep(0.1)
+            events.append(("end", i))
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(job, range(3)))
+    # Jobs of the same group do not overlap.
+    for start, end in zip(events[::2], events[1::2]):
+        assert start[0] == "start" and end == ("end", start[1])
+    prefix = Runner.Meta.global_key_prefix
+    db = runner_group.db()
+    waits = histograms.histograms(db, lanes.waits_key(prefix), lanes.WAIT_BUCKETS)
+    buckets, total = waits[(runner_group.name,)]
+    assert buckets[-1] == ("+Inf", 3)
+    assert total >= 0.3
+    assert lanes.contentions(db, prefix)[runner_group.name]["contended"] == 2
+
+
+def test_lane_timeout(runner_group: RunnerGroup):
+    runner_group.save()
+    other = RunnerGroup(
+        **runner_group.dict(exclude={"pk", "id", "name", "labels"}),
+        name=f"{runner_group.name}-other",
+        labels=["other"],
+    )
+    with runner_group.lane():
+        with pytest.raises(lanes.LaneTimeout):
+            with runner_group.lane(wait=timedelta(seconds=0.1)):
+                pass
+        # Other groups run in parallel.
+        with other.lane(wait=timedelta(seconds=0.1)):
+            pass
+    contentions = lanes.contentions(runner_group.db(), Runner.Meta.global_key_prefix)
+    assert contentions == {runner_group.name: {"contended": 1, "timeout": 1}}
+    # The lane is released.
+    with runner_group.lane(wait=timedelta(seconds=0.1)):
+        pass
@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from runner_manager import Runner, RunnerGroup
+from runner_manager.models import histograms, rate_limit
+from runner_manager.models.rate_limit import RateLimit, RateLimitTimeout
+
+
+def test_take(redis):
+    limit = RateLimit(rate=10, burst=2, max_wait=timedelta(seconds=0.25))
+    key = rate_limit.bucket_key("test", "base", "default")
+    waits = [rate_limit.take(redis, key, limit) for _ in range(4)]
+    # The burst is served at once, then a token is added every 0.1s.
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.2, abs=0.02)
+    # Tokens are not taken beyond the max wait.
+    assert rate_limit.take(redis, key, limit) is None
+    assert redis.pttl(key) > 0
+
+
+def test_throttle(runner_group: RunnerGroup):
+    backend = runner_group.backend
+    assert backend.throttle("create") == 0.0
+    backend.config.rate_limit = RateLimit(
+        rate=20, burst=1, max_wait=timedelta(seconds=0.1)
+    )
+    start = time.monotonic()
+    backend.throttle("create")
+    assert backend.throttle("create") > 0
+    assert time.monotonic() - start >= 0.04
+    prefix = Runner.Meta.global_key_prefix
+    # Tokens taken by the other workers.
+    key = rate_limit.bucket_key(prefix, "base", backend.rate_limit_scope)
+    for _ in range(2):
+        rate_limit.take(Runner.db(), key, backend.config.rate_limit)
+    with pytest.raises(RateLimitTimeout):
+        backend.throttle("delete")
+    waits = histograms.histograms(
+        Runner.db(), rate_limit.waits_key(prefix), rate_limit.WAIT_BUCKETS
+    )
+    assert waits[("base", "create")][0][-1] == ("+Inf", 2)
@@ -0,0 +1,74 @@
+from runner_manager.models.routing import RoutingIndex, routing_value
+
+
+def build(groups):
+    index = RoutingIndex()
+    index.build(
+        "routing",
+        1,
+        {name: routing_value(name, labels) for name, labels in groups.items()},
+    )
+    return index
+
+
+def test_route_best_fit():
+    index = build(
+        {
+            "linux": ["self-hosted", "linux"],
+            "linux-large": ["self-hosted", "linux", "large"],
+            "linux-gpu": ["self-hosted", "linux", "large", "gpu"],
+        }
+    )
+    assert index.route(["linux"]).name == "linux"
+    assert index.route(["self-hosted", "linux"]).name == "linux"
+    assert index.route(["large"]).name == "linux-large"
+    assert index.route(["linux", "gpu"]).name == "linux-gpu"
+    assert [entry.name for entry in index.candidates(["linux"])] == [
+        "linux",
+        "linux-large",
+        "linux-gpu",
+    ]
+
+
+def test_route_not_found():
+    index = build({"linux": ["self-hosted", "linux"]})
+    assert index.route(["windows"]) is None
+    assert index.route(["linux", "windows"]) is None
+    assert index.route([]) is None
+
+
+def test_route_case_insensitive():
+    index = build(
+        {
+            "linux": ["Self-Hosted", "Linux"],
+            "linux-large": ["self-hosted", "linux", "LARGE"],
+        }
+    )
+    assert index.route(["linux"]).name == "linux"
+    assert index.route(["SELF-HOSTED", "linux"]).name == "linux"
+    assert index.route(["Large"]).name == "linux-large"
+    assert index.route(["Windows"]) is None
+
+
+def test_route_deterministic():
+    index = build({"b": ["self-hosted", "b", "x"], "a": ["self-hosted", "a", "x"]})
+    # Same number of extra labels, ordered by name
+    assert index.route(["x"]).name == "a"
+
+
+def test_is_current():
+    index = build({"linux": ["linux"]})
+    assert index.is_current("routing", 1)
+    assert not index.is_current("routing", 2)
+    assert not index.is_current("other", 1)
+
+
+def test_is_fresh():
+    index = build({"linux": ["linux"]})
+    assert index.is_fresh("routing", 5)
+    assert not index.is_fresh("routing", 0)
+    assert not index.is_fresh("other", 5)
+    index.invalidate()
+    assert not index.is_fresh("routing", 5)
+    index.checked()
+    assert index.is_fresh("routing", 5)
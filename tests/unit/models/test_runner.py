@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 from githubkit.versions.latest.models import (
@@ -9,8 +9,9 @@ from hypothesis import strategies as st
 from pytest import raises
 from redis_om import Migrator, NotFoundError
 
-from runner_manager.clients.github import GitHub
-from runner_manager.models.runner import Runner
+from runner_manager.clients.github import GitHub, RunnersSnapshot, RunnerState
+from runner_manager.models.counters import get_counters
+from runner_manager.models.runner import Runner, RunnerStatus
 
 from ...strategies import WorkflowJobCompletedStrategy
 
@@ -30,6 +31,25 @@ def test_runner_create_delete(runner: Runner):
         Runner.get(runner.pk)
 
 
+def test_bulk_save(settings):
+    runners = [
+        Runner(
+            name=f"runner-{i}",
+            runner_group_name="test",
+            status=RunnerStatus.offline,
+            busy=False,
+        )
+        for i in range(5)
+    ]
+    assert Runner.bulk_save(runners, chunk_size=2) == runners
+    for runner in runners:
+        assert Runner.get(runner.pk) == runner
+    # The counters are updated as part of the pipelines.
+    counters = get_counters(Runner.db(), settings.name, "test")
+    assert counters.total == 5
+    assert counters.offline == 5
+
+
 def test_find_runner(runner: Runner):
     runner.save()
     Migrator().run()
@@ -87,6 +107,33 @@ def test_update_from_github(runner: Runner, github: GitHub):
     assert runner.busy is False
 
 
+def test_update_from_snapshot(runner: Runner):
+    runner.id = 1
+    runner.status = RunnerStatus.offline
+    runner.busy = False
+    runner.created_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    snapshot = RunnersSnapshot(
+        runners={1: RunnerState(status="online", busy=True)},
+        fetched_at=datetime.now(timezone.utc),
+    )
+    assert runner.update_from_snapshot(snapshot) is True
+    assert runner.status == RunnerStatus.online
+    assert runner.busy is True
+    assert runner.update_from_snapshot(snapshot) is False
+
+    # The runner does not exist anymore on GitHub.
+    snapshot.runners = {}
+    assert runner.update_from_snapshot(snapshot) is True
+    assert runner.status == RunnerStatus.offline
+    assert runner.busy is False
+
+    # Runners registered after the snapshot are left untouched.
+    runner.status = RunnerStatus.online
+    runner.created_at = datetime.now(timezone.utc)
+    assert runner.update_from_snapshot(snapshot) is False
+    assert runner.status == RunnerStatus.online
+
+
 def test_runner_timezone(runner: Runner):
     runner.started_at = datetime.now(timezone.utc)
     assert runner.created_at is not None
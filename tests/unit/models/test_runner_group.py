@@ -1,4 +1,5 @@
-from datetime import timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 import pytest
 from githubkit.versions.latest.models import (
@@ -11,8 +12,14 @@ from redis_om import Migrator, NotFoundError
 from runner_manager import Runner
 from runner_manager.backend.base import BaseBackend
 from runner_manager.clients.github import GitHub
+from runner_manager.models.rate_limit import RateLimitTimeout
 from runner_manager.models.runner import RunnerStatus
-from runner_manager.models.runner_group import BaseRunnerGroup, RunnerGroup
+from runner_manager.models.runner_group import (
+    BaseRunnerGroup,
+    RunnerGroup,
+    routing_index,
+)
+from runner_manager.models.scaling import ScaleDownPolicy
 
 from ...strategies import WorkflowJobCompletedStrategy
 
@@ -81,6 +88,40 @@ def test_find_runner_group_labels(runner_group: RunnerGroup):
     assert RunnerGroup.find_from_labels(runner_group.labels) == runner_group
 
 
+def test_find_runner_group_best_fit(runner_group: RunnerGroup):
+    runner_group.labels = ["label", "large"]
+    runner_group.save()
+    small = RunnerGroup(
+        name="small",
+        organization="octo-org",
+        labels=["label"],
+        backend={"name": "base"},
+    )
+    small.save()
+    assert RunnerGroup.find_from_labels(["label"]) == small
+    assert RunnerGroup.find_from_labels(["label", "large"]) == runner_group
+    # The routing index is rebuilt when the labels change
+    small.labels = ["label", "small"]
+    small.save()
+    assert RunnerGroup.find_from_labels(["small"]) == small
+    RunnerGroup.delete(small.pk)
+    assert RunnerGroup.find_from_labels(["label"]) == runner_group
+    assert RunnerGroup.find_from_labels(["small"]) is None
+
+
+def test_find_runner_group_ttl(runner_group: RunnerGroup):
+    runner_group.save()
+    assert RunnerGroup.find_from_labels(["label"]) == runner_group
+    # Groups changed by another process are only seen once the TTL expired
+    key, version_key = RunnerGroup.routing_keys()
+    db = RunnerGroup.db()
+    db.hdel(key, runner_group.pk)
+    db.incr(version_key)
+    assert RunnerGroup.find_from_labels(["label"]) == runner_group
+    routing_index.invalidate()
+    assert RunnerGroup.find_from_labels(["label"]) is None
+
+
 def test_applied_config_backend(runner_group: RunnerGroup):
     runner_group.save()
     assert runner_group.manager is not None
@@ -248,3 +289,161 @@ def test_is_full(runner_group: RunnerGroup, github: GitHub):
     assert runner_group.is_full is False
     runner_group.create_runner(github)
     assert runner_group.is_full is True
+
+
+def test_scale_up(runner_group: RunnerGroup, github: GitHub):
+    runner_group.max = 3
+    runner_group.queued = 1
+    runner_group.save()
+    runners = runner_group.scale_up(github, 2)
+    assert len(runners) == 2
+    assert len(runner_group.get_runners()) == 2
+    # The queued runner is considered as created
+    assert runner_group.queued == 0
+    # Only one runner fits, the others are queued
+    runners = runner_group.scale_up(github, 3)
+    assert len(runners) == 1
+    assert runner_group.is_full is True
+    assert runner_group.queued == 2
+    assert RunnerGroup.get(runner_group.pk).queued == 2
+    assert runner_group.scale_up(github, 0) == []
+
+
+def test_increment_queued(runner_group: RunnerGroup):
+    runner_group.save()
+    other: RunnerGroup = RunnerGroup.get(runner_group.pk)
+    assert runner_group.increment_queued() == 1
+    # Increments are applied on the stored value
+    assert other.increment_queued(2) == 3
+    assert RunnerGroup.get(runner_group.pk).queued == 3
+    assert runner_group.increment_queued(-3) == 0
+
+
+def test_reserve_release(runner_group: RunnerGroup):
+    runner_group.max = 2
+    runner_group.queued = 1
+    runner_group.save()
+    other: RunnerGroup = RunnerGroup.get(runner_group.pk)
+    tokens = runner_group.reserve()
+    assert len(tokens) == 1
+    # The queued runner got the slot.
+    assert RunnerGroup.get(runner_group.pk).queued == 0
+    # Only one slot is left for the other workers.
+    assert len(other.reserve(2)) == 1
+    assert other.queued == 1
+    assert other.reserve() == []
+    assert RunnerGroup.get(runner_group.pk).queued == 2
+    runner_group.release(*tokens)
+    assert len(other.reserve()) == 1
+
+
+def test_create_runner_concurrently(runner_group: RunnerGroup, github: GitHub):
+    runner_group.max = 3
+    runner_group.save()
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        runners = list(
+            executor.map(
+                lambda _: RunnerGroup.get(runner_group.pk).create_runner(github),
+                range(10),
+            )
+        )
+    assert len([runner for runner in runners if runner is not None]) == 3
+    assert runner_group.counters().total == 3
+    assert len(runner_group.get_runners()) == 3
+    # Runners created after others were queued are taken from the queue.
+    assert 4 <= RunnerGroup.get(runner_group.pk).queued <= 7
+
+
+def test_deficit(runner_group: RunnerGroup, github: GitHub):
+    runner_group.max = 3
+    runner_group.min = 2
+    runner_group.save()
+    assert runner_group.deficit == 2
+    runner_group.queued = 5
+    assert runner_group.deficit == 3
+    runner_group.queued = 0
+    runner_group.create_runner(github)
+    assert runner_group.deficit == 1
+
+
+def test_create_runners(runner_group: RunnerGroup, github: GitHub, monkeypatch):
+    runner_group.max = 4
+    runner_group.save()
+    create = BaseBackend.create
+
+    def flaky_create(self, runner: Runner) -> Runner:
+        if runner.name == failing:
+            raise Exception("Failed to create instance")
+        return create(self, runner)
+
+    failing = None
+    register = RunnerGroup.register_runner
+
+    def register_runner(
+        self, github: GitHub, download_url: str, reserved_at=None
+    ) -> Runner:
+        nonlocal failing
+        runner = register(self, github, download_url, reserved_at)
+        failing = failing or runner.name
+        return runner
+
+    monkeypatch.setattr(BaseBackend, "create", flaky_create)
+    monkeypatch.setattr(RunnerGroup, "register_runner", register_runner)
+    results = runner_group.create_runners(github, 3, concurrency=3)
+    assert len(results) == 3
+    assert len([result for result in results if result.success]) == 2
+    failed = [result for result in results if not result.success]
+    assert failed[0].runner.name == failing
+    assert failed[0].error == "Failed to create instance"
+    # The failed runner does not hold a slot of the group.
+    assert runner_group.counters().total == 2
+    assert len(runner_group.get_runners()) == 2
+    assert len(runner_group.create_runners(github, 3)) == 2
+
+
+def test_create_runner_rate_limited(
+    runner_group: RunnerGroup, github: GitHub, monkeypatch
+):
+    runner_group.save()
+
+    def rate_limited(self, runner: Runner) -> Runner:
+        raise RateLimitTimeout("Rate limit of base default exceeded for create")
+
+    monkeypatch.setattr(BaseBackend, "create", rate_limited)
+    with pytest.raises(RateLimitTimeout):
+        runner_group.create_runner(github)
+    # The registered runner is deleted, the job creates another one later.
+    assert runner_group.get_runners() == []
+    assert runner_group.counters().total == 0
+
+
+def test_scale_down(runner_group: RunnerGroup, github: GitHub):
+    runner_group.max = 5
+    runner_group.scale_down_policy = ScaleDownPolicy(
+        idle_age=timedelta(minutes=5), cooldown=timedelta(minutes=10), max_deletions=2
+    )
+    runner_group.save()
+    runners = runner_group.scale_up(github, 4)
+    assert runner_group.last_scale_up is not None
+    for runner in runners:
+        runner.status = RunnerStatus.online
+        runner.save()
+        assert runner.idle_since is not None
+    # Runners are kept during the cooldown after the scale-up.
+    assert runner_group.scale_down(github) == []
+    runner_group.record_scale("up", datetime.now(timezone.utc) - timedelta(hours=1))
+    assert RunnerGroup.get(runner_group.pk).last_scale_up == runner_group.last_scale_up
+    # Runners idle for less than the idle age are kept.
+    assert runner_group.scale_down(github) == []
+    for minutes, runner in zip([10, 30, 20], runners):
+        runner.idle_since = datetime.now(timezone.utc) - timedelta(minutes=minutes)
+        runner.save()
+    # The longest idle runners are deleted, up to max_deletions.
+    deleted = runner_group.scale_down(github)
+    assert [runner.name for runner in deleted] == [runners[1].name, runners[2].name]
+    assert runner_group.counters().total == 2
+    assert runner_group.last_scale_down is not None
+    # A runner picking a job is no longer idle.
+    runners[0].busy = True
+    runners[0].save()
+    assert runners[0].idle_since is None
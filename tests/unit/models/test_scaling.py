@@ -0,0 +1,99 @@
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from pydantic import ValidationError
+
+from runner_manager import RunnerGroup
+from runner_manager.models.scaling import ScalingWindow, next_transition, scheduled_min
+
+paris = ZoneInfo("Europe/Paris")
+# Monday
+monday = datetime(2026, 10, 19, tzinfo=paris)
+
+
+def test_days():
+    window = ScalingWindow(days="mon-fri", start=time(8), end=time(19), min=1)
+    assert window.days == ["mon", "tue", "wed", "thu", "fri"]
+    window = ScalingWindow(days=["sun", "fri-sat"], start=time(8), end=time(19), min=1)
+    assert window.days == ["fri", "sat", "sun"]
+    window = ScalingWindow(days="sat-mon", start=time(8), end=time(19), min=1)
+    assert window.days == ["mon", "sat", "sun"]
+    with pytest.raises(ValidationError):
+        ScalingWindow(days="monday", start=time(8), end=time(19), min=1)
+    with pytest.raises(ValidationError):
+        ScalingWindow(start=time(8), end=time(19), timezone="Europe/Nowhere", min=1)
+
+
+def test_active():
+    window = ScalingWindow(
+        days="mon-fri", start=time(8), end=time(19), timezone="Europe/Paris", min=25
+    )
+    assert window.active(monday.replace(hour=8))
+    assert window.active(monday.replace(hour=18, minute=59))
+    assert not window.active(monday.replace(hour=19))
+    assert not window.active(monday.replace(hour=7, minute=45))
+    assert window.active(monday.replace(hour=7, minute=45), timedelta(minutes=15))
+    # Sunday
+    assert not window.active(monday.replace(hour=12) - timedelta(days=1))
+    # The timezone of the window applies: 07:00 UTC is 09:00 in Paris.
+    assert window.active(datetime(2026, 10, 19, 7, tzinfo=ZoneInfo("UTC")))
+
+    overnight = ScalingWindow(days="fri", start=time(22), end=time(2), min=3)
+    saturday = datetime(2026, 10, 24, tzinfo=ZoneInfo("UTC"))
+    assert overnight.active(saturday.replace(hour=1))
+    assert not overnight.active(saturday.replace(hour=2))
+    assert not overnight.active(saturday.replace(hour=23))
+
+
+def test_scheduled_min():
+    windows = [
+        ScalingWindow(
+            days="mon-fri", start=time(8), end=time(19), timezone="Europe/Paris", min=25
+        ),
+        ScalingWindow(
+            days="mon", start=time(9), end=time(10), timezone="Europe/Paris", min=40
+        ),
+    ]
+    assert scheduled_min(windows, 2, monday.replace(hour=7)) == 2
+    assert scheduled_min(windows, 2, monday.replace(hour=8)) == 25
+    assert scheduled_min(windows, 2, monday.replace(hour=9, minute=30)) == 40
+    assert scheduled_min([], 2, monday.replace(hour=9)) == 2
+
+
+def test_next_transition():
+    windows = [
+        ScalingWindow(
+            days="mon-fri", start=time(8), end=time(19), timezone="Europe/Paris", min=25
+        )
+    ]
+    lead_time = timedelta(minutes=10)
+    # From Sunday to the pre-warm of Monday morning.
+    assert next_transition(windows, monday - timedelta(hours=1), lead_time) == (
+        monday.replace(hour=7, minute=50)
+    )
+    assert next_transition(windows, monday.replace(hour=7, minute=50), lead_time) == (
+        monday.replace(hour=19)
+    )
+    # From Friday evening to Monday.
+    friday = monday + timedelta(days=4)
+    assert next_transition(windows, friday.replace(hour=19), lead_time) == (
+        monday.replace(hour=7, minute=50) + timedelta(days=7)
+    )
+    assert next_transition([], monday) is None
+
+
+def test_effective_min(runner_group: RunnerGroup):
+    runner_group.min = 2
+    runner_group.max = 10
+    runner_group.scaling_windows = [
+        ScalingWindow(start=time(0), end=time(0), min=25),
+    ]
+    # The window applies all day every day, bounded by the max.
+    assert runner_group.effective_min == 10
+    runner_group.save()
+    assert RunnerGroup.get(runner_group.pk).scaling_windows == (
+        runner_group.scaling_windows
+    )
+    runner_group.scaling_windows = []
+    assert runner_group.effective_min == 2
@@ -1,5 +1,6 @@
 import os
 import tempfile
+from datetime import timedelta
 
 import pytest
 import yaml
@@ -10,6 +11,7 @@ from pydantic import ConfigError
 from pytest import fixture
 
 from runner_manager.dependencies import get_settings
+from runner_manager.models import lanes
 from runner_manager.models.runner_group import RunnerGroup
 from runner_manager.models.settings import ConfigFile, Settings
 
@@ -65,6 +67,16 @@ def test_settings_default_values():
     assert settings.github_base_url == os.getenv("GITHUB_BASE_URL")
 
 
+def test_lane_lease():
+    assert Settings().lane_lease == lanes.LANE_TIMEOUT
+    settings = Settings(healthcheck_interval=timedelta(hours=1))
+    # The lane outlives the healthcheck holding it.
+    assert settings.lane_lease > settings.healthcheck_timeout == timedelta(minutes=30)
+    assert Settings(healthcheck_interval=timedelta(minutes=1)).lane_lease == (
+        lanes.JOB_TIMEOUT + lanes.LEASE_MARGIN
+    )
+
+
 def test_invalid_redis_url():
     with pytest.raises(ValueError):
         Settings(redis_om_url="invalid_redis_url")
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from runner_manager import Runner, RunnerGroup
+from runner_manager.clients.github import GitHub
+from runner_manager.models import timeline
+from runner_manager.models.runner import RunnerStatus
+from runner_manager.models.timeline import RunnerTimeline
+
+
+def test_record():
+    now = datetime.now(timezone.utc)
+    runner_timeline = RunnerTimeline()
+    assert runner_timeline.record("reserved", now) is None
+    assert runner_timeline.record("jit_generated", now + timedelta(seconds=2)) == (
+        "github",
+        2,
+    )
+    # Events are only recorded once.
+    assert runner_timeline.record("jit_generated", now + timedelta(seconds=5)) is None
+    assert runner_timeline.jit_generated == now + timedelta(seconds=2)
+    # Stages whose start was not recorded are not observed.
+    assert runner_timeline.record("online", now) is None
+    assert runner_timeline.record("busy", now + timedelta(seconds=1)) == ("idle", 1)
+
+
+def test_histograms(runner_group: RunnerGroup):
+    db = runner_group.db()
+    prefix = Runner.Meta.global_key_prefix
+    for seconds in (0.5, 20, 20, 5000):
+        timeline.observe(db, prefix, "boot", runner_group.name, "base", seconds)
+    histograms = timeline.histograms(db, prefix)
+    buckets, total = histograms[("boot", runner_group.name, "base")]
+    assert total == pytest.approx(5040.5)
+    assert dict(buckets) == {
+        "1.0": 1,
+        "2.5": 1,
+        "5.0": 1,
+        "10.0": 1,
+        "30.0": 3,
+        "60.0": 3,
+        "120.0": 3,
+        "300.0": 3,
+        "600.0": 3,
+        "1200.0": 3,
+        "3600.0": 3,
+        "14400.0": 4,
+        "+Inf": 4,
+    }
+
+
+def test_runner_lifecycle(runner_group: RunnerGroup, github: GitHub):
+    runner_group.save()
+    runner = runner_group.create_runner(github)
+    assert runner is not None
+    runner = Runner.get(runner.pk)
+    for event in ("reserved", "jit_generated", "create_requested", "created"):
+        assert getattr(runner.timeline, event) is not None
+    runner.status = RunnerStatus.online
+    runner.busy = True
+    runner.save()
+    assert runner.timeline.online is not None
+    assert runner.timeline.busy is not None
+    runner.record("completed")
+    runner_group.delete_runner(runner, github)
+    stages = {
+        stage
+        for stage, group, backend in timeline.histograms(
+            runner_group.db(), Runner.Meta.global_key_prefix
+        )
+    }
+    assert stages == set(timeline.STAGES.values())
@@ -0,0 +1,75 @@
+from typing import List
+
+from redis import Redis
+from rq import Queue
+
+from runner_manager.leader import LeaderLease, LeaderScheduler, campaign, fence
+from runner_manager.models.settings import Settings
+
+
+def test_lease(redis: Redis, settings: Settings):
+    first = LeaderLease(redis, settings.name, holder="first")
+    second = LeaderLease(redis, settings.name, holder="second")
+    token = first.acquire()
+    assert token is not None
+    assert second.acquire() is None
+    # Renewing keeps the same token.
+    assert first.acquire() == token
+    assert redis.pttl(first.key()) > 0
+    first.release()
+    assert first.is_leader is False
+    assert second.acquire() == token + 1
+    # The lease of the second replica is not released by the first one.
+    first.token = token
+    first.release()
+    assert second.acquire() == token + 1
+
+
+def test_lease_expired(redis: Redis, settings: Settings):
+    first = LeaderLease(redis, settings.name, holder="first")
+    second = LeaderLease(redis, settings.name, holder="second")
+    token = first.acquire()
+    redis.delete(first.key())
+    assert second.acquire() == token + 1
+    assert first.acquire() is None
+
+
+def test_campaign(redis: Redis, settings: Settings):
+    elected: List[int] = []
+    first = LeaderLease(redis, settings.name, holder="first")
+    second = LeaderLease(redis, settings.name, holder="second")
+    campaign(first, elected.append)
+    campaign(second, elected.append)
+    campaign(first, elected.append)
+    assert elected == [first.token]
+    first.release()
+    campaign(second, elected.append)
+    assert len(elected) == 2
+    assert elected[1] == second.token
+
+
+def test_fence(redis: Redis, settings: Settings):
+    assert fence(redis, settings.name, 2) is True
+    assert fence(redis, settings.name, 2) is True
+    assert fence(redis, settings.name, 1) is False
+    assert fence(redis, settings.name, 3) is True
+
+
+def test_leader_scheduler(queue: Queue, settings: Settings):
+    first, second = (
+        LeaderScheduler(
+            queue=queue,
+            connection=queue.connection,
+            job_class=queue.job_class,
+            prefix=settings.name,
+        )
+        for _ in range(2)
+    )
+    assert first.acquire_lock()
+    first.remove_lock()
+    # The second scheduler stands by while the first one holds the lease.
+    assert not second.acquire_lock()
+    first.register_death()
+    assert second.acquire_lock()
+    second.remove_lock()
+    second.register_death()
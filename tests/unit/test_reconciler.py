@@ -0,0 +1,85 @@
+from collections import Counter
+from typing import List
+
+from redis import Redis
+from rq import Queue
+
+from runner_manager import RunnerGroup
+from runner_manager.models.settings import Settings
+from runner_manager.reconciler import HashRing, Reconciler, next_slot
+
+
+def test_next_slot():
+    assert next_slot(100, 30, 60) == 150
+    assert next_slot(150, 30, 60) == 210
+    assert next_slot(151, 30, 60) == 210
+
+
+def test_hash_ring():
+    keys = [f"group-{i}" for i in range(1000)]
+    ring = HashRing(["a", "b", "c"])
+    shares = Counter(ring.node(key) for key in keys)
+    assert all(share > 200 for share in shares.values())
+    # Adding a node only moves keys to it.
+    larger = HashRing(["a", "b", "c", "d"])
+    moved = [key for key in keys if ring.node(key) != larger.node(key)]
+    assert all(larger.node(key) == "d" for key in moved)
+    assert HashRing([]).node("group") is None
+
+
+def test_reconciler(
+    redis: Redis, settings: Settings, runner_group: RunnerGroup, queue: Queue
+):
+    runner_group.save()
+    groups: List[RunnerGroup] = [runner_group]
+    for i in range(1, 6):
+        group = RunnerGroup(
+            **runner_group.dict(exclude={"pk", "id", "name", "labels"}),
+            id=i + 1,
+            name=f"{runner_group.name}-{i}",
+            labels=[f"label-{i}"],
+        )
+        groups.append(group.save())
+    # The runs are only enqueued, not run by a worker.
+    maintenance = Queue(
+        f"maintenance-{settings.name}",
+        connection=queue.connection,
+        serializer=queue.serializer,
+        job_class=queue.job_class,
+    )
+    reconcilers = [
+        Reconciler(redis, settings, name=name, queue=maintenance) for name in ("a", "b")
+    ]
+    interval = settings.healthcheck_interval.total_seconds()
+    start = 1_000_000.0
+    for reconciler in reconcilers:
+        reconciler.heartbeat(start)
+        reconciler.sync(groups, start)
+    # The first runs are spread evenly over the interval.
+    first = sorted(
+        score
+        for member, score in redis.zrange(
+            reconcilers[0].key("schedule"), 0, -1, withscores=True
+        )
+        if member.startswith("healthcheck")
+    )
+    assert [round(b - a) for a, b in zip(first, first[1:])] == [interval / 6] * 5
+
+    done = []
+    for step in range(0, int(interval * 4), 10):
+        for reconciler in reconcilers:
+            done.extend(
+                (reconciler.name, member)
+                for member in reconciler.run_once(start + step)
+            )
+    jobs = maintenance.get_jobs()
+    runs = Counter(f"{job.meta['type']}:{job.args[0]}" for job in jobs)
+    # Each group is run once per interval, by a single reconciler.
+    assert {runs[f"healthcheck:{group.pk}"] for group in groups} == {4}
+    assert {job.timeout for job in jobs if job.meta["type"] == "healthcheck"} == {
+        settings.healthcheck_timeout.total_seconds()
+    }
+    assert {runs[f"leaks:{group.pk}"] for group in groups} == {1}
+    owners = {}
+    for name, member in done:
+        assert owners.setdefault(member.split(":")[1], name) == name